@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Durable Artifact I/O for the Consulting Team
+Atomic write-to-temp-then-rename, completion markers for agent outputs, and a
+dedicated background thread so disk latency never blocks the event loop
+"""
+
+import os
+import json
+import uuid
+import asyncio
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Iterator, TextIO
+
+from metrics import BYTES_WRITTEN
+
+COMPLETE_SUFFIX = ".complete"
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+def new_run_id() -> str:
+    """Run-scoped id used in artifact filenames: second timestamp plus a random suffix."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+def _fsync_dir(directory: Path):
+    """Flush a directory entry so a completed rename survives a crash (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_open(path: Path, encoding: str = 'utf-8') -> Iterator[TextIO]:
+    """Open a temp file next to `path` for writing and atomically rename it into place on success.
+
+    Readers see either the previous file or the complete new one, never a truncated write.
+    Temp files are hidden (`.name.xxxx.tmp`) so output globs never pick them up.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+            written = f.tell()
+        os.replace(tmp_path, path)
+        BYTES_WRITTEN.inc(written, kind=path.suffix.lstrip('.') or "other")
+        _fsync_dir(path.parent)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+def atomic_write_text(path: Path, text: str):
+    """Atomically write a text file."""
+    with atomic_open(path) as f:
+        f.write(text)
+
+def atomic_write_json(path: Path, data: Any):
+    """Atomically write a JSON file."""
+    with atomic_open(path) as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def completion_marker(markdown_file: Path) -> Path:
+    """Path of the completion marker that vouches for an agent output and its sidecars."""
+    return markdown_file.with_name(f"{markdown_file.stem}{COMPLETE_SUFFIX}")
+
+def mark_complete(markdown_file: Path, files: List[Path]):
+    """Write the completion marker last, recording the artifact set and sizes."""
+    atomic_write_json(completion_marker(markdown_file), {
+        "completed_at": datetime.now().isoformat(),
+        "files": {path.name: path.stat().st_size for path in files}
+    })
+
+def is_complete(markdown_file: Path) -> bool:
+    """Whether an agent output was fully written."""
+    return completion_marker(markdown_file).exists()
+
+def find_latest_output(output_dir: Path, run_id: Optional[str] = None) -> Optional[Path]:
+    """Most recent complete markdown output in an agent's directory.
+
+    Prefers the output of `run_id` when given. Directories written before completion
+    markers existed (no markers at all) fall back to the newest markdown file.
+    """
+    if not output_dir.exists():
+        return None
+    md_files = list(output_dir.glob("*.md"))
+    if run_id is not None:
+        for md_file in md_files:
+            if md_file.stem.endswith(run_id) and is_complete(md_file):
+                return md_file
+    complete = [md_file for md_file in md_files if is_complete(md_file)]
+    if not complete and not any(output_dir.glob(f"*{COMPLETE_SUFFIX}")):
+        complete = md_files
+    return max(complete, key=lambda x: x.stat().st_mtime) if complete else None
+
+def io_executor() -> ThreadPoolExecutor:
+    """Single background thread that serializes artifact writes for the process."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-io")
+    return _io_executor
+
+class BackgroundAppender:
+    """Appends streamed text to a file from the background I/O thread.
+
+    Chunks are buffered in a list and handed to the I/O thread once `batch_chars` have
+    accumulated, so the writer neither waits on the disk nor copies a growing string.
+    """
+
+    def __init__(self, path: Path, batch_chars: int = 8192):
+        self.path = Path(path)
+        self.batch_chars = batch_chars
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._chunks: List[str] = []
+        self._buffered = 0
+        self._written = 0
+        self._pending = None
+        self._error: Optional[BaseException] = None
+
+    def write(self, text: str):
+        self._chunks.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.batch_chars:
+            self._submit()
+
+    def _submit(self):
+        if self._chunks:
+            self._pending = io_executor().submit(self._append, "".join(self._chunks))
+            self._chunks = []
+            self._buffered = 0
+
+    def _append(self, text: str):
+        if self._error is not None:
+            return
+        try:
+            self._file.write(text)
+            self._file.flush()
+            self._written += len(text.encode('utf-8'))
+        except OSError as e:
+            self._error = e
+
+    def close(self):
+        """Write what is buffered, wait for the I/O thread and close the file.
+
+        Raises:
+            OSError: If any append failed
+        """
+        self._submit()
+        if self._pending is not None:
+            self._pending.result()
+        self._file.close()
+        BYTES_WRITTEN.inc(self._written, kind=self.path.suffix.lstrip('.') or "other")
+        if self._error is not None:
+            raise self._error
+
+async def run_in_io_thread(func: Callable[..., Any], *args) -> Any:
+    """Run a blocking file operation on the background I/O thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), func, *args)
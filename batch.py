@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Sharded Batch Runs Across Worker Processes
+Runs a manifest of engagements on N worker processes, on one host or on several
+hosts sharing a filesystem. Engagements are spread over shards in a SQLite lease
+queue: each worker drains its own shard from the front and, when that is empty,
+steals from the back of the fullest other shard. Workers renew their leases with
+heartbeats; the engagements of a worker that stops renewing are reclaimed by the
+others once their lease expires
+
+Usage:
+    python batch.py run companies.csv --workers 4             # Coordinator plus 4 local workers
+    python batch.py run companies.csv --workers 8 --stub-backend
+    python batch.py run companies.csv --budget 25             # Stop starting engagements once $25 is spent
+    python batch.py enqueue companies.csv --queue /shared/batch.sqlite3 --shards 8
+    python batch.py work --queue /shared/batch.sqlite3 --shard 3   # On any host, any number of times
+    python batch.py status --queue /shared/batch.sqlite3
+    python batch.py run companies.csv --metrics-port 9464     # Worker N serves /metrics on port 9464 + N
+
+Manifests are CSV (columns company, brief and optionally deliverables, tier) or
+JSON/JSON Lines objects with the same fields; CSV deliverables are space separated.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+import logging
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+
+import metrics
+from artifact_io import run_in_io_thread
+from daemon import EngagementFailed, engagement_errors, progress_to, routed_stdout, run_engagement
+from structured_logging import configure_logging, console, log_event
+
+CLAIMABLE = "(status = 'pending' OR (status = 'leased' AND lease_expires < :now))"
+
+@dataclass
+class Task:
+    """One claimed engagement of the batch."""
+    id: int
+    shard: int
+    engagement: Dict[str, Any]
+    attempts: int
+    stolen: bool = False
+
+class LeaseQueue:
+    """Sharded engagement queue in SQLite, safe to share between processes and hosts.
+
+    Claims run in `BEGIN IMMEDIATE` transactions, so two workers never lease the same task.
+    The database uses a rollback journal rather than WAL, because WAL needs shared memory
+    that network filesystems do not provide.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 3, timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY, shard INTEGER NOT NULL, engagement TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending', owner TEXT, lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0, started_at REAL, finished_at REAL, result TEXT, error TEXT)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS tasks_by_shard ON tasks (status, shard, id)")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS workers (
+            id TEXT PRIMARY KEY, shard INTEGER, heartbeat REAL, completed INTEGER NOT NULL DEFAULT 0,
+            stolen INTEGER NOT NULL DEFAULT 0, reclaimed INTEGER NOT NULL DEFAULT 0)""")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS spend (
+            task_id INTEGER PRIMARY KEY, worker TEXT, reserved_usd REAL NOT NULL DEFAULT 0, spent_usd REAL)""")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS attempt_spend (
+            task_id INTEGER NOT NULL, worker TEXT, spent_usd REAL NOT NULL)""")
+
+    @property
+    def shards(self) -> int:
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'shards'").fetchone()
+        return int(row[0]) if row else 1
+
+    def enqueue(self, engagements: List[Dict[str, Any]], shards: int) -> int:
+        """Add engagements round-robin over `shards` shards; returns how many were added."""
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            offset = self.db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('shards', ?)", (str(shards),))
+            self.db.executemany("INSERT INTO tasks (shard, engagement) VALUES (?, ?)",
+                                [((offset + i) % shards, json.dumps(engagement))
+                                 for i, engagement in enumerate(engagements)])
+        return len(engagements)
+
+    def register(self, worker: str, shard: int):
+        self.db.execute("INSERT OR REPLACE INTO workers (id, shard, heartbeat) VALUES (?, ?, ?)",
+                        (worker, shard, time.time()))
+
+    def claim(self, worker: str, shard: int, lease_seconds: float) -> Optional[Task]:
+        """Lease the next task of `shard`, or steal the last one of the fullest other shard.
+
+        Expired leases count as claimable (their worker stopped heartbeating); a task whose lease
+        has expired max_attempts times is failed instead of being claimed again.
+        """
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("UPDATE tasks SET status = 'failed', finished_at = :now, owner = NULL, "
+                            "error = 'Lease expired on every attempt' "
+                            "WHERE status = 'leased' AND lease_expires < :now AND attempts >= :max",
+                            {"now": now, "max": self.max_attempts})
+            row = self.db.execute(f"SELECT id, shard, engagement, attempts, status FROM tasks "
+                                  f"WHERE {CLAIMABLE} AND shard = :shard ORDER BY id LIMIT 1",
+                                  {"now": now, "shard": shard}).fetchone()
+            stolen = row is None
+            if stolen:
+                victim = self.db.execute(f"SELECT shard FROM tasks WHERE {CLAIMABLE} "
+                                         f"GROUP BY shard ORDER BY COUNT(*) DESC, shard LIMIT 1", {"now": now}).fetchone()
+                if victim is None:
+                    return None
+                row = self.db.execute(f"SELECT id, shard, engagement, attempts, status FROM tasks "
+                                      f"WHERE {CLAIMABLE} AND shard = :shard ORDER BY id DESC LIMIT 1",
+                                      {"now": now, "shard": victim[0]}).fetchone()
+            self.db.execute("UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                            "started_at = ? WHERE id = ?", (worker, now + lease_seconds, now, row[0]))
+            self.db.execute("UPDATE workers SET stolen = stolen + ?, reclaimed = reclaimed + ? WHERE id = ?",
+                            (int(stolen), int(row[4] == "leased"), worker))
+        return Task(id=row[0], shard=row[1], engagement=json.loads(row[2]), attempts=row[3] + 1, stolen=stolen)
+
+    def heartbeat(self, worker: str, task_ids: List[int], lease_seconds: float) -> List[int]:
+        """Extend the worker's leases; returns the ids it still holds (others were reclaimed)."""
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (now, worker))
+            held = []
+            for task_id in task_ids:
+                renewed = self.db.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? "
+                                          "AND status = 'leased'", (now + lease_seconds, task_id, worker)).rowcount
+                if renewed:
+                    held.append(task_id)
+        return held
+
+    def complete(self, worker: str, task_id: int, result: Dict[str, Any]) -> bool:
+        """Record a finished task and its spend; False if the lease was lost to another worker meanwhile."""
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            done = self.db.execute("UPDATE tasks SET status = 'done', finished_at = ?, result = ?, owner = NULL "
+                                   "WHERE id = ? AND owner = ? AND status = 'leased'",
+                                   (time.time(), json.dumps(result), task_id, worker)).rowcount
+            if done:
+                self.db.execute("UPDATE workers SET completed = completed + 1 WHERE id = ?", (worker,))
+                self.db.execute("INSERT INTO spend (task_id, worker, spent_usd) VALUES (?, ?, ?) "
+                                "ON CONFLICT (task_id) DO UPDATE SET spent_usd = excluded.spent_usd",
+                                (task_id, worker, float(result.get("spend_usd") or 0.0)))
+        return bool(done)
+
+    def _committed_spend(self) -> Dict[str, float]:
+        # Finished engagements count what they spent, failed attempts what they spent before failing (or the
+        # whole reservation when that is unknown), running ones what they may still spend
+        spent, failed, reserved = self.db.execute(
+            "SELECT COALESCE(SUM(spend.spent_usd), 0), "
+            "COALESCE(SUM(CASE WHEN spend.spent_usd IS NULL AND tasks.status = 'failed' THEN reserved_usd END), 0), "
+            "COALESCE(SUM(CASE WHEN spend.spent_usd IS NULL AND tasks.status = 'leased' "
+            "AND tasks.owner = spend.worker THEN reserved_usd END), 0) "
+            "FROM spend JOIN tasks ON tasks.id = spend.task_id").fetchone()
+        attempts = self.db.execute("SELECT COALESCE(SUM(spent_usd), 0) FROM attempt_spend").fetchone()[0]
+        return {"spent_usd": spent + failed + attempts, "reserved_usd": reserved}
+
+    def spend(self) -> Dict[str, float]:
+        """USD spent by the batch so far and reserved by its running engagements."""
+        return {key: round(value, 6) for key, value in self._committed_spend().items()}
+
+    def reserve_budget(self, worker: str, task_id: int, budget_usd: float,
+                       engagement_usd: Optional[float] = None, min_usd: float = 0.1) -> Optional[float]:
+        """Reserve part of the batch budget for a leased task; None if less than `min_usd` is free.
+
+        A task gets its own engagement budget if it has one, else an even share of what is left
+        over the tasks still waiting for a reservation (itself included) but at least `min_usd`,
+        never more than what is left.
+        """
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            committed = self._committed_spend()
+            remaining = budget_usd - committed["spent_usd"] - committed["reserved_usd"]
+            waiting = self.db.execute(
+                "SELECT COUNT(*) FROM tasks LEFT JOIN spend ON spend.task_id = tasks.id "
+                "AND spend.worker = tasks.owner AND spend.spent_usd IS NULL "
+                "WHERE tasks.status = 'pending' OR (tasks.status = 'leased' AND spend.task_id IS NULL)").fetchone()[0]
+            share = engagement_usd if engagement_usd is not None else max(remaining / max(waiting, 1), min_usd)
+            grant = min(share, remaining)
+            if grant < min_usd:
+                return None
+            self.db.execute("INSERT OR REPLACE INTO spend (task_id, worker, reserved_usd) VALUES (?, ?, ?)",
+                            (task_id, worker, grant))
+        return grant
+
+    def release(self, worker: str, task_id: int):
+        """Put a leased task back unstarted, without counting the attempt."""
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("UPDATE tasks SET status = 'pending', owner = NULL, lease_expires = NULL, "
+                            "started_at = NULL, attempts = attempts - 1 WHERE id = ? AND owner = ? AND status = 'leased'",
+                            (task_id, worker))
+
+    def fail(self, worker: str, task_id: int, error: str, spent_usd: Optional[float] = None) -> str:
+        """Release a failed task for another attempt, or fail it for good; returns its new status.
+
+        `spent_usd` is what the failed attempt spent; it counts against the batch budget even when
+        the lease was lost. Without it, a task that fails for good counts its whole reservation.
+        """
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            if spent_usd is not None:
+                self.db.execute("INSERT INTO attempt_spend (task_id, worker, spent_usd) VALUES (?, ?, ?)",
+                                (task_id, worker, spent_usd))
+                self.db.execute("UPDATE spend SET spent_usd = 0 WHERE task_id = ? AND worker = ? AND spent_usd IS NULL",
+                                (task_id, worker))
+            row = self.db.execute("SELECT attempts FROM tasks WHERE id = ? AND owner = ? AND status = 'leased'",
+                                  (task_id, worker)).fetchone()
+            if row is None:
+                return "lost"
+            status = "failed" if row[0] >= self.max_attempts else "pending"
+            self.db.execute("UPDATE tasks SET status = ?, owner = NULL, lease_expires = NULL, error = ?, "
+                            "finished_at = ? WHERE id = ?",
+                            (status, error, time.time() if status == "failed" else None, task_id))
+        return status
+
+    def counts(self) -> Dict[str, int]:
+        """Tasks by status (pending, leased, done, failed)."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(self.db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")))
+        return counts
+
+    def outstanding(self, worker: str) -> int:
+        """Tasks that may still need a worker: pending ones and those leased by other workers."""
+        return self.db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending' OR "
+                               "(status = 'leased' AND owner != ?)", (worker,)).fetchone()[0]
+
+    def workers(self) -> List[Dict[str, Any]]:
+        return [{"worker": row[0], "shard": row[1], "heartbeat": row[2], "completed": row[3], "stolen": row[4],
+                 "reclaimed": row[5]}
+                for row in self.db.execute("SELECT id, shard, heartbeat, completed, stolen, reclaimed FROM workers "
+                                           "ORDER BY shard, id")]
+
+    def failures(self) -> List[Dict[str, Any]]:
+        return [{"id": row[0], "company": json.loads(row[1]).get("company"), "error": row[2]}
+                for row in self.db.execute("SELECT id, engagement, error FROM tasks WHERE status = 'failed' ORDER BY id")]
+
+    def close(self):
+        self.db.close()
+
+def load_manifest(path: Path) -> List[Dict[str, Any]]:
+    """Engagements from a CSV, JSON or JSON Lines manifest.
+
+    Raises:
+        ValueError: If the manifest has an unknown format or an invalid row
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == ".csv":
+        rows = []
+        for row in csv.DictReader(text.splitlines()):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            row["deliverables"] = row.get("deliverables", "").split() or None
+            row["tier"] = row.get("tier") or None
+            rows.append(row)
+    elif path.suffix == ".jsonl":
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    elif path.suffix == ".json":
+        rows = json.loads(text)
+    else:
+        raise ValueError(f"Unknown manifest format: {path.suffix} (expected .csv, .json or .jsonl)")
+
+    engagements = []
+    for number, row in enumerate(rows, 1):
+        error = engagement_errors(row, required=("company", "brief"))
+        if error:
+            raise ValueError(f"Manifest row {number}: {error}")
+        engagements.append({key: row.get(key) for key in ("company", "brief", "deliverables", "tier", "team_options")})
+    return engagements
+
+class BatchWorker:
+    """Claims engagements from a lease queue and runs several at a time on one warm TeamResources."""
+
+    def __init__(self, queue: LeaseQueue, resources: Any, output_dir: Path, shard: int, concurrency: int = 2,
+                 lease_seconds: float = 60.0, heartbeat_seconds: float = 15.0, poll_seconds: float = 1.0,
+                 budget_usd: Optional[float] = None, min_engagement_usd: float = 0.1):
+        self.queue = queue
+        self.budget_usd = budget_usd  # Shared by every worker of the batch through the queue
+        self.min_engagement_usd = min_engagement_usd
+        self.resources = resources
+        self.output_dir = Path(output_dir)
+        self.shard = shard
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{shard}"
+        self.log_dir = self.output_dir / "batch_logs"
+        self._leased: Dict[int, Task] = {}
+        self.pending = 0  # Engagements of the batch waiting to start, refreshed with every heartbeat
+        metrics.QUEUE_DEPTH.track(lambda: self.pending, queue="batch_engagements")
+        # Queue calls may wait out another worker's lock (up to the busy timeout): keep them off the artifact I/O thread
+        self._queue_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lease-queue")
+
+    async def _queue(self, method: Any, *args) -> Any:
+        """Run a LeaseQueue method on the worker's queue thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._queue_executor, method, *args)
+
+    async def run(self):
+        """Work until no task is pending or leased by another worker."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        await self._queue(self.queue.register, self.id, self.shard)
+        self.pending = (await self._queue(self.queue.counts))["pending"]
+        log_event("batch.worker_started", f"👷 Worker {self.id} on shard {self.shard} "
+                  f"({self.concurrency} engagements at a time)", worker=self.id, shard=self.shard)
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            with routed_stdout():
+                await asyncio.gather(*(self._slot() for _ in range(self.concurrency)))
+        finally:
+            heartbeat.cancel()
+            self._queue_executor.shutdown(wait=False)
+
+    async def _slot(self):
+        """Claim and run one task at a time; wait while other workers' leases may still expire."""
+        while True:
+            task = await self._queue(self.queue.claim, self.id, self.shard, self.lease_seconds)
+            if task is None:
+                if not await self._queue(self.queue.outstanding, self.id):
+                    return
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if self.budget_usd is not None:
+                engagement_usd = (task.engagement.get("team_options") or {}).get("budget_usd")
+                grant = await self._queue(self.queue.reserve_budget, self.id, task.id, self.budget_usd,
+                                          engagement_usd, self.min_engagement_usd)
+                if grant is None:
+                    await self._queue(self.queue.release, self.id, task.id)
+                    if not (await self._queue(self.queue.spend))["reserved_usd"]:
+                        log_event("batch.budget_exhausted", f"💸 Less than ${self.min_engagement_usd:.2f} of the "
+                                  f"${self.budget_usd:.2f} batch budget is left; not starting #{task.id}",
+                                  logging.WARNING, task_id=task.id, budget_usd=self.budget_usd)
+                        return
+                    await asyncio.sleep(self.poll_seconds)  # Running engagements may leave part of theirs unspent
+                    continue
+                task.engagement = dict(task.engagement, team_options=dict(task.engagement.get("team_options") or {},
+                                                                          budget_usd=grant))
+            self._leased[task.id] = task
+            try:
+                await self._run_task(task)
+            finally:
+                self._leased.pop(task.id, None)
+
+    async def _run_task(self, task: Task):
+        lines: List[str] = []
+        started = time.time()
+        label = f"#{task.id} {task.engagement['company']}" + (f" (stolen from shard {task.shard})" if task.stolen else "")
+        try:
+            # Batch calls yield to interactive engagements sharing the worker's scheduler unless the manifest says otherwise
+            team_options = dict(task.engagement.get("team_options") or {})
+            team_options.setdefault("priority", "bulk")
+            with progress_to(lambda event: lines.append(event["message"])):
+                result = await run_engagement(self.resources, dict(task.engagement, output_dir=str(self.output_dir),
+                                                                   team_options=team_options))
+        except Exception as e:
+            spent_usd = e.spend_usd if isinstance(e, EngagementFailed) else None
+            status = await self._queue(self.queue.fail, self.id, task.id, str(e), spent_usd)
+            log_event("batch.task_failed", f"❌ {label}: {e} ({'retrying' if status == 'pending' else status})",
+                      logging.ERROR, task_id=task.id, status=status, spend_usd=spent_usd)
+        else:
+            if await self._queue(self.queue.complete, self.id, task.id, result):
+                log_event("batch.task_done", f"✅ {label}: {result['status']} in {time.time() - started:.1f}s",
+                          task_id=task.id, status=result['status'], seconds=round(time.time() - started, 3))
+            else:
+                log_event("batch.lease_lost", f"⚠️  {label}: lease was reclaimed by another worker; result not recorded",
+                          logging.WARNING, task_id=task.id)
+        await run_in_io_thread((self.log_dir / f"task-{task.id}.log").write_text, "\n".join(lines) + "\n", 'utf-8')
+
+    async def _heartbeat(self):
+        """Renew the leases of running tasks every heartbeat_seconds."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            held = await self._queue(self.queue.heartbeat, self.id, list(self._leased), self.lease_seconds)
+            self.pending = (await self._queue(self.queue.counts))["pending"]
+            for task_id in set(self._leased) - set(held):
+                log_event("batch.lease_expired", f"⚠️  Lease on #{task_id} expired before its heartbeat; "
+                          "another worker may run it", logging.WARNING, task_id=task_id)
+
+def print_status(queue: LeaseQueue):
+    """Task counts and per-worker throughput of a batch."""
+    counts = queue.counts()
+    console(f"📊 {counts['done']}/{sum(counts.values())} done, {counts['leased']} running, "
+            f"{counts['pending']} pending, {counts['failed']} failed")
+    for worker in queue.workers():
+        console(f"   👷 {worker['worker']} (shard {worker['shard']}): {worker['completed']} completed, "
+                f"{worker['stolen']} stolen, {worker['reclaimed']} reclaimed")
+    spend = queue.spend()
+    if spend["spent_usd"] or spend["reserved_usd"]:
+        console(f"   💰 ${spend['spent_usd']:.4f} spent, ${spend['reserved_usd']:.4f} reserved by running engagements")
+    for failure in queue.failures()[:10]:
+        console(f"   ❌ #{failure['id']} {failure['company']}: {failure['error']}")
+
+def run_batch(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    """Enqueue the manifest (unless the queue already holds it), start local workers and wait for them."""
+    queue = LeaseQueue(args.queue, max_attempts=int(config.get('max_attempts', 3)))
+    if sum(queue.counts().values()):
+        log_event("batch.resumed", f"♻️  Resuming the batch in {args.queue}", queue=str(args.queue))
+    else:
+        added = queue.enqueue(load_manifest(args.manifest), args.workers)
+        log_event("batch.queued", f"📥 Queued {added} engagements in {args.workers} shards",
+                  engagements=added, shards=args.workers)
+
+    command = [sys.executable, os.path.abspath(__file__), "work", "--queue", str(args.queue),
+               "--output-dir", str(args.output_dir), "--concurrency", str(args.concurrency)]
+    if args.stub_backend:
+        command.append("--stub-backend")
+    if args.budget is not None:
+        command += ["--budget", str(args.budget)]
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    started = time.time()
+    processes = [subprocess.Popen(command + ["--shard", str(shard)]
+                                  + (["--metrics-port", str(args.metrics_port + shard)] if args.metrics_port else []),
+                                  env=env) for shard in range(args.workers)]
+    for process in processes:
+        process.wait()
+    elapsed = time.time() - started
+
+    counts = queue.counts()
+    log_event("batch.finished", f"\n⏱️  {counts['done']} engagements in {elapsed:.1f}s "
+              f"({counts['done'] / elapsed:.2f}/s) on {args.workers} workers",
+              done=counts['done'], seconds=round(elapsed, 3), workers=args.workers)
+    print_status(queue)
+    queue.close()
+    return 0 if not counts['failed'] and not counts['pending'] and not counts['leased'] else 1
+
+def main():
+    """Run, feed, work on or inspect a sharded batch."""
+    from prompt_manager import PromptManager
+    prompt_manager = PromptManager()
+    config = prompt_manager.get_batch_config()
+    metrics_config = prompt_manager.get_metrics_config()
+    output_default = config.get('output_dir', './consulting_projects')
+
+    parser = argparse.ArgumentParser(description="Sharded multi-process batch runs of consulting engagements")
+    parser.add_argument("command", choices=["run", "enqueue", "work", "status"])
+    parser.add_argument("manifest", nargs="?", help="CSV, JSON or JSON Lines manifest (run, enqueue)")
+    parser.add_argument("--queue", help="Queue database (default: batch.queue_db under the output directory)")
+    parser.add_argument("--output-dir", "-o", default=output_default, help=f"Output directory (default: {output_default})")
+    parser.add_argument("--workers", type=int, default=int(config.get('workers', 4)),
+                        help="Worker processes started by run (default: batch.workers)")
+    parser.add_argument("--shards", type=int, help="Shards for enqueue (default: --workers)")
+    parser.add_argument("--shard", type=int, default=0, help="Home shard of a worker (default: 0)")
+    parser.add_argument("--concurrency", type=int, default=int(config.get('engagements_per_worker', 2)),
+                        help="Engagements each worker runs at once (default: batch.engagements_per_worker)")
+    parser.add_argument("--budget", type=float, default=config.get('budget_usd'), metavar="USD",
+                        help="Spend ceiling for the whole batch, shared by all workers (default: batch.budget_usd)")
+    parser.add_argument("--metrics-port", type=int, default=metrics_config.get('batch_port'),
+                        help="Serve Prometheus /metrics from each worker; worker N of run listens on this port + N "
+                             "(default: metrics.batch_port)")
+    parser.add_argument("--stub-backend", action="store_true", help="Answer every call from stub_backend.py instead of the API")
+    parser.add_argument("--api-key", help="OpenAI API key (optional, can use OPENAI_API_KEY env var)")
+    args = parser.parse_args()
+    args.queue = Path(args.queue or Path(args.output_dir) / config.get('queue_db', 'batch_queue.sqlite3'))
+
+    try:
+        if args.command in ("run", "enqueue") and not args.manifest:
+            raise ValueError(f"{args.command} needs a manifest")
+        if args.command == "run":
+            return run_batch(args, config)
+        if args.command == "enqueue":
+            queue = LeaseQueue(args.queue)
+            added = queue.enqueue(load_manifest(args.manifest), args.shards or args.workers)
+            log_event("batch.queued", f"📥 Queued {added} engagements in {queue.shards} shards of {args.queue}",
+                      engagements=added, shards=queue.shards)
+        elif args.command == "status":
+            print_status(LeaseQueue(args.queue))
+        else:
+            from service import build_resources
+            queue = LeaseQueue(args.queue, max_attempts=int(config.get('max_attempts', 3)))
+            worker = BatchWorker(queue, build_resources(prompt_manager, args.stub_backend, args.api_key),
+                                 Path(args.output_dir), args.shard % queue.shards, args.concurrency,
+                                 lease_seconds=float(config.get('lease_seconds', 60)),
+                                 heartbeat_seconds=float(config.get('heartbeat_seconds', 15)),
+                                 budget_usd=args.budget,
+                                 min_engagement_usd=float(config.get('min_engagement_usd', 0.1)))
+            if args.metrics_port:
+                metrics.serve_metrics(metrics_config.get('host', '127.0.0.1'), args.metrics_port)
+                console(f"📈 Metrics on http://{metrics_config.get('host', '127.0.0.1')}:{args.metrics_port}/metrics")
+            # One log file per worker: workers are separate processes appending concurrently
+            log_config = prompt_manager.get_logging_config()
+            if log_config.get('file'):
+                log_name = Path(log_config['file'])
+                configure_logging(log_config, Path(args.output_dir), f"{log_name.stem}.worker{args.shard}{log_name.suffix}")
+            else:
+                configure_logging(log_config, Path(args.output_dir))
+            asyncio.run(worker.run())
+    except (ValueError, OSError) as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n👋 Stopped; leased engagements are reclaimed once their leases expire")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
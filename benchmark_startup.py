@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for the Consulting Team CLI
+Times commands that never call the API (import, --help, --dry-run) in fresh
+interpreters next to the interpreter and asyncio baselines, and checks that the
+deferred heavy modules stay unimported
+
+Usage:
+    python benchmark_startup.py --runs 10 [--target-ms 150]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Modules only a network call (or a stale config cache) should import
+DEFERRED_MODULES = ("anthropic", "httpx", "pydantic", "yaml")
+
+# Reference rows: the interpreter and the stdlib event loop every engine command needs
+BASELINES = ("interpreter", "asyncio")
+
+def startup_commands(output_dir: Path) -> List[Tuple[str, List[str]]]:
+    """Non-network commands to time, as (name, interpreter arguments)."""
+    return [
+        ("interpreter", ["-c", "pass"]),
+        ("asyncio", ["-c", "import asyncio"]),
+        ("prompt config", ["-c", "from prompt_manager import PromptManager; PromptManager()"]),
+        ("import", ["-c", "import strategy_consulting_agent"]),
+        ("--help", ["strategy_consulting_agent.py", "--help"]),
+        ("--dry-run", ["strategy_consulting_agent.py", "--company", "Benchmark Co", "--brief", "Startup benchmark",
+                       "--output-dir", str(output_dir), "--dry-run"]),
+        ("orchestrator --help", ["orchestrator.py", "--help"])
+    ]
+
+def benchmark_env() -> Dict[str, str]:
+    """Environment for the timed runs: bytecode caching on, as in a normal install."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+def time_command(args: List[str], runs: int, env: Dict[str, str]) -> List[float]:
+    """Wall time in milliseconds of `runs` fresh interpreters, after one warm-up run."""
+    subprocess.run([sys.executable, *args], capture_output=True, env=env)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, env=env)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def imported_modules(args: List[str], env: Dict[str, str]) -> Dict[str, int]:
+    """Top-level modules a command imports, with their cumulative import time in microseconds."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, env=env)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.rstrip().endswith("package"):
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name.split(".")[0]] = max(modules.get(name.split(".")[0], 0), int(cumulative))
+    return modules
+
+def main():
+    """Print startup timings and exit non-zero if a command imports a deferred module (or misses --target-ms)."""
+    parser = argparse.ArgumentParser(description="Startup time of the non-network CLI commands")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per command (default: 10)")
+    parser.add_argument("--target-ms", type=float,
+                        help="Median wall time each command must stay under (default: no limit; compare with "
+                             "the asyncio row, which every engine command pays)")
+    args = parser.parse_args()
+
+    os.chdir(Path(__file__).resolve().parent)
+    env = benchmark_env()
+    failures = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        target = f" (target: {args.target_ms:g} ms)" if args.target_ms is not None else ""
+        print(f"⏱️  Timing {args.runs} fresh interpreters per command{target}")
+        print("")
+        print("| Command | Median ms | Min ms | Deferred modules imported |")
+        print("|---|---:|---:|---|")
+        for name, command in startup_commands(Path(output_dir)):
+            timings = time_command(command, args.runs, env)
+            median = statistics.median(timings)
+            leaked = sorted(set(imported_modules(command, env)) & set(DEFERRED_MODULES))
+            print(f"| {name} | {median:.0f} | {min(timings):.0f} | {', '.join(leaked) or '-'} |")
+            if name in BASELINES:
+                continue
+            if args.target_ms is not None and median > args.target_ms:
+                failures.append(f"{name} took {median:.0f} ms (target {args.target_ms:g} ms)")
+            if leaked:
+                failures.append(f"{name} imported {', '.join(leaked)}")
+
+    print("")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("🎉 No non-network command imports a deferred module"
+              + (" and all start within target!" if args.target_ms is not None else "!"))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Engagement Deadlines and Cancellation
+One token per engagement, shared by every agent call, stream and phase: cancelling it
+(Ctrl-C, a service request) or passing its deadline stops new work from starting,
+aborts streamed calls between chunks and lets the team save a resumable manifest
+"""
+
+import time
+import asyncio
+import threading
+from typing import List, Optional, Tuple
+
+CHECKPOINT_SUFFIX = ".partial"
+
+class EngagementCancelled(Exception):
+    """Raised inside an engagement once it is cancelled or its deadline has passed."""
+
+    def __init__(self, reason: str, checkpoint: Optional[str] = None):
+        self.reason = reason
+        self.checkpoint = checkpoint  # Partial stream saved when a call was aborted mid-response
+        super().__init__(f"Engagement {'deadline passed' if reason == 'deadline' else reason}")
+
+class CancellationToken:
+    """Cancel flag plus optional deadline; safe to check from API worker threads."""
+
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        self._reason: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wakers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self.start(deadline_seconds)
+
+    def start(self, deadline_seconds: Optional[float] = None):
+        """(Re)start the clock, e.g. when a queued engagement begins to run; a cancellation is kept."""
+        self.deadline_seconds = deadline_seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_seconds if deadline_seconds else None
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the engagement (from any thread); the first reason given is kept."""
+        with self._lock:
+            if self._reason is None:
+                self._reason = reason
+            wakers = list(self._wakers)
+        for loop, event in wakers:
+            loop.call_soon_threadsafe(event.set)
+
+    @property
+    def reason(self) -> Optional[str]:
+        """"deadline", the reason given to cancel(), or None while the engagement may continue."""
+        if self._reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return self._reason
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (never negative), or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def check(self):
+        """Raise EngagementCancelled if the engagement should stop."""
+        reason = self.reason
+        if reason is not None:
+            raise EngagementCancelled(reason)
+
+    def bound(self, timeout: Optional[float]) -> Optional[float]:
+        """A call timeout that does not run past the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def can_finish(self, seconds: Optional[float]) -> bool:
+        """Whether work expected to take `seconds` would finish before the deadline."""
+        remaining = self.remaining()
+        return remaining is None or seconds is None or seconds <= remaining
+
+    async def wait_for(self, tasks: List["asyncio.Future"], grace_seconds: float = 0.0):
+        """Wait for every task, cancelling the unfinished ones once the token is cancelled or times out.
+
+        Tasks get `grace_seconds` to stop on their own first, so streamed calls can checkpoint
+        their partial response; whatever is still running after that is cancelled. If the waiting
+        task itself is cancelled (Ctrl-C), the token is cancelled as "interrupted" and the tasks
+        are cancelled with it.
+        """
+        pending = {task for task in tasks if not task.done()}
+        if not pending:
+            return
+        loop = asyncio.get_running_loop()
+        waker = (loop, asyncio.Event())
+        with self._lock:
+            self._wakers.append(waker)
+        woken = loop.create_task(waker[1].wait())
+        try:
+            while pending and not self.cancelled:
+                done, pending = await asyncio.wait(pending | {woken}, timeout=self.remaining(),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(woken)
+            if pending and grace_seconds > 0:
+                _, pending = await asyncio.wait(pending, timeout=grace_seconds)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.wait(pending)
+        except asyncio.CancelledError:
+            self.cancel("interrupted")
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            woken.cancel()
+            with self._lock:
+                self._wakers.remove(waker)
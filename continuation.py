@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Continuation of Truncated Agent Responses
+Builds follow-up requests that prefill the assistant turn with the text generated
+so far, so a response cut off at max_tokens is resumed over the cached prompt
+instead of regenerated from scratch
+"""
+
+from typing import Dict, Any
+
+MAX_TOKENS_STOP = "max_tokens"
+
+def is_truncated(response: Any) -> bool:
+    """Whether a Messages API response stopped because it hit max_tokens."""
+    return getattr(response, "stop_reason", None) == MAX_TOKENS_STOP
+
+def _cached_blocks(content: Any) -> Any:
+    """Text content as a content block list with the last block marked for prompt caching."""
+    if not isinstance(content, str):
+        return content
+    return [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+
+def continuation_request(request: Dict[str, Any], partial_text: str) -> Dict[str, Any]:
+    """Copy a Messages API request so the model continues `partial_text`.
+
+    The system and user prompts are marked as a cached prefix and the partial output is
+    sent as a prefilled assistant turn (without trailing whitespace, which the API rejects).
+    """
+    continued = dict(request)
+    continued["system"] = _cached_blocks(request["system"])
+    messages = [dict(message) for message in request["messages"]]
+    messages[-1]["content"] = _cached_blocks(messages[-1]["content"])
+    continued["messages"] = messages + [{"role": "assistant", "content": partial_text.rstrip()}]
+    return continued
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Warm Daemon for the Consulting Team
+A long-running process that runs engagements submitted over a Unix domain socket,
+keeping the API client, prompt config and caches warm between them, and streams
+each engagement's progress back to the client that submitted it
+
+Usage:
+    python daemon.py start
+    python strategy_consulting_agent.py --company "Acme" --brief "..." --daemon
+    python daemon.py status
+    python daemon.py stop
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Set, Iterator, Tuple
+
+from structured_logging import progress_sink, configure_logging
+
+DEFAULT_SOCKET_PATH = ".consulting_daemon.sock"
+
+# ConsultingTeam options a client may set; everything else comes from the daemon's config
+TEAM_OPTIONS = ("hedging", "dependency_policy", "report_formats", "review_mode", "parallel_sections",
+                "adaptive_tokens", "priority", "tenant", "deadline_seconds", "budget_usd",
+                "debug")
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached or reports a failed request."""
+
+class EngagementFailed(Exception):
+    """Raised by run_engagement when an engagement fails, with what it spent before failing."""
+
+    def __init__(self, message: str, spend_usd: float):
+        super().__init__(message)
+        self.spend_usd = spend_usd
+
+def socket_path() -> Path:
+    """Socket path from the `daemon` section of the prompt config."""
+    from prompt_manager import PromptManager
+    return Path(PromptManager().get_daemon_config().get('socket_path', DEFAULT_SOCKET_PATH))
+
+def request(message: Dict[str, Any], path: Optional[Path] = None,
+            on_progress: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+    """Send one request to the daemon and read its events until the final one.
+
+    Args:
+        message: Request with a `command` ("engage", "status" or "stop")
+        path: Socket path (default: from the prompt config)
+        on_progress: Called with each progress line the daemon streams back
+
+    Returns:
+        The result of the request
+
+    Raises:
+        DaemonError: If no daemon is listening or the request failed
+    """
+    path = Path(path or socket_path())
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonError(f"No daemon listening on {path} (start one with: python daemon.py start)") from e
+        sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as events:
+            for line in events:
+                event = json.loads(line)
+                if event["event"] == "progress":
+                    if on_progress is not None:
+                        on_progress(event["message"])
+                elif event["event"] == "done":
+                    return event["result"]
+                else:
+                    raise DaemonError(event.get("error", "Unknown daemon error"))
+    raise DaemonError("Daemon closed the connection before the request finished")
+
+def submit_engagement(engagement: Dict[str, Any], on_progress: Optional[Callable[[str], Any]] = print,
+                      path: Optional[Path] = None) -> Dict[str, Any]:
+    """Run an engagement on the daemon, streaming its progress lines to `on_progress`.
+
+    Returns:
+        Run id, status, final report and report files of the engagement
+    """
+    return request(dict(engagement, command="engage"), path, on_progress)
+
+def is_listening(path: Path) -> bool:
+    """Whether a daemon accepts connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+class ProgressSink:
+    """Sends the text one engagement prints to its client, a line at a time."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None]):
+        self.send = send
+        self.buffer = ""
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        for line in lines:
+            self.send({"event": "progress", "message": line})
+        return len(text)
+
+    def flush(self):
+        pass
+
+class ProgressStream:
+    """sys.stdout for the daemon: prints inside an engagement go to that engagement's client.
+
+    Engagements run as concurrent tasks, and each task sees its own sink through a context
+    variable. Prints outside any engagement (and from worker threads) reach the daemon's stdout.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        sink = progress_sink.get()
+        return (sink or self.fallback).write(text)
+
+    def flush(self):
+        (progress_sink.get() or self.fallback).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+@contextmanager
+def routed_stdout() -> Iterator[None]:
+    """Install ProgressStream as sys.stdout for the lifetime of a server."""
+    stdout = sys.stdout
+    sys.stdout = ProgressStream(stdout)
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+@contextmanager
+def progress_to(send: Callable[[Dict[str, Any]], None]) -> Iterator[None]:
+    """Send the prints of the current task (and the tasks it starts) to `send` as progress events."""
+    token = progress_sink.set(ProgressSink(send))
+    try:
+        yield
+    finally:
+        progress_sink.reset(token)
+
+def engagement_errors(engagement: Dict[str, Any],
+                      required: Tuple[str, ...] = ("company", "brief", "output_dir")) -> Optional[str]:
+    """Why a submitted engagement cannot run, or None if it can."""
+    missing = [key for key in required if not engagement.get(key)]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    unknown = sorted(set(engagement.get("team_options") or {}) - set(TEAM_OPTIONS))
+    if unknown:
+        return f"Unknown team options: {', '.join(unknown)}"
+    return None
+
+async def run_engagement(resources: Any, engagement: Dict[str, Any], cancellation: Any = None) -> Dict[str, Any]:
+    """Run a submitted engagement on shared TeamResources.
+
+    Args:
+        resources: TeamResources shared by the process's engagements
+        engagement: Submitted engagement (company, brief, output_dir, tier, deliverables, team_options)
+        cancellation: Optional CancellationToken to cancel the engagement from outside
+
+    Returns:
+        Run id, status, project directory, final report, report files and spend in USD
+
+    Raises:
+        EngagementFailed: If the engagement fails once it has started; carries its spend so far
+    """
+    from strategy_consulting_agent import ConsultingTeam, project_directory, engagement_parameters
+    project_dir = project_directory(engagement["output_dir"], engagement["company"])
+    team = ConsultingTeam(resources.api_key, engagement["company"], project_dir, resources=resources,
+                          cancellation=cancellation, **(engagement.get("team_options") or {}))
+    parameters = engagement_parameters(engagement["brief"], engagement.get("deliverables"),
+                                       engagement.get("tier"), team.prompt_manager)
+    try:
+        result = await team.execute_consulting_engagement(parameters)
+    except Exception as e:
+        # Calls still reserved when the engagement failed may have been billed: count them too
+        raise EngagementFailed(str(e), round(team.spend.spent + team.spend.reserved, 6)) from e
+    return {
+        "run_id": result["run_id"],
+        "status": result["status"],
+        "project_dir": str(project_dir),
+        "final_report": result["final_report"],
+        "report_files": result["report_files"],
+        "spend_usd": result["spend"]["spent_usd"]
+    }
+
+class ConsultingDaemon:
+    """Runs submitted engagements in one warm process, a bounded number at a time."""
+
+    def __init__(self, api_key: str, path: Path, max_concurrent: int = 2):
+        from strategy_consulting_agent import TeamResources
+        self.resources = TeamResources(api_key)
+        self.socket_path = Path(path)
+        self.max_concurrent = max_concurrent
+        self.started_at = time.time()
+        self.engagements = {"served": 0, "failed": 0, "active": 0, "queued": 0}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def serve(self):
+        """Listen on the socket until a stop request, then let running engagements finish.
+
+        Raises:
+            DaemonError: If another daemon already listens on the socket
+        """
+        if self.socket_path.exists():
+            if is_listening(self.socket_path):
+                raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()  # Left behind by a daemon that did not shut down cleanly
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)  # Only this user may submit engagements
+        try:
+            with routed_stdout():
+                print(f"🛰️  Consulting daemon listening on {self.socket_path} (pid {os.getpid()})")
+                async with server:
+                    await self._stopped.wait()
+                if self._running:
+                    print(f"⏳ Waiting for {len(self._running)} running engagements")
+                    await asyncio.gather(*self._running, return_exceptions=True)
+        finally:
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection: read a request line, stream events back, close."""
+        def send(event: Dict[str, Any]):
+            if not writer.is_closing():
+                writer.write((json.dumps(event, default=str) + "\n").encode('utf-8'))
+
+        try:
+            try:
+                message = json.loads(await reader.readline() or b"{}")
+            except ValueError as e:
+                send({"event": "error", "error": f"Invalid request: {e}"})
+                return
+            command = message.get("command")
+            if command == "engage":
+                task = asyncio.current_task()
+                self._running.add(task)
+                try:
+                    await self._engage(message, send, reader)
+                finally:
+                    self._running.discard(task)
+            elif command == "status":
+                send({"event": "done", "result": self.status()})
+            elif command == "stop":
+                send({"event": "done", "result": {"stopping": True, "running": len(self._running)}})
+                self._stopped.set()
+            else:
+                send({"event": "error", "error": f"Unknown command: {command}"})
+            await writer.drain()
+        except ConnectionError:
+            pass  # The client went away; a finished engagement's artifacts are saved regardless
+        finally:
+            writer.close()
+
+    async def _engage(self, message: Dict[str, Any], send: Callable[[Dict[str, Any]], None],
+                      reader: asyncio.StreamReader):
+        """Run one engagement with the warm resources, streaming its prints to the client.
+
+        The engagement is cancelled (queued or running) when the client disconnects.
+        """
+        from cancellation import CancellationToken
+        error = engagement_errors(message) or ("Daemon is stopping" if self._stopped.is_set() else None)
+        if error:
+            send({"event": "error", "error": error})
+            return
+
+        cancellation = CancellationToken()
+        watcher = asyncio.ensure_future(self._cancel_on_disconnect(reader, cancellation, message["company"]))
+        try:
+            await self._run_engagement(message, send, cancellation)
+        finally:
+            watcher.cancel()
+
+    async def _cancel_on_disconnect(self, reader: asyncio.StreamReader, cancellation: Any, company: str):
+        """Cancel an engagement once its client closes the connection (Ctrl-C, lost connection)."""
+        try:
+            while await reader.read(4096):
+                pass  # Clients send nothing after the request; read until EOF
+        except ConnectionError:
+            pass
+        if not cancellation.cancelled:
+            print(f"🔌 Client of the {company} engagement disconnected; cancelling it")
+            cancellation.cancel("client disconnected")
+
+    async def _run_engagement(self, message: Dict[str, Any], send: Callable[[Dict[str, Any]], None],
+                              cancellation: Any):
+        if self._slots.locked():
+            send({"event": "progress", "message": f"⏳ Queued behind {self.engagements['active']} running engagements"})
+        self.engagements["queued"] += 1
+        async with self._slots:
+            self.engagements["queued"] -= 1
+            self.engagements["active"] += 1
+            try:
+                cancellation.check()  # The client left while the engagement was queued
+                with progress_to(send):
+                    result = await run_engagement(self.resources, message, cancellation)
+            except Exception as e:
+                self.engagements["failed"] += 1
+                send({"event": "error", "error": str(e)})
+            else:
+                self.engagements["served"] += 1
+                send({"event": "done", "result": result})
+            finally:
+                self.engagements["active"] -= 1
+
+    def status(self) -> Dict[str, Any]:
+        """Uptime, engagement counts and what is currently warm."""
+        from single_flight import SingleFlight
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "max_concurrent_engagements": self.max_concurrent,
+            "engagements": dict(self.engagements),
+            "warm": self.resources.summary(),
+            "single_flight": SingleFlight.shared().summary()
+        }
+
+def main():
+    """Start, query or stop the daemon."""
+    parser = argparse.ArgumentParser(description="Warm daemon that runs consulting engagements submitted with --daemon")
+    parser.add_argument("command", choices=["start", "status", "stop"])
+    parser.add_argument("--socket", help="Socket path (default: daemon.socket_path in agent_prompts.yaml)")
+    parser.add_argument("--api-key", help="OpenAI API key (optional, can use OPENAI_API_KEY env var)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus /metrics on this port (default: metrics.daemon_port)")
+    args = parser.parse_args()
+
+    path = Path(args.socket) if args.socket else socket_path()
+    try:
+        if args.command == "start":
+            api_key = args.api_key or os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise DaemonError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it as a parameter.")
+            from prompt_manager import PromptManager
+            prompt_manager = PromptManager()
+            config = prompt_manager.get_daemon_config()
+            daemon = ConsultingDaemon(api_key, path, int(config.get('max_concurrent_engagements', 2)))
+            daemon.resources.client  # Pay for the SDK import and client setup once, before the first engagement
+            metrics_config = prompt_manager.get_metrics_config()
+            metrics_port = args.metrics_port or metrics_config.get('daemon_port')
+            if metrics_port:
+                from metrics import serve_metrics
+                serve_metrics(metrics_config.get('host', '127.0.0.1'), int(metrics_port))
+                print(f"📈 Metrics on http://{metrics_config.get('host', '127.0.0.1')}:{metrics_port}/metrics")
+            log_file = configure_logging(prompt_manager.get_logging_config())
+            if log_file:
+                print(f"📜 Structured log: {log_file}")
+            asyncio.run(daemon.serve())
+            print("👋 Daemon stopped")
+        elif args.command == "status":
+            print(json.dumps(request({"command": "status"}, path), indent=2))
+        else:
+            result = request({"command": "stop"}, path)
+            print(f"🛑 Daemon stopping after {result['running']} running engagements finish")
+    except DaemonError as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n👋 Daemon interrupted")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Latency Tracking and Hedged Requests for the Consulting Team
+Keeps a rolling per-role latency histogram on disk and fires a duplicate
+request when a call runs past the tail latency observed for its role
+"""
+
+import json
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple
+from dataclasses import dataclass
+from artifact_io import atomic_write_json
+from structured_logging import log_event
+
+@dataclass
+class HedgePolicy:
+    """Configuration for hedged requests."""
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20
+    max_hedge_ratio: float = 0.1
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "HedgePolicy":
+        """Build a policy from the `latency.hedging` section of the prompt config."""
+        return cls(
+            enabled=bool(config.get('enabled', False)),
+            percentile=float(config.get('percentile', 95)),
+            min_samples=int(config.get('min_samples', 20)),
+            max_hedge_ratio=float(config.get('max_hedge_ratio', 0.1))
+        )
+
+class LatencyHistogram:
+    """Rolling window of call latencies per agent role, persisted across runs."""
+
+    def __init__(self, history_file: Path, window: int = 200):
+        self.history_file = Path(history_file)
+        self.window = window
+        self.samples: Dict[str, List[float]] = self._load()
+
+    def _load(self) -> Dict[str, List[float]]:
+        """Load previously recorded samples, ignoring a missing or corrupt file."""
+        if not self.history_file.exists():
+            return {}
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {role: [float(s) for s in samples][-self.window:] for role, samples in data.items()}
+        except (IOError, ValueError) as e:
+            log_event("latency.history_unreadable", f"Warning: Could not read latency history {self.history_file}: {e}",
+                      logging.WARNING, path=str(self.history_file), error=str(e))
+            return {}
+
+    def record(self, role: str, seconds: float):
+        """Record one observed latency for a role."""
+        samples = self.samples.setdefault(role, [])
+        samples.append(round(seconds, 3))
+        if len(samples) > self.window:
+            del samples[:len(samples) - self.window]
+
+    def count(self, role: str) -> int:
+        """Number of samples currently held for a role."""
+        return len(self.samples.get(role, []))
+
+    def percentile(self, role: str, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the role's latencies, or None without samples."""
+        samples = sorted(self.samples.get(role, []))
+        if not samples:
+            return None
+        rank = max(int(-(-pct * len(samples) // 100)), 1)
+        return samples[min(rank, len(samples)) - 1]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 and sample count for every tracked role."""
+        return {
+            role: {
+                'count': len(samples),
+                'p50': self.percentile(role, 50),
+                'p95': self.percentile(role, 95),
+                'p99': self.percentile(role, 99)
+            }
+            for role, samples in self.samples.items() if samples
+        }
+
+    def save(self):
+        """Persist the histogram so later runs start with warm statistics."""
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.history_file, self.samples)
+
+class HedgedCaller:
+    """Runs LLM calls with a deadline and, when enabled, a hedged duplicate past the role's tail latency."""
+
+    def __init__(self, histogram: LatencyHistogram, policy: Optional[HedgePolicy] = None):
+        self.histogram = histogram
+        self.policy = policy or HedgePolicy()
+        self.calls = 0
+        self.hedges = 0
+
+    def hedge_delay(self, role: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for this role, or None if hedging does not apply."""
+        if not self.policy.enabled or self.histogram.count(role) < self.policy.min_samples:
+            return None
+        return self.histogram.percentile(role, self.policy.percentile)
+
+    def _hedge_allowed(self) -> bool:
+        """Check the extra-spend cap: hedged duplicates stay below a fraction of all calls."""
+        return self.hedges < self.policy.max_hedge_ratio * self.calls
+
+    async def call(self, role: str, make_call: Callable[[], Awaitable[Any]],
+                   timeout: Optional[float] = None,
+                   may_hedge: Optional[Callable[[], bool]] = None) -> Tuple[Any, Dict[str, Any]]:
+        """Run `make_call`, hedging it if it passes the role's tail latency.
+
+        Args:
+            role: Agent role the call is made for
+            make_call: Factory returning a fresh awaitable for each attempt
+            timeout: Overall deadline in seconds, None for no deadline
+            may_hedge: Asked before a duplicate is fired; returning False skips it (e.g. no budget left for it)
+
+        Returns:
+            Tuple of the first successful result and call statistics
+
+        The role's histogram gets the first attempt's latency, censored at the elapsed time when a
+        hedge wins or the deadline passes, and the winning hedge's own latency.
+
+        Raises:
+            asyncio.TimeoutError: If no attempt finished before the deadline
+        """
+        self.calls += 1
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(make_call())]
+        hedged = False
+        hedge_start = start
+
+        try:
+            delay = self.hedge_delay(role)
+            if delay is not None and (timeout is None or delay < timeout):
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._hedge_allowed() and (may_hedge is None or may_hedge()):
+                    self.hedges += 1
+                    hedged = True
+                    hedge_start = time.monotonic()
+                    tasks.append(asyncio.ensure_future(make_call()))
+
+            result, winner = await self._first_success(tasks, start, timeout, role)
+        except asyncio.TimeoutError:
+            # Censored at the deadline: the call took at least this long, and leaving it out would bias the tail low
+            self.histogram.record(role, time.monotonic() - start)
+            raise
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        elapsed = time.monotonic() - start
+        # The first attempt's time; if the hedge beat it, censored at `elapsed` (it was still running)
+        self.histogram.record(role, elapsed)
+        if winner > 0:
+            self.histogram.record(role, elapsed - (hedge_start - start))
+        return result, {
+            'latency_seconds': round(elapsed, 3),
+            'hedged': hedged,
+            'hedge_won': hedged and winner > 0
+        }
+
+    async def _first_success(self, tasks: List["asyncio.Future"], start: float,
+                             timeout: Optional[float], role: str) -> Tuple[Any, int]:
+        """Wait for the first attempt that succeeds; re-raise the last error if all fail."""
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = None if timeout is None else timeout - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), tasks.index(task)
+                error = task.exception()
+        if pending or error is None:
+            raise asyncio.TimeoutError(f"{role} call exceeded {timeout}s timeout")
+        raise error
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Load Generator for the Consulting HTTP Service
+Submits engagements at a fixed concurrency, follows each one's event stream to
+completion and reports submitted-to-completed latency percentiles (per priority
+class), throughput and 429 rejections. Without --url it starts a service on the stub
+backend in-process
+
+Usage:
+    python load_generator.py --jobs 40 --concurrency 8 --workers 4
+    python load_generator.py --url http://127.0.0.1:8080 --jobs 10
+    python load_generator.py --jobs 40 --interactive-every 5   # 1 in 5 interactive, the rest bulk
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from token_budget import nearest_rank
+
+@dataclass
+class JobTiming:
+    """Outcome of one submitted engagement."""
+    status: str
+    submitted_at: float
+    completed_at: float
+    rejections: int = 0
+    priority_class: Optional[str] = None
+
+    @property
+    def latency(self) -> float:
+        return self.completed_at - self.submitted_at
+
+def submit(url: str, engagement: Dict[str, Any], max_wait: float) -> Tuple[Dict[str, Any], int, float]:
+    """POST an engagement, retrying after 429 responses (at most a second apart) until accepted.
+
+    Returns:
+        The accepted job, the number of 429 responses and the time it was accepted
+    """
+    rejections = 0
+    deadline = time.time() + max_wait
+    body = json.dumps(engagement).encode('utf-8')
+    while True:
+        request = urllib.request.Request(f"{url}/engagements", data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.load(response), rejections, time.time()
+        except urllib.error.HTTPError as e:
+            if e.code != 429 or time.time() > deadline:
+                raise
+            rejections += 1
+            time.sleep(min(float(e.headers.get("Retry-After", 1)), 1.0))
+
+def wait_for_completion(url: str, job_id: str, timeout: float) -> Dict[str, Any]:
+    """Follow the job's event stream until its final status event."""
+    with urllib.request.urlopen(f"{url}/engagements/{job_id}/events", timeout=timeout) as stream:
+        event = None
+        for raw in stream:
+            line = raw.decode('utf-8').rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "status":
+                return json.loads(line[len("data: "):])
+    raise RuntimeError(f"Event stream for {job_id} ended without a final status")
+
+def run_job(url: str, index: int, deliverables: Optional[List[str]], timeout: float,
+            priority_class: Optional[str] = None) -> JobTiming:
+    """Submit one engagement and wait for it to finish."""
+    engagement = {"company": f"Load Test {index}", "brief": "Load test engagement", "deliverables": deliverables}
+    if priority_class:
+        engagement["team_options"] = {"priority": priority_class}
+    job, rejections, accepted_at = submit(url, engagement, timeout)
+    final = wait_for_completion(url, job["job_id"], timeout)
+    return JobTiming(final["status"], accepted_at, time.time(), rejections, priority_class)
+
+def priority_of(index: int, interactive_every: Optional[int]) -> Optional[str]:
+    """Every Nth job is interactive and the others bulk; without N, jobs use the service default."""
+    if not interactive_every:
+        return None
+    return "interactive" if index % interactive_every == interactive_every - 1 else "bulk"
+
+def percentiles(timings: List[JobTiming]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max submitted-to-completed latency in seconds."""
+    latencies = [timing.latency for timing in timings]
+    stats: Dict[str, Optional[float]] = {f"p{pct}": nearest_rank(latencies, pct) for pct in (50, 95, 99)}
+    stats["max"] = max(latencies, default=None)
+    return stats
+
+def format_results(timings: List[JobTiming], errors: List[str], elapsed: float,
+                   scheduler: Optional[Dict[str, Any]] = None) -> str:
+    """Render a load test summary as markdown, with the service's call queue waits when given."""
+    by_status: Dict[str, int] = {}
+    by_class: Dict[str, List[JobTiming]] = {"all": timings}
+    for timing in timings:
+        by_status[timing.status] = by_status.get(timing.status, 0) + 1
+        if timing.priority_class:
+            by_class.setdefault(timing.priority_class, []).append(timing)
+    lines = [
+        "## Load Test: Submitted-to-Completed Latency",
+        "",
+        "| Class | Jobs | p50 | p95 | p99 | max |",
+        "|---|---:|---:|---:|---:|---:|"
+    ]
+    for name, class_timings in by_class.items():
+        stats = percentiles(class_timings)
+        lines.append(f"| {name} | {len(class_timings)} | " + " | ".join(
+            f"{stats[key]:.2f}s" if stats[key] is not None else "-" for key in ("p50", "p95", "p99", "max")) + " |")
+    lines += [
+        "",
+        f"- Jobs: {len(timings)} finished ({', '.join(f'{n} {s}' for s, n in sorted(by_status.items())) or 'none'}), "
+        f"{len(errors)} errors",
+        f"- Throughput: {len(timings) / elapsed:.2f} jobs/s over {elapsed:.1f}s",
+        f"- 429 responses: {sum(timing.rejections for timing in timings)}"
+    ]
+    lines.extend(f"- ❌ {error}" for error in errors[:5])
+    if scheduler and scheduler.get("classes"):
+        lines += ["", "### LLM Call Queue Wait (service scheduler)", "",
+                  "| Class | Calls | p50 | p95 | max |", "|---|---:|---:|---:|---:|"]
+        for name, stats in scheduler["classes"].items():
+            lines.append(f"| {name} | {stats['calls']} | " + " | ".join(
+                f"{stats[key]:.3f}s" if stats[key] is not None else "-" for key in ("wait_p50", "wait_p95", "wait_max"))
+                + " |")
+        lines += ["", f"- Queued bulk calls overtaken: {scheduler.get('preemptions', 0)}"]
+    return "\n".join(lines) + "\n"
+
+def format_log_volume(engagements: int) -> str:
+    """Structured log records, bytes and drops of an in-process run, in total and per engagement."""
+    import metrics
+    records = sum(value for _, _, value in metrics.LOG_RECORDS.samples())
+    written = metrics.LOG_BYTES.value()
+    per_engagement = max(engagements, 1)
+    return (f"📜 Structured log: {records:.0f} records ({records / per_engagement:.1f} per engagement), "
+            f"{written / 1e3:.1f} KB ({written / per_engagement / 1e3:.1f} KB per engagement), "
+            f"{metrics.LOG_DROPPED.value():.0f} dropped")
+
+def main():
+    """Run the load test and print its summary."""
+    parser = argparse.ArgumentParser(description="Load generator for the consulting HTTP service")
+    parser.add_argument("--url", help="Service to load (default: start one on the stub backend in-process)")
+    parser.add_argument("--jobs", type=int, default=20, help="Engagements to submit (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=5, help="Clients submitting at once (default: 5)")
+    parser.add_argument("--deliverables", nargs="+", help="Deliverables per engagement (default: all)")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for one job (default: 600)")
+    parser.add_argument("--workers", type=int, help="Workers of the in-process service (default: service.workers)")
+    parser.add_argument("--max-queue-depth", type=int, help="Queue limit of the in-process service")
+    parser.add_argument("--interactive-every", type=int,
+                        help="Submit every Nth job as interactive and the rest as bulk (default: service default class)")
+    args = parser.parse_args()
+
+    service = None
+    url = args.url.rstrip("/") if args.url else None
+    with tempfile.TemporaryDirectory() as output_dir:
+        if url is None:
+            from service import build_service, serve_in_thread
+            from prompt_manager import PromptManager
+            from structured_logging import configure_logging
+            service, _ = build_service(output_dir, args.workers, args.max_queue_depth, stub_backend=True)
+            # Measure the structured log the engagements produce; progress goes to job events, not the console
+            configure_logging(dict(PromptManager().get_logging_config(), console=False), Path(output_dir))
+            thread = serve_in_thread(service)
+            url = f"http://127.0.0.1:{service.port}"
+            print(f"🧪 Stub-backend service on {url} ({service.workers} workers, queue limit {service.max_queue_depth})")
+
+        print(f"🚀 Submitting {args.jobs} engagements with {args.concurrency} concurrent clients")
+        timings, errors = [], []
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(run_job, url, i, args.deliverables, args.timeout,
+                                   priority_of(i, args.interactive_every)) for i in range(args.jobs)]
+            for future in futures:
+                try:
+                    timings.append(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+        elapsed = time.time() - start
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=30) as response:
+                scheduler = json.load(response).get("scheduler")
+        except (urllib.error.URLError, ValueError):
+            scheduler = None
+
+        if service is not None:
+            service.stop()
+            thread.join(timeout=30)
+            from structured_logging import shutdown_logging
+            shutdown_logging()
+    print(format_results(timings, errors, elapsed, scheduler))
+    if service is not None:
+        print(format_log_volume(len(timings)))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Event-Loop Health and Memory Instrumentation (debug mode)
+A watchdog that reports callbacks blocking the event loop past a threshold, with the blocking
+stack and the agent it ran for, and tracemalloc snapshots at phase boundaries reporting each
+phase's peak memory and top allocators
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Iterator
+
+@dataclass
+class LoopStall:
+    """A stretch of time the event loop could not run callbacks."""
+    seconds: float
+    started: float  # time.time() when the loop stopped responding
+    stack: List[str] = field(default_factory=list)  # Innermost frames last; empty if not sampled in time
+    agent: Optional[str] = None
+    company: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seconds": round(self.seconds, 4), "started": self.started, "agent": self.agent,
+                "company": self.company, "stack": self.stack}
+
+def _attribution(frame) -> Dict[str, Optional[str]]:
+    """Agent role and company of the innermost agent or team method on a stack."""
+    found: Dict[str, Optional[str]] = {"agent": None, "company": None}
+    while frame is not None and not (found["agent"] and found["company"]):
+        owner = frame.f_locals.get("self")
+        role = getattr(owner, "role", None)
+        if found["agent"] is None and role is not None:
+            found["agent"] = getattr(role, "value", None) or str(role)
+        if found["company"] is None and isinstance(getattr(owner, "company_name", None), str):
+            found["company"] = owner.company_name
+        frame = frame.f_back
+    return found
+
+class LoopWatchdog:
+    """Detects callbacks that block an event loop longer than `threshold_seconds`.
+
+    A heartbeat callback on the loop records when it last ran; a watchdog thread samples the
+    loop thread's stack once a heartbeat is overdue, so the report shows the code that was
+    blocking rather than only the callback that ran late. One watchdog serves every engagement
+    on a loop (see `acquire`).
+    """
+
+    _by_loop: Dict[asyncio.AbstractEventLoop, "LoopWatchdog"] = {}
+    _by_loop_lock = threading.Lock()
+
+    def __init__(self, threshold_seconds: float = 0.1, stack_depth: int = 12, max_stalls: int = 1000):
+        self.threshold = threshold_seconds
+        self.stack_depth = stack_depth
+        self.max_stalls = max_stalls
+        self.stalls: List[LoopStall] = []
+        self.users = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._sample: Optional[LoopStall] = None  # Stack sampled during the current stall
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._suspended = 0
+        self._resumed_at = 0.0
+
+    @classmethod
+    def acquire(cls, threshold_seconds: float = 0.1, **kwargs) -> "LoopWatchdog":
+        """The running loop's watchdog, started on first use; pair with `release`."""
+        loop = asyncio.get_running_loop()
+        with cls._by_loop_lock:
+            watchdog = cls._by_loop.get(loop)
+            if watchdog is None:
+                watchdog = cls._by_loop[loop] = cls(threshold_seconds, **kwargs)
+                watchdog.start()
+            watchdog.users += 1
+        return watchdog
+
+    def release(self):
+        """Stop the watchdog once the last engagement using it is done."""
+        with self._by_loop_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            self._by_loop.pop(self._loop, None)
+        self.stop()
+
+    @property
+    def _interval(self) -> float:
+        return self.threshold / 4
+
+    def start(self):
+        """Start watching the running loop (call from the loop's thread)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        # asyncio's own debug mode (PYTHONASYNCIODEBUG=1) then warns at the same threshold
+        self._loop.slow_callback_duration = self.threshold
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self._interval, self._beat)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _beat(self):
+        """Heartbeat on the loop: a late beat means the loop was blocked for the delay."""
+        now = time.monotonic()
+        late = now - self._last_beat - self._interval
+        sample, self._sample = self._sample, None
+        if late > self.threshold and not self._suspended and self._resumed_at <= self._last_beat:
+            stall = sample or LoopStall(0.0, time.time() - late)
+            stall.seconds = late
+            if len(self.stalls) < self.max_stalls:
+                self.stalls.append(stall)
+            where = " / ".join(part for part in (stall.company, stall.agent) if part) or "unattributed"
+            print(f"🐢 Event loop blocked for {late * 1000:.0f}ms ({where})"
+                  + (f" at {stall.stack[-1].strip()}" if stall.stack else ""))
+        self._last_beat = now
+        if not self._stop.is_set():
+            self._handle = self._loop.call_later(self._interval, self._beat)
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Do not report a stall caused by the block (such as the memory profiler's own snapshots)."""
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+            self._resumed_at = time.monotonic()
+
+    def _watch(self):
+        """Watchdog thread: sample the loop thread's stack once per stall."""
+        while not self._stop.wait(self._interval):
+            overdue = time.monotonic() - self._last_beat - self._interval
+            if overdue <= self.threshold or self._sample is not None or self._suspended:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_list(traceback.extract_stack(frame, limit=self.stack_depth))
+            self._sample = LoopStall(overdue, time.time() - overdue, [line.rstrip() for line in stack],
+                                     **_attribution(frame))
+
+    def stalls_since(self, started: float) -> List[LoopStall]:
+        """Stalls that began at or after `started` (time.time())."""
+        return [stall for stall in self.stalls if stall.started >= started]
+
+@dataclass
+class PhaseMemory:
+    """Memory of one phase: traced bytes at its end, its peak, and the lines that grew most."""
+    phase: str
+    current_bytes: int
+    peak_bytes: int
+    growth_bytes: int
+    top_allocators: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"phase": self.phase, "current_bytes": self.current_bytes, "peak_bytes": self.peak_bytes,
+                "growth_bytes": self.growth_bytes, "top_allocators": self.top_allocators}
+
+class MemoryProfiler:
+    """tracemalloc snapshots around each phase of an engagement.
+
+    tracemalloc is process-wide: with concurrent engagements each phase's peak and allocators
+    include the others' allocations. Tracing slows allocation down noticeably, so this is for
+    debug runs only.
+    """
+
+    # Allocations of the profiler itself and of imports are noise in a phase's top list
+    IGNORED = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+               "<unknown>")
+
+    def __init__(self, top: int = 10, frames: int = 1, watchdog: Optional[LoopWatchdog] = None):
+        self.top = top
+        self.frames = frames
+        self.watchdog = watchdog  # Snapshots block the loop; its watchdog should not report them
+        self.phases: List[PhaseMemory] = []
+        self._started = False
+
+    # Profilers sharing the process's tracing; the last one to stop ends tracing it started
+    _users = 0
+    _started_tracing = False
+    _users_lock = threading.Lock()
+
+    def start(self):
+        with self._users_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                MemoryProfiler._started_tracing = True
+            MemoryProfiler._users += 1
+            self._started = True
+
+    def stop(self):
+        with self._users_lock:
+            if not self._started:
+                return
+            self._started = False
+            MemoryProfiler._users -= 1
+            if MemoryProfiler._users == 0 and MemoryProfiler._started_tracing:
+                tracemalloc.stop()
+                MemoryProfiler._started_tracing = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        with self.watchdog.suspended() if self.watchdog is not None else nullcontext():
+            return tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, pattern) for pattern in self.IGNORED])
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Measure the block; yields a dict that holds the phase's PhaseMemory under "memory" afterwards."""
+        result: Dict[str, Any] = {}
+        if not tracemalloc.is_tracing():
+            yield result
+            return
+        before = self._snapshot()
+        tracemalloc.reset_peak()
+        try:
+            yield result
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot()
+            with self.watchdog.suspended() if self.watchdog is not None else nullcontext():
+                stats = after.compare_to(before, "lineno")
+            memory = PhaseMemory(name, current, peak, sum(stat.size_diff for stat in stats), [
+                {"where": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in [stat for stat in stats if stat.size_diff > 0][:self.top]])
+            self.phases.append(memory)
+            result["memory"] = memory
+
+def format_phase_memory(memory: PhaseMemory, lines: int = 3) -> str:
+    """A short summary of a phase's memory for the progress output."""
+    summary = [f"🧠 {memory.phase}: peak {memory.peak_bytes / 1e6:.1f} MB, "
+               f"{memory.growth_bytes / 1e6:+.1f} MB retained"]
+    for allocator in memory.top_allocators[:lines]:
+        summary.append(f"     {allocator['size_diff'] / 1e3:+.0f} KB  {allocator['where']}")
+    return "\n".join(summary)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Live Metrics for Long-Running Deployments
+Prometheus counters, gauges and histograms for LLM calls, tokens, latency, cache hits,
+retries, errors, queues and bytes written, rendered in the text exposition format on
+the service's /metrics endpoint (or `serve_metrics` for daemons and batch workers)
+
+Updates take no lock (past a thread's first update of a metric): each thread adds into its
+own cells and a scrape sums the cells of every thread, so the hot call path only pays for
+a dict update.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Call latencies range from sub-second reviews to multi-minute deliverables
+LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+ENGAGEMENT_BUCKETS = (10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    """A named metric with labels whose values are kept in per-thread cells."""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._cells: List[Dict[Tuple[str, ...], Any]] = []
+        self._cells_lock = threading.Lock()  # Taken once per thread, when it first updates the metric
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _cell(self) -> Dict[Tuple[str, ...], Any]:
+        """This thread's cell; only this thread writes to it."""
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._local.cell = {}
+            with self._cells_lock:
+                self._cells.append(cell)
+        return cell
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[Any, ...]:
+        try:
+            key = tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            key = None
+        if key is None or len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return key
+
+    def _cell_items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        """Every thread's (labels, value) entries; copying a dict's items is atomic under the GIL."""
+        with self._cells_lock:
+            cells = list(self._cells)
+        return [item for cell in cells for item in list(cell.items())]
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(sample name, formatted labels, value) rows for the exposition format."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """A value that only goes up, such as calls made or tokens billed."""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        cell = self._cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        return sum(value for item_key, value in self._cell_items() if item_key == key)
+
+    def _totals(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for key, value in self._cell_items():
+            totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, _format_labels(self.labelnames, key), value)
+                for key, value in sorted(self._totals().items())]
+
+class Gauge(Counter):
+    """A value that goes up and down, either by inc/dec or read from a callback at scrape time."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        cell = self._cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def track(self, callback: Callable[[], float], **labels):
+        """Read the value for these labels from `callback` on every scrape (replacing an earlier one)."""
+        self._callbacks[self._key(labels)] = callback
+
+    def _totals(self) -> Dict[Tuple[str, ...], float]:
+        totals = super()._totals()
+        for key, callback in list(self._callbacks.items()):
+            totals[key] = totals.get(key, 0) + float(callback())
+        return totals
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS, registry: Optional["MetricsRegistry"] = None):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        cell = self._cell()
+        key = self._key(labels)
+        entry = cell.get(key)
+        if entry is None:
+            # Per-bucket counts (not cumulative), then the sum of the observations
+            entry = cell[key] = [0] * len(self.buckets) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[index] += 1
+                break
+        entry[-1] += value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        totals: Dict[Tuple[str, ...], List[float]] = {}
+        for key, entry in self._cell_items():
+            entry = list(entry)
+            total = totals.setdefault(key, [0] * len(entry))
+            for index, value in enumerate(entry):
+                total[index] += value
+        samples = []
+        for key, total in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, total):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, le), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total[-1]))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), cumulative))
+        return samples
+
+class MetricsRegistry:
+    """The metrics of a process, rendered together for a scrape."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUESTS = Counter("consulting_llm_requests_total", "LLM call attempts by agent role, model and outcome",
+                       ("role", "model", "outcome"))
+LLM_TOKENS = Counter("consulting_llm_tokens_total", "Tokens billed by agent role, model and kind "
+                     "(input, output, cache_creation_input, cache_read_input)", ("role", "model", "kind"))
+LLM_LATENCY = Histogram("consulting_llm_call_duration_seconds", "LLM call attempt latency by agent role",
+                        ("role",), LATENCY_BUCKETS)
+LLM_IN_FLIGHT = Gauge("consulting_llm_in_flight", "LLM calls sent and not yet answered")
+LLM_RETRIES = Counter("consulting_llm_retries_total", "LLM call attempts retried after an error, by agent role",
+                      ("role",))
+LLM_ERRORS = Counter("consulting_llm_errors_total", "Failed LLM call attempts by agent role and error class "
+                     "(rate_limit counts 429 responses)", ("role", "error_class"))
+CACHE_HITS = Counter("consulting_cache_hits_total", "Calls served partly or wholly from a cache: "
+                     "prompt (cached prefix read) or single_flight (coalesced with an identical call)", ("cache",))
+SCHEDULER_QUEUED = Gauge("consulting_scheduler_queued_calls", "LLM calls waiting for a call slot, by priority class",
+                         ("priority_class",))
+QUEUE_DEPTH = Gauge("consulting_queue_depth", "Work waiting to start: service jobs or batch engagements", ("queue",))
+BYTES_WRITTEN = Counter("consulting_bytes_written_total", "Bytes of artifacts written, by file type", ("kind",))
+LOG_RECORDS = Counter("consulting_log_records_total", "Structured log records by level", ("level",))
+LOG_BYTES = Counter("consulting_log_bytes_total", "Bytes of JSON log lines written")
+LOG_DROPPED = Counter("consulting_log_dropped_total", "Log records dropped because the log queue was full")
+ENGAGEMENTS = Counter("consulting_engagements_total", "Finished engagements by status", ("status",))
+ENGAGEMENT_DURATION = Histogram("consulting_engagement_duration_seconds", "Engagement wall time", (),
+                                ENGAGEMENT_BUCKETS)
+
+def record_call(role: str, model: str, seconds: Optional[float] = None,
+                token_counts: Optional[Dict[str, int]] = None, error_class: Optional[str] = None):
+    """Count one LLM call attempt: its outcome, and for an answered call its latency and tokens."""
+    LLM_REQUESTS.inc(role=role, model=model, outcome="error" if error_class else "ok")
+    if error_class:
+        LLM_ERRORS.inc(role=role, error_class=error_class)
+        return
+    if seconds is not None:
+        LLM_LATENCY.observe(seconds, role=role)
+    for key, count in (token_counts or {}).items():
+        if count:
+            LLM_TOKENS.inc(count, role=role, model=model, kind=key[:-len("_tokens")])
+    if (token_counts or {}).get("cache_read_input_tokens"):
+        CACHE_HITS.inc(cache="prompt")
+
+def serve_metrics(host: str = "127.0.0.1", port: int = 9464, registry: Optional[MetricsRegistry] = None):
+    """Serve GET /metrics from a background thread (for processes without an HTTP front end).
+
+    Returns:
+        The HTTP server; its bound port is `server.server_address[1]`
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Scrapes every few seconds would drown the progress output
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
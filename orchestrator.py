@@ -12,10 +12,10 @@ Usage:
 import os
 import argparse
 from pathlib import Path
-from anthropic import Anthropic
 from datetime import datetime
 import json
 
+
 class ConsultingOrchestrator:
     """
     Orchestrates multi-agent consulting analysis using Claude's subagent system.
@@ -28,7 +28,7 @@ class ConsultingOrchestrator:
     - Phase 5: Senior Partner Review (depends on Phase 4)
     """
 
-    def __init__(self, api_key: str, company_name: str, brief: str):
+    def __init__(self, api_key: str, company_name: str, brief: str, client=None):
         """
         Initialize the orchestrator.
 
@@ -36,8 +36,14 @@ class ConsultingOrchestrator:
             api_key: Anthropic API key
             company_name: Name of company being analyzed
             brief: Strategic analysis brief/objectives
+            client: Messages API client to use instead of one built from api_key (e.g. stub_backend)
         """
-        self.client = Anthropic(api_key=api_key)
+        from prompt_manager import PromptManager
+        if client is None:
+            from anthropic import Anthropic  # deferred so --help never pays for the SDK import
+            client = Anthropic(api_key=api_key)
+        self.client = client
+        self.prompt_manager = PromptManager()
         self.company_name = company_name
         self.brief = brief
         self.project_dir = Path(f"consulting_projects/{company_name}")
@@ -66,47 +72,70 @@ class ConsultingOrchestrator:
         print(f"Project Directory: {self.project_dir}")
         print(f"{'='*80}\n")
 
+        # Deferred like the SDK import, so --help stays fast
+        from artifact_io import atomic_write_text, BackgroundAppender
+        from progress_dashboard import ProgressDashboard
+        from spend import PriceTable, request_input_tokens, usage_counts
+
         # Create the orchestrator prompt
         orchestrator_prompt = self._build_orchestrator_prompt()
+        request = {
+            "model": "claude-opus-4-20250514",  # Lead orchestrator uses Opus for superior reasoning
+            "max_tokens": 8000,
+            "messages": [{
+                "role": "user",
+                "content": orchestrator_prompt
+            }],
+            # Subagents are auto-discovered from .claude/agents/ directory
+        }
 
         print("📊 Launching Lead Orchestrator Agent (Claude Opus)...\n")
 
+        # The response streams into the execution log as it arrives (tail -f it to read along);
+        # the console shows the dashboard instead of echoing every token
+        orchestrator_output_path = self.project_dir / "orchestrator_execution_log.md"
+        atomic_write_text(orchestrator_output_path,
+                          f"# Orchestrator Execution Log\n\n"
+                          f"**Company:** {self.company_name}\n\n"
+                          f"**Brief:** {self.brief}\n\n"
+                          f"**Started:** {self.metadata['start_time']}\n\n"
+                          f"---\n\n")
+        log = BackgroundAppender(orchestrator_output_path)
+        dashboard = ProgressDashboard.from_config(self.prompt_manager.get_dashboard_config(),
+                                                  PriceTable(self.prompt_manager.get_pricing()))
+        call = dashboard.start(self.company_name, "lead_orchestrator", request["model"], request["max_tokens"],
+                               request_input_tokens(request))
+
         try:
-            # Execute with streaming for real-time progress
-            with self.client.messages.stream(
-                model="claude-opus-4-20250514",  # Lead orchestrator uses Opus for superior reasoning
-                max_tokens=8000,
-                messages=[{
-                    "role": "user",
-                    "content": orchestrator_prompt
-                }],
-                # Subagents are auto-discovered from .claude/agents/ directory
-            ) as stream:
-                # Stream output to console for real-time progress
-                full_response = ""
-                for text in stream.text_stream:
-                    print(text, end="", flush=True)
-                    full_response += text
-
-            final_message = stream.get_final_message()
+            chunks = []
+            try:
+                with dashboard, self.client.messages.stream(**request) as stream:
+                    for text in stream.text_stream:
+                        chunks.append(text)
+                        log.write(text)
+                        call.add_text(text)
+                    final_message = stream.get_final_message()
+                    dashboard.finish(call, usage_counts(getattr(final_message, "usage", None)))
+            except BaseException:
+                dashboard.finish(call, failed=True)
+                raise
+            finally:
+                log.close()
+            full_response = "".join(chunks)
 
             # Update metadata
             self.metadata["end_time"] = datetime.now().isoformat()
             self.metadata["status"] = "completed"
             self.metadata["output_length"] = len(full_response)
+            self.metadata["output_tokens"] = call.output_tokens
+            self.metadata["cost_usd"] = round(call.spend_usd, 6)
 
             # Save metadata
             self._save_metadata()
 
-            # Save final orchestrator output
-            orchestrator_output_path = self.project_dir / "orchestrator_execution_log.md"
-            with open(orchestrator_output_path, 'w', encoding='utf-8') as f:
-                f.write(f"# Orchestrator Execution Log\n\n")
-                f.write(f"**Company:** {self.company_name}\n\n")
-                f.write(f"**Brief:** {self.brief}\n\n")
-                f.write(f"**Execution Time:** {self.metadata['start_time']} to {self.metadata['end_time']}\n\n")
-                f.write(f"---\n\n")
-                f.write(full_response)
+            # Close the execution log
+            with open(orchestrator_output_path, 'a', encoding='utf-8') as f:
+                f.write(f"\n\n---\n\n**Completed:** {self.metadata['end_time']}\n")
 
             print(f"\n\n{'='*80}")
             print(f"✅ Analysis Completed Successfully!")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Pre-flight Validation and Dry-run Estimates for Consulting Engagements
+Compiles every prompt template, checks its placeholders against what the engine
+supplies, and estimates tokens, cost and wall time for a planned engagement
+without touching the network
+"""
+
+import string
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from token_budget import estimate_tokens
+
+DEFAULT_PRICING = {"input_per_mtok": 3.0, "output_per_mtok": 15.0}
+
+def template_placeholders(template: str) -> Set[str]:
+    """Names of the placeholders in a str.format template.
+
+    Raises:
+        ValueError: If the template has unbalanced or malformed braces
+    """
+    names = set()
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if field_name is not None:
+            names.add(field_name.split('.')[0].split('[')[0])
+    return names
+
+def check_templates(prompt_manager: Any, supplied: Set[str],
+                    review_supplied: Dict[str, Set[str]]) -> Tuple[List[str], List[str]]:
+    """Check every configured template against the placeholders the engine supplies.
+
+    Args:
+        prompt_manager: Loaded PromptManager
+        supplied: Placeholder names the agents pass to their user prompt templates
+        review_supplied: Placeholder names per map-reduce review stage ("review", "synthesis")
+
+    Returns:
+        Tuple of (errors that would fail a run, warnings)
+    """
+    errors, warnings = [], []
+    templates = [(f"agents.{agent}.user_prompt_template", prompt_manager.get_agent_prompt(agent).user_prompt_template,
+                  supplied) for agent in prompt_manager.list_available_agents()]
+    review_config = prompt_manager.get_review_config()
+    for stage, variables in review_supplied.items():
+        key = f"{stage}_prompt_template"
+        if key in review_config:
+            templates.append((f"senior_partner_review.{key}", review_config[key], variables))
+        elif review_config.get('mode') == 'map_reduce':
+            errors.append(f"senior_partner_review.{key} is missing but mode is map_reduce")
+
+    for name, template, available in templates:
+        try:
+            placeholders = template_placeholders(template)
+        except ValueError as e:
+            errors.append(f"{name} does not compile: {e}")
+            continue
+        for placeholder in sorted(placeholders - available):
+            errors.append(f"{name} uses {{{placeholder}}}, which the engine does not supply "
+                          f"(available: {', '.join(sorted(available))})")
+
+    # `templates:` documents the engine-supplied values; its expressions are never evaluated
+    declared = set(prompt_manager.config.get('templates', {}))
+    for placeholder in sorted(declared - supplied):
+        warnings.append(f"templates.{placeholder} is declared but never supplied by the engine")
+    for placeholder in sorted(supplied - declared):
+        warnings.append(f"{{{placeholder}}} is supplied by the engine but not declared under templates:")
+    return errors, warnings
+
+@dataclass
+class CallEstimate:
+    """Estimated size and duration of one planned LLM call."""
+    name: str
+    input_tokens: int
+    output_tokens: int
+    seconds: float
+    output_source: str = "history"
+
+@dataclass
+class EngagementEstimate:
+    """Dry-run plan: per-call estimates, phase layout and totals."""
+    model: str
+    pricing: Dict[str, float]
+    phases: List[List[str]] = field(default_factory=list)
+    calls: Dict[str, List[CallEstimate]] = field(default_factory=dict)
+    prompts: Dict[str, str] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    def add(self, role: str, call: CallEstimate):
+        self.calls.setdefault(role, []).append(call)
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(call.input_tokens for calls in self.calls.values() for call in calls)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(call.output_tokens for calls in self.calls.values() for call in calls)
+
+    @property
+    def cost(self) -> float:
+        return (self.input_tokens * self.pricing.get('input_per_mtok', 0)
+                + self.output_tokens * self.pricing.get('output_per_mtok', 0)) / 1_000_000
+
+    def agent_seconds(self, role: str) -> float:
+        """Critical-path time of a role's own calls (the main call; reviews overlap other phases)."""
+        calls = self.calls.get(role, [])
+        return calls[0].seconds if calls else 0.0
+
+    @property
+    def wall_seconds(self) -> float:
+        """Phases run one after another; agents within a phase run in parallel."""
+        return sum(max((self.agent_seconds(role) for role in phase), default=0.0) for phase in self.phases)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly view of the estimate."""
+        return {
+            "model": self.model,
+            "phases": self.phases,
+            "calls": {role: [vars(call) for call in calls] for role, calls in self.calls.items()},
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_cost_usd": round(self.cost, 4),
+            "estimated_wall_seconds": round(self.wall_seconds, 1),
+            "errors": self.errors,
+            "warnings": self.warnings
+        }
+
+def estimate_call(name: str, prompt_text: str, extra_input_tokens: int, output_tokens: Optional[int],
+                  max_tokens: int, latency: Optional[float], tokens_per_second: float) -> CallEstimate:
+    """Estimate one call from its rendered prompt, expected output length and latency history.
+
+    Without output history the call is assumed to use its full max_tokens; without latency
+    history its duration is derived from the output length.
+    """
+    source = "history"
+    if output_tokens is None:
+        output_tokens, source = max_tokens, "max_tokens"
+    output_tokens = min(output_tokens, max_tokens)
+    seconds = latency if latency is not None else output_tokens / tokens_per_second
+    return CallEstimate(name, estimate_tokens(prompt_text) + extra_input_tokens, output_tokens,
+                        round(seconds, 1), source)
+
+def format_estimate(estimate: EngagementEstimate) -> str:
+    """Render a dry-run estimate as a markdown summary."""
+    lines = [
+        f"## Dry Run: {estimate.model}",
+        "",
+        "| Call | Input tokens | Output tokens | Output from | Seconds |",
+        "|---|---:|---:|---|---:|"
+    ]
+    for calls in estimate.calls.values():
+        for call in calls:
+            lines.append(f"| {call.name} | {call.input_tokens} | {call.output_tokens} | {call.output_source} | "
+                         f"{call.seconds:g} |")
+    lines.extend([
+        "",
+        f"- Phases: {' -> '.join('[' + ', '.join(phase) + ']' for phase in estimate.phases)}",
+        f"- Tokens: {estimate.input_tokens} input, {estimate.output_tokens} output",
+        f"- Estimated cost: ${estimate.cost:.2f}",
+        f"- Estimated wall time: {estimate.wall_seconds / 60:.1f} min"
+    ])
+    for error in estimate.errors:
+        lines.append(f"- ❌ {error}")
+    for warning in estimate.warnings:
+        lines.append(f"- ⚠️  {warning}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Live Progress Dashboard
+A table of every running engagement and agent call with its streamed tokens, tokens/sec,
+ETA and spend, redrawn at a fixed rate however fast tokens arrive. Uses rich when it is
+installed and stdout is a terminal; otherwise prints a one-line summary every few seconds.
+
+Streams only count their text into the dashboard (no console write per token); rendering
+happens on the refresh thread.
+"""
+
+import sys
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, TextIO
+
+from spend import PriceTable
+
+@dataclass
+class CallProgress:
+    """One agent call on the dashboard."""
+    engagement: str
+    agent: str
+    model: str
+    max_tokens: int
+    started: float
+    input_tokens: int = 0
+    chars: int = 0
+    output_tokens: Optional[int] = None  # Billed count once the call finishes
+    spend_usd: float = 0.0
+    status: str = "running"
+    finished: Optional[float] = None
+
+    def add_text(self, text: str):
+        """Count streamed text (called from the streaming thread; only it writes `chars`).
+
+        A stream that keeps running after its row was closed (a losing hedge) no longer counts.
+        """
+        if self.finished is None:
+            self.chars += len(text)
+
+    def tokens(self, chars_per_token: float) -> int:
+        if self.output_tokens is not None:
+            return self.output_tokens
+        return int(self.chars / chars_per_token)
+
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def rate(self, chars_per_token: float) -> float:
+        elapsed = self.elapsed()
+        return self.tokens(chars_per_token) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, chars_per_token: float) -> Optional[float]:
+        """Seconds until max_tokens at the current rate: an upper bound, as most responses stop earlier."""
+        rate = self.rate(chars_per_token)
+        if self.status != "running" or rate <= 0:
+            return None
+        return max(self.max_tokens - self.tokens(chars_per_token), 0) / rate
+
+class ProgressDashboard:
+    """Running and recently finished agent calls of every engagement in the process.
+
+    Use as a context manager around the work; calls are registered with `start` and closed
+    with `finish`. Safe to update from the event loop and from streaming worker threads.
+    """
+
+    def __init__(self, refresh_per_second: float = 4.0, plain_interval: float = 5.0,
+                 chars_per_token: float = 4.0, keep_finished: int = 5,
+                 prices: Optional[PriceTable] = None, stream: Optional[TextIO] = None):
+        self.refresh_per_second = refresh_per_second
+        self.plain_interval = plain_interval
+        self.chars_per_token = chars_per_token
+        self.keep_finished = keep_finished
+        self.prices = prices or PriceTable()
+        self.stream = stream or sys.stdout
+        self.calls: List[CallProgress] = []
+        self.done = 0
+        self.failed = 0
+        self.done_tokens = 0
+        self.done_spend = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._live = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], prices: Optional[PriceTable] = None, **kwargs) -> "ProgressDashboard":
+        """A dashboard per the `dashboard` section of the prompt config."""
+        return cls(float(config.get('refresh_per_second', 4)), float(config.get('plain_interval_seconds', 5)),
+                   float(config.get('chars_per_token', 4.0)), int(config.get('keep_finished', 5)), prices, **kwargs)
+
+    def start(self, engagement: str, agent: str, model: str, max_tokens: int, input_tokens: int = 0) -> CallProgress:
+        call = CallProgress(engagement, agent, model, int(max_tokens or 0), time.monotonic(), input_tokens)
+        with self._lock:
+            self.calls.append(call)
+        return call
+
+    def finish(self, call: CallProgress, usage_counts: Optional[Dict[str, int]] = None, failed: bool = False):
+        """Close a call with its billed usage (None: keep the streamed estimate)."""
+        spend_usd = self.prices.cost(call.model, **usage_counts) if usage_counts else self.spend(call)
+        with self._lock:
+            # Under the lock, so a snapshot counts the call either as running or in the totals
+            call.finished = time.monotonic()
+            call.status = "failed" if failed else "done"
+            call.spend_usd = spend_usd
+            if usage_counts:
+                call.output_tokens = usage_counts.get("output_tokens")
+                call.input_tokens = usage_counts.get("input_tokens") or call.input_tokens
+            if failed:
+                self.failed += 1
+            else:
+                self.done += 1
+            self.done_tokens += call.tokens(self.chars_per_token)
+            self.done_spend += call.spend_usd
+            finished = [c for c in self.calls if c.status != "running"]
+            for old in finished[:-self.keep_finished] if self.keep_finished else finished:
+                self.calls.remove(old)
+
+    def spend(self, call: CallProgress) -> float:
+        """Spend of a call so far: its final cost, or its prompt plus the tokens streamed."""
+        if call.status != "running":
+            return call.spend_usd
+        return self.prices.cost(call.model, input_tokens=call.input_tokens,
+                                output_tokens=call.tokens(self.chars_per_token))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Rows and totals as plain values (what both renderers show)."""
+        with self._lock:
+            calls = list(self.calls)
+            done, failed, done_tokens, done_spend = self.done, self.failed, self.done_tokens, self.done_spend
+            statuses = [call.status for call in calls]
+        running = [call for call, status in zip(calls, statuses) if status == "running"]
+        rows = [{
+            "engagement": call.engagement, "agent": call.agent, "model": call.model, "status": status,
+            "tokens": call.tokens(self.chars_per_token), "max_tokens": call.max_tokens,
+            "tokens_per_second": call.rate(self.chars_per_token), "eta_seconds": call.eta(self.chars_per_token),
+            "spend_usd": self.spend(call), "elapsed_seconds": call.elapsed()
+        } for call, status in zip(calls, statuses)]
+        return {
+            "rows": rows,
+            "running": len(running),
+            "engagements": len({call.engagement for call in running}),
+            "done": done,
+            "failed": failed,
+            "tokens": done_tokens + sum(row["tokens"] for row in rows if row["status"] == "running"),
+            "tokens_per_second": sum(row["tokens_per_second"] for row in rows if row["status"] == "running"),
+            "spend_usd": done_spend + sum(row["spend_usd"] for row in rows if row["status"] == "running")
+        }
+
+    def summary_line(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        snapshot = snapshot or self.snapshot()
+        return (f"⏱️  {snapshot['running']} calls running in {snapshot['engagements']} engagements, "
+                f"{snapshot['done']} done, {snapshot['failed']} failed | {snapshot['tokens']} tokens "
+                f"({snapshot['tokens_per_second']:.0f}/s) | ${snapshot['spend_usd']:.4f}")
+
+    def render(self) -> Any:
+        """The dashboard as a rich Table."""
+        from rich.table import Table
+        snapshot = self.snapshot()
+        table = Table(title="Consulting engagements", caption=self.summary_line(snapshot), expand=False)
+        for column, justify in (("Engagement", "left"), ("Agent", "left"), ("Model", "left"), ("Tokens", "right"),
+                                ("tok/s", "right"), ("ETA", "right"), ("Spend", "right"), ("Elapsed", "right")):
+            table.add_column(column, justify=justify, no_wrap=True)
+        styles = {"running": None, "done": "green", "failed": "red"}
+        for row in snapshot["rows"]:
+            eta = f"≤{row['eta_seconds']:.0f}s" if row["eta_seconds"] is not None else row["status"]
+            table.add_row(row["engagement"], row["agent"], row["model"], f"{row['tokens']}/{row['max_tokens']}",
+                          f"{row['tokens_per_second']:.0f}", eta, f"${row['spend_usd']:.4f}",
+                          f"{row['elapsed_seconds']:.0f}s", style=styles.get(row["status"]))
+        return table
+
+    def __enter__(self) -> "ProgressDashboard":
+        self._stop.clear()
+        try:
+            from rich.console import Console
+            from rich.live import Live
+        except ImportError:
+            Live = None
+        if Live is not None and self.stream.isatty():
+            # rich redraws on its own thread at the fixed rate, reading the counters via render()
+            self._live = Live(get_renderable=self.render, console=Console(file=self.stream),
+                              refresh_per_second=self.refresh_per_second)
+            self._live.start()
+        else:
+            self._thread = threading.Thread(target=self._print_summaries, name="dashboard", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            print(self.summary_line(), file=self.stream)
+
+    def _print_summaries(self):
+        while not self._stop.wait(self.plain_interval):
+            print(self.summary_line(), file=self.stream, flush=True)
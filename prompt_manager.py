@@ -4,12 +4,53 @@ Prompt Manager for Multi-Agent Strategy Consulting Team
 Loads and manages prompts from YAML configuration files
 """
 
-import yaml
 import json
+import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 
+# Bump when the compiled config layout or the validation rules change
+COMPILED_CONFIG_VERSION = 1
+
+# Compiled configs already read in this process, keyed by (config path, YAML hash);
+# agents build a PromptManager per call, so only the first one touches the cache file
+_compiled_configs: Dict[Tuple[str, str], str] = {}
+
+REQUIRED_SECTIONS = ['global', 'system_instructions', 'agents', 'token_limits']
+
+REQUIRED_AGENTS = [
+    'business_model_analyst', 'market_researcher', 'competitive_analyst',
+    'financial_analyst', 'risk_assessor', 'implementation_specialist',
+    'strategy_storyteller', 'senior_partner'
+]
+
+def compiled_config_path(config_file: Path) -> Path:
+    """Hidden precompiled (validated, JSON) copy of a YAML config, kept next to it."""
+    return config_file.with_name(f".{config_file.name}.compiled.json")
+
+def validate_config(config: Dict[str, Any]):
+    """Validate the configuration structure.
+
+    Raises:
+        ValueError: If a required section, agent or agent prompt is missing
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Configuration must be a mapping")
+    for section in REQUIRED_SECTIONS:
+        if section not in config:
+            raise ValueError(f"Missing required section: {section}")
+    
+    for agent in REQUIRED_AGENTS:
+        if agent not in config['agents']:
+            raise ValueError(f"Missing required agent: {agent}")
+        
+        agent_config = config['agents'][agent]
+        if 'system_prompt' not in agent_config:
+            raise ValueError(f"Missing system_prompt for agent: {agent}")
+        if 'user_prompt_template' not in agent_config:
+            raise ValueError(f"Missing user_prompt_template for agent: {agent}")
+
 @dataclass
 class AgentPrompt:
     """Data structure for agent prompts."""
@@ -27,39 +68,73 @@ class PromptManager:
         self._validate_config()
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load the YAML configuration file."""
+        """Load the configuration, from its precompiled copy when the YAML is unchanged.
+
+        The YAML is parsed (with the C loader where PyYAML has one) only when its hash differs
+        from the compiled copy's; the validated result is then recompiled for the next start.
+        """
         if not self.config_file.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_file}")
         
+        source = self.config_file.read_bytes()
+        key = (str(self.config_file.resolve()), hashlib.sha256(source).hexdigest())
+        compiled = _compiled_configs.get(key) or self._read_compiled(key[1])
+        if compiled is not None:
+            _compiled_configs[key] = compiled
+            return json.loads(compiled)
+        
+        config = self._parse_yaml(source)
+        validate_config(config)
+        compiled = self._write_compiled(key[1], config)
+        if compiled is not None:
+            _compiled_configs[key] = compiled
+        return config
+    
+    def _parse_yaml(self, source: bytes) -> Dict[str, Any]:
+        """Parse the YAML source; PyYAML is only imported when the compiled copy is stale."""
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            return config
+            return yaml.load(source, Loader=loader)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML configuration: {e}")
     
+    def _read_compiled(self, digest: str) -> Optional[str]:
+        """JSON text of the compiled config if it was built from this YAML hash, else None."""
+        try:
+            with open(compiled_config_path(self.config_file), 'r', encoding='utf-8') as f:
+                compiled = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if (not isinstance(compiled, dict) or compiled.get('version') != COMPILED_CONFIG_VERSION
+                or compiled.get('source_sha256') != digest):
+            return None
+        return json.dumps(compiled.get('config'))
+    
+    def _write_compiled(self, digest: str, config: Dict[str, Any]) -> Optional[str]:
+        """Save the validated config as JSON keyed by the YAML hash; returns its JSON text.
+
+        Configs JSON cannot represent exactly (non-string keys, dates) are not compiled and
+        read-only config directories are tolerated; both just fall back to parsing the YAML.
+        """
+        compiled = json.dumps(config)
+        if json.loads(compiled) != config:
+            return None
+        from artifact_io import atomic_write_json
+        try:
+            atomic_write_json(compiled_config_path(self.config_file), {
+                'version': COMPILED_CONFIG_VERSION,
+                'source': self.config_file.name,
+                'source_sha256': digest,
+                'config': config
+            })
+        except OSError:
+            pass
+        return compiled
+    
     def _validate_config(self):
         """Validate the configuration structure."""
-        required_sections = ['global', 'system_instructions', 'agents', 'token_limits']
-        for section in required_sections:
-            if section not in self.config:
-                raise ValueError(f"Missing required section: {section}")
-        
-        required_agents = [
-            'business_model_analyst', 'market_researcher', 'competitive_analyst',
-            'financial_analyst', 'risk_assessor', 'implementation_specialist',
-            'strategy_storyteller', 'senior_partner'
-        ]
-        
-        for agent in required_agents:
-            if agent not in self.config['agents']:
-                raise ValueError(f"Missing required agent: {agent}")
-            
-            agent_config = self.config['agents'][agent]
-            if 'system_prompt' not in agent_config:
-                raise ValueError(f"Missing system_prompt for agent: {agent}")
-            if 'user_prompt_template' not in agent_config:
-                raise ValueError(f"Missing user_prompt_template for agent: {agent}")
+        validate_config(self.config)
     
     def get_global_config(self) -> Dict[str, Any]:
         """Get global configuration settings."""
@@ -107,6 +182,118 @@ class PromptManager:
         """Get the token limit for a specific agent."""
         return self.config['token_limits'].get(agent_name, self.get_default_token_limit())
     
+    def get_latency_config(self) -> Dict[str, Any]:
+        """Get latency controls (timeouts and hedging) from the configuration."""
+        return self.config.get('latency', {})
+    
+    def get_reliability_config(self) -> Dict[str, Any]:
+        """Get retry, circuit breaker and dependency failure settings from the configuration."""
+        return self.config.get('reliability', {})
+    
+    def get_structured_output_config(self) -> Dict[str, Any]:
+        """Get settings for the structured findings block agents append to their output."""
+        return self.config.get('structured_outputs', {})
+    
+    def get_service_config(self) -> Dict[str, Any]:
+        """Get the bind address, worker pool and queue limits of the HTTP service."""
+        return self.config.get('service', {})
+    
+    def get_stub_backend_config(self) -> Dict[str, Any]:
+        """Get the latency of the stub LLM backend used by load tests."""
+        return self.config.get('stub_backend', {})
+    
+    def get_scheduling_config(self) -> Dict[str, Any]:
+        """Get the call slots, priority classes and tenant weights of shared processes."""
+        return self.config.get('scheduling', {})
+    
+    def get_pricing(self) -> Dict[str, Dict[str, float]]:
+        """Get USD per million tokens by model (older configs kept it under dry_run)."""
+        return self.config.get('pricing') or self.get_dry_run_config().get('pricing', {})
+    
+    def get_spend_budget_config(self) -> Dict[str, Any]:
+        """Get the default engagement budget and how engagements degrade as it runs low."""
+        return self.config.get('spend_budget', {})
+    
+    def get_metrics_config(self) -> Dict[str, Any]:
+        """Get the Prometheus metrics ports of the daemon and batch workers."""
+        return self.config.get('metrics', {})
+    
+    def get_tracing_config(self) -> Dict[str, Any]:
+        """Get where engagement traces are written and whether they go to a collector."""
+        return self.config.get('tracing', {})
+    
+    def get_dashboard_config(self) -> Dict[str, Any]:
+        """Get the refresh rate and token estimate of the live progress dashboard."""
+        return self.config.get('dashboard', {})
+    
+    def get_logging_config(self) -> Dict[str, Any]:
+        """Get where structured log records go and how many may wait to be written."""
+        return self.config.get('logging', {})
+    
+    def get_debug_config(self) -> Dict[str, Any]:
+        """Get the event-loop stall threshold and memory profiling settings of debug mode."""
+        return self.config.get('debug', {})
+    
+    def get_engagement_control_config(self) -> Dict[str, Any]:
+        """Get the engagement deadline and whether calls are streamed so they can be cancelled."""
+        return self.config.get('engagement_control', {})
+    
+    def get_batch_config(self) -> Dict[str, Any]:
+        """Get the worker processes, leases and queue location of sharded batch runs."""
+        return self.config.get('batch', {})
+    
+    def get_daemon_config(self) -> Dict[str, Any]:
+        """Get the socket path and concurrency of the warm daemon."""
+        return self.config.get('daemon', {})
+    
+    def get_dry_run_config(self) -> Dict[str, Any]:
+        """Get pricing and throughput assumptions for dry-run estimates."""
+        return self.config.get('dry_run', {})
+    
+    def get_stream_validation_config(self) -> Dict[str, Any]:
+        """Get the early-abort validator rules for streamed agent responses."""
+        return self.config.get('stream_validation', {})
+    
+    def get_adaptive_token_config(self) -> Dict[str, Any]:
+        """Get settings for learning output token limits from past outputs."""
+        return self.config.get('adaptive_token_limits', {})
+    
+    def get_continuation_config(self) -> Dict[str, Any]:
+        """Get settings for resuming responses that stop at max_tokens."""
+        return self.config.get('continuation', {})
+    
+    def get_section_generation_config(self) -> Dict[str, Any]:
+        """Get settings for generating deliverable sections as concurrent calls."""
+        return self.config.get('section_generation', {})
+    
+    def get_review_config(self) -> Dict[str, Any]:
+        """Get the senior partner review mode and its map-reduce prompts."""
+        return self.config.get('senior_partner_review', {})
+    
+    def format_review_prompt(self, stage: str, **kwargs) -> str:
+        """Format the map-reduce review prompt for a stage ("review" or "synthesis")."""
+        template = self.get_review_config().get(f'{stage}_prompt_template')
+        if template is None:
+            raise ValueError(f"Missing senior_partner_review.{stage}_prompt_template")
+        return template.format(**kwargs)
+    
+    def get_engagement_tier(self, tier_name: str) -> Dict[str, Any]:
+        """Get a named engagement tier (deliverables, analysis depth, token scaling)."""
+        tiers = self.config.get('engagement_tiers', {})
+        if tier_name not in tiers:
+            raise ValueError(f"Unknown engagement tier: {tier_name}. Available: {', '.join(tiers) or 'none'}")
+        return tiers[tier_name]
+    
+    def list_engagement_tiers(self) -> List[str]:
+        """List all configured engagement tier names."""
+        return list(self.config.get('engagement_tiers', {}).keys())
+    
+    def get_agent_timeout(self, agent_name: str) -> Optional[float]:
+        """Get the request timeout in seconds for a specific agent."""
+        latency_config = self.get_latency_config()
+        timeout = latency_config.get('timeouts', {}).get(agent_name, latency_config.get('default_timeout_seconds'))
+        return float(timeout) if timeout else None
+    
     def get_enhanced_system_prompt(self, agent_name: str) -> str:
         """Get an enhanced system prompt with global instructions."""
         agent_prompt = self.get_agent_prompt(agent_name)
@@ -128,6 +315,11 @@ class PromptManager:
             for framework in system_instructions['analysis_framework']:
                 enhanced_prompt += f"- {framework}\n"
         
+        # Add structured findings instructions
+        if self.get_structured_output_config().get('enabled', False):
+            from structured_output import STRUCTURED_OUTPUT_INSTRUCTIONS
+            enhanced_prompt += f"\nStructured Output:\n{STRUCTURED_OUTPUT_INSTRUCTIONS}\n"
+        
         return enhanced_prompt
     
     def list_available_agents(self) -> List[str]:
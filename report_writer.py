@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Streaming Report Writer for the Consulting Team
+Composes the final report section by section, copying each agent's output from
+its file (or a small buffer) straight into the report so memory stays flat
+"""
+
+import io
+import re
+import json
+import html
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Any, TextIO, Iterable
+from dataclasses import dataclass, field
+from artifact_io import atomic_open
+
+REPORT_FORMATS = ("markdown", "html", "bundle")
+REPORT_EXTENSIONS = {"markdown": ".md", "html": ".html", "bundle": "_bundle.md"}
+COPY_CHUNK_SIZE = 64 * 1024
+
+@dataclass
+class ReportSection:
+    """One section of the final report, backed by a source file or a small in-memory buffer."""
+    title: str
+    source_file: Optional[Path] = None
+    text: Optional[str] = None
+    digest: Optional[str] = None
+    attachments: List[Path] = field(default_factory=list)
+
+    @property
+    def anchor(self) -> str:
+        """Markdown/HTML anchor for the table of contents."""
+        return re.sub(r"[^a-z0-9]+", "-", self.title.lower()).strip("-")
+
+    def open(self) -> TextIO:
+        """Open the section body for streaming."""
+        if self.source_file is not None:
+            return open(self.source_file, 'r', encoding='utf-8')
+        return io.StringIO(self.text or "")
+
+class ReportWriter:
+    """Writes the final strategic report in one or more formats without materializing it."""
+
+    def __init__(self, company_name: str, parameters: Dict[str, Any], sections: List[ReportSection],
+                 generated: str):
+        self.company_name = company_name
+        self.parameters = parameters
+        self.sections = sections
+        self.generated = generated
+
+    def write(self, path: Path, report_format: str = "markdown") -> Path:
+        """Write the report atomically to `path` in the given format."""
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {report_format}")
+        with atomic_open(path) as out:
+            if report_format == "html":
+                self._write_html(out)
+            else:
+                self._write_markdown(out, bundle=report_format == "bundle")
+        return path
+
+    def _write_markdown(self, out: TextIO, bundle: bool = False):
+        """Stream the markdown report; the bundle adds a table of contents, full prose and attachments."""
+        out.write(f"# Strategic Analysis Report: {self.company_name}\n\n")
+        out.write(f"**Generated:** {self.generated}\n")
+        out.write("**Analysis Parameters:** ")
+        json.dump(self.parameters, out, indent=2)
+        out.write("\n\n")
+
+        if bundle:
+            out.write("## Table of Contents\n\n")
+            out.write("- [Executive Summary](#executive-summary)\n")
+            for section in self.sections:
+                out.write(f"- [{section.title}](#{section.anchor})\n")
+            if any(section.attachments for section in self.sections):
+                out.write("- [Appendix: Run Artifacts](#appendix-run-artifacts)\n")
+            out.write("\n")
+
+        out.write("## Executive Summary\n\n")
+        out.write("This comprehensive strategic analysis was conducted by an AI-powered consulting team consisting of "
+                  "specialized agents, each focusing on different aspects of strategic analysis.\n\n")
+        out.write("## Detailed Analysis\n\n")
+
+        for section in self.sections:
+            out.write(f"## {section.title}\n\n")
+            if section.digest:
+                out.write(section.digest)
+                out.write("\n")
+            if section.digest is None or bundle:
+                with section.open() as source:
+                    shutil.copyfileobj(source, out, COPY_CHUNK_SIZE)
+                out.write("\n\n")
+            elif section.source_file is not None:
+                out.write(f"*Full analysis: {section.source_file}*\n\n")
+            out.write("\n")
+
+        out.write("## Conclusion\n\n")
+        out.write("This analysis represents the collaborative work of multiple specialized AI agents, each bringing deep "
+                  "expertise in their respective domains. The findings provide a comprehensive strategic assessment with "
+                  f"actionable recommendations for {self.company_name}.\n\n")
+
+        if bundle and any(section.attachments for section in self.sections):
+            out.write("## Appendix: Run Artifacts\n\n")
+            for section in self.sections:
+                for attachment in section.attachments:
+                    out.write(f"### {attachment.name}\n\n```json\n")
+                    with open(attachment, 'r', encoding='utf-8') as source:
+                        shutil.copyfileobj(source, out, COPY_CHUNK_SIZE)
+                    out.write("\n```\n\n")
+
+        out.write("---\n*Report generated by AI Consulting Team using GPT-5 technology*\n")
+
+    def _write_html(self, out: TextIO):
+        """Stream a standalone HTML report, converting each section's markdown line by line."""
+        title = html.escape(f"Strategic Analysis Report: {self.company_name}")
+        out.write(f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n</head>\n<body>\n")
+        out.write(f"<h1>{title}</h1>\n")
+        out.write(f"<p><strong>Generated:</strong> {html.escape(self.generated)}</p>\n")
+        out.write(f"<pre>{html.escape(json.dumps(self.parameters, indent=2))}</pre>\n")
+
+        out.write("<nav>\n<h2>Contents</h2>\n<ul>\n")
+        for section in self.sections:
+            out.write(f"<li><a href=\"#{section.anchor}\">{html.escape(section.title)}</a></li>\n")
+        out.write("</ul>\n</nav>\n")
+
+        for section in self.sections:
+            out.write(f"<section id=\"{section.anchor}\">\n<h2>{html.escape(section.title)}</h2>\n")
+            if section.digest:
+                write_markdown_as_html(io.StringIO(section.digest), out)
+                if section.source_file is not None:
+                    out.write(f"<p><em>Full analysis: {html.escape(str(section.source_file))}</em></p>\n")
+            else:
+                with section.open() as source:
+                    write_markdown_as_html(source, out)
+            out.write("</section>\n")
+
+        out.write("<hr>\n<p><em>Report generated by AI Consulting Team</em></p>\n</body>\n</html>\n")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+
+def _inline_html(text: str) -> str:
+    """Escape a line and convert bold, italic and code spans."""
+    text = html.escape(text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)", r"<em>\1</em>", text)
+    return re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
+
+def write_markdown_as_html(lines: Iterable[str], out: TextIO):
+    """Convert markdown to HTML one line at a time (headings, lists, paragraphs, code fences)."""
+    in_list = in_code = in_paragraph = False
+
+    def close_blocks():
+        nonlocal in_list, in_paragraph
+        if in_list:
+            out.write("</ul>\n")
+            in_list = False
+        if in_paragraph:
+            out.write("</p>\n")
+            in_paragraph = False
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\n")
+        if line.strip().startswith("```"):
+            close_blocks()
+            out.write("</code></pre>\n" if in_code else "<pre><code>")
+            in_code = not in_code
+            continue
+        if in_code:
+            out.write(html.escape(line) + "\n")
+            continue
+        if not line.strip():
+            close_blocks()
+            continue
+
+        heading = _HEADING.match(line)
+        item = _LIST_ITEM.match(line)
+        if heading:
+            close_blocks()
+            # Section titles are h2, so agent headings start at h3
+            level = min(len(heading.group(1)) + 2, 6)
+            out.write(f"<h{level}>{_inline_html(heading.group(2))}</h{level}>\n")
+        elif item:
+            if in_paragraph:
+                out.write("</p>\n")
+                in_paragraph = False
+            if not in_list:
+                out.write("<ul>\n")
+                in_list = True
+            out.write(f"<li>{_inline_html(item.group(1))}</li>\n")
+        else:
+            if in_list:
+                out.write("</ul>\n")
+                in_list = False
+            out.write(("" if in_paragraph else "<p>") + _inline_html(line) + "\n")
+            in_paragraph = True
+
+    if in_code:
+        out.write("</code></pre>\n")
+    close_blocks()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Retry and Circuit Breaking for Consulting Agent LLM Calls
+Classifies transient API failures, retries them with jittered exponential backoff
+and stops hammering a backend that keeps failing
+"""
+
+import time
+import random
+import asyncio
+from typing import Dict, Optional, Any, Callable, Awaitable
+from dataclasses import dataclass, field
+
+# Error classes that are worth retrying, with their default attempt limits
+DEFAULT_RETRY_ON = {
+    'overloaded': 5,
+    'rate_limit': 5,
+    'server_error': 4,
+    'timeout': 2,
+    'connection': 4,
+    'validation': 3
+}
+
+# Error classes that say nothing about the backend's health and do not count toward its circuit breaker
+NON_BACKEND_ERRORS = ('validation',)
+
+class CircuitOpenError(Exception):
+    """Raised when a backend's circuit breaker is open and calls are short-circuited."""
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Map an exception to a retryable error class, or None if it should not be retried.
+
+    Works on status codes and exception names so it does not need the SDK imported.
+    """
+    if isinstance(error, CircuitOpenError):
+        return None
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, (ConnectionError, ConnectionResetError)):
+        return 'connection'
+
+    name = type(error).__name__
+    status = getattr(error, 'status_code', None)
+    if name == 'StreamValidationError':
+        return 'validation'
+    if name == 'OverloadedError' or status == 529:
+        return 'overloaded'
+    if name == 'RateLimitError' or status == 429:
+        return 'rate_limit'
+    if name == 'APITimeoutError':
+        return 'timeout'
+    if name == 'APIConnectionError':
+        return 'connection'
+    if name == 'InternalServerError' or (isinstance(status, int) and 500 <= status < 600):
+        return 'server_error'
+    return None
+
+@dataclass
+class RetryPolicy:
+    """Per error class attempt limits with jittered exponential backoff."""
+    retry_on: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_RETRY_ON))
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RetryPolicy":
+        """Build a policy from the `reliability.retry` section of the prompt config."""
+        retry_on = dict(DEFAULT_RETRY_ON)
+        retry_on.update(config.get('retry_on', {}))
+        return cls(
+            retry_on=retry_on,
+            base_delay=float(config.get('base_delay_seconds', 1.0)),
+            max_delay=float(config.get('max_delay_seconds', 30.0))
+        )
+
+    def next_delay(self, error_class: Optional[str], attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when the error should be raised.
+
+        Args:
+            error_class: Result of classify_error for the failed attempt
+            attempt: Number of attempts already made (1 after the first failure)
+        """
+        if error_class is None or attempt >= self.retry_on.get(error_class, 1):
+            return None
+        # Full jitter keeps concurrent engagements from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one LLM backend."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self):
+        """Raise CircuitOpenError while the breaker is open; half-open lets a probe through."""
+        if self.state == 'open':
+            raise CircuitOpenError(f"Circuit open for backend {self.name}; retry after {self.reset_timeout:.0f}s")
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        """Count a failure and trip the breaker at the threshold or on a failed probe."""
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.trips += 1
+            self.opened_at = time.monotonic()
+
+class CircuitBreakerRegistry:
+    """Lazily created circuit breakers keyed by backend (model) name."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CircuitBreakerRegistry":
+        """Build a registry from the `reliability.circuit_breaker` section of the prompt config."""
+        return cls(
+            failure_threshold=int(config.get('failure_threshold', 5)),
+            reset_timeout=float(config.get('reset_timeout_seconds', 60))
+        )
+
+    def get(self, backend: str) -> CircuitBreaker:
+        """Get the breaker for a backend, creating it on first use."""
+        if backend not in self.breakers:
+            self.breakers[backend] = CircuitBreaker(backend, self.failure_threshold, self.reset_timeout)
+        return self.breakers[backend]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """State and trip count for every backend seen so far."""
+        return {name: {'state': b.state, 'trips': b.trips} for name, b in self.breakers.items()}
+
+async def call_with_retry(make_attempt: Callable[[], Awaitable[Any]], policy: RetryPolicy,
+                          breaker: Optional[CircuitBreaker] = None,
+                          stats: Optional[Dict[str, Any]] = None) -> Any:
+    """Run an attempt factory, retrying transient failures.
+
+    Args:
+        make_attempt: Factory returning a fresh awaitable per attempt
+        policy: Retry limits and backoff
+        breaker: Optional circuit breaker for the target backend
+        stats: Optional dict updated with `retries` and per-class `errors` counts
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        The last error once it is not retryable or its attempt limit is reached
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('retries', 0)
+    stats.setdefault('errors', {})
+    attempt = 0
+
+    while True:
+        if breaker is not None:
+            breaker.before_call()
+        attempt += 1
+        try:
+            result = await make_attempt()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error_class = classify_error(e)
+            error_key = error_class or type(e).__name__
+            stats['errors'][error_key] = stats['errors'].get(error_key, 0) + 1
+            if breaker is not None and error_class is not None and error_class not in NON_BACKEND_ERRORS:
+                breaker.record_failure()
+            delay = policy.next_delay(error_class, attempt)
+            if delay is None:
+                raise
+            stats['retries'] += 1
+            await asyncio.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Priority and Fair Scheduling of LLM Calls
+Bounds the calls a process has in flight and decides which waiting call goes next:
+higher priority classes first (an interactive call overtakes every queued bulk call),
+then weighted fair queuing between tenants within a class, so one large engagement
+cannot starve the others. Calls already in flight are never interrupted
+"""
+
+import time
+import asyncio
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, AsyncIterator, Deque, Tuple
+
+from token_budget import nearest_rank
+
+DEFAULT_CLASSES = {"interactive": {"priority": 0}, "bulk": {"priority": 1}}
+
+@dataclass(order=True)
+class _Waiter:
+    """A queued call, ordered by class priority, then fair-queuing finish tag, then arrival."""
+    priority: int
+    finish: float
+    seq: int
+    priority_class: str = field(compare=False)
+    tenant: str = field(compare=False)
+    queued_at: float = field(compare=False)
+    future: "asyncio.Future" = field(compare=False)
+
+class CallScheduler:
+    """Admits at most `max_in_flight` calls at once and orders the rest by class and tenant share.
+
+    Within a class, each tenant's calls get virtual finish tags `start + cost / weight`
+    (self-clocked fair queuing), so backlogged tenants are served in proportion to their weights.
+    A class may be capped below `max_in_flight` to keep slots free for higher classes.
+    """
+
+    def __init__(self, max_in_flight: int = 8, classes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default_class: str = "interactive", tenant_weights: Optional[Dict[str, float]] = None,
+                 wait_samples: int = 1000):
+        self.max_in_flight = max_in_flight
+        self.classes = classes or DEFAULT_CLASSES
+        if default_class not in self.classes:
+            raise ValueError(f"Unknown default priority class: {default_class}")
+        self.default_class = default_class
+        self.tenant_weights = tenant_weights or {}
+        self._waiting: List[_Waiter] = []
+        self._in_flight: Dict[str, int] = {name: 0 for name in self.classes}
+        self._virtual_time: Dict[str, float] = {name: 0.0 for name in self.classes}
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._seq = itertools.count()
+        self._waits: Dict[str, Deque[float]] = {name: deque(maxlen=wait_samples) for name in self.classes}
+        self._calls: Dict[str, int] = {name: 0 for name in self.classes}
+        self.preemptions = 0  # Times a queued call was overtaken by a newly queued call of a higher class
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CallScheduler":
+        """Build a scheduler from the `scheduling` section of the prompt config."""
+        return cls(
+            max_in_flight=int(config.get('max_in_flight', 8)),
+            classes=config.get('classes') or DEFAULT_CLASSES,
+            default_class=config.get('default_class', 'interactive'),
+            tenant_weights={tenant: float(weight) for tenant, weight in (config.get('tenant_weights') or {}).items()},
+            wait_samples=int(config.get('wait_samples', 1000))
+        )
+
+    def _cap(self, priority_class: str) -> int:
+        cap = self.classes[priority_class].get('max_in_flight')
+        return min(int(cap), self.max_in_flight) if cap is not None else self.max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    @asynccontextmanager
+    async def slot(self, priority_class: Optional[str] = None, tenant: str = "default",
+                   cost: float = 1.0) -> AsyncIterator[float]:
+        """Wait for a call slot; yields the seconds spent queued and frees the slot on exit.
+
+        Args:
+            priority_class: Class of the call (default: the scheduler's default class)
+            tenant: Engagement or team the call is billed to for fair sharing
+            cost: Relative size of the call, e.g. its max_tokens
+
+        Raises:
+            ValueError: If the priority class is unknown
+        """
+        priority_class = priority_class or self.default_class
+        if priority_class not in self.classes:
+            raise ValueError(f"Unknown priority class: {priority_class}")
+        if self.max_in_flight <= 0:
+            self._record(priority_class, 0.0)
+            yield 0.0
+            return
+
+        weight = self.tenant_weights.get(tenant, 1.0)
+        start = max(self._virtual_time[priority_class], self._last_finish.get((priority_class, tenant), 0.0))
+        waiter = _Waiter(int(self.classes[priority_class].get('priority', 0)), start + cost / weight, next(self._seq),
+                         priority_class, tenant, time.monotonic(), asyncio.get_running_loop().create_future())
+        self._last_finish[(priority_class, tenant)] = waiter.finish
+        self.preemptions += sum(1 for other in self._waiting if other.priority > waiter.priority)
+        self._waiting.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                self._forget_idle_tenants()
+            elif waiter.future.done() and not waiter.future.cancelled():
+                self._release(priority_class)  # Admitted just as it was cancelled
+            raise
+        wait = time.monotonic() - waiter.queued_at
+        self._record(priority_class, wait)
+        try:
+            yield wait
+        finally:
+            self._release(priority_class)
+
+    def _dispatch(self):
+        """Admit waiting calls, best first, while slots are free."""
+        self._waiting.sort()
+        admitted = []
+        for waiter in self._waiting:
+            if self.in_flight >= self.max_in_flight:
+                break
+            if self._in_flight[waiter.priority_class] >= self._cap(waiter.priority_class):
+                continue
+            self._in_flight[waiter.priority_class] += 1
+            self._virtual_time[waiter.priority_class] = waiter.finish
+            waiter.future.set_result(None)
+            admitted.append(waiter)
+        for waiter in admitted:
+            self._waiting.remove(waiter)
+        if admitted:
+            self._forget_idle_tenants()
+
+    def _forget_idle_tenants(self):
+        """Keep finish tags only for tenants with queued calls, so one-off tenants (run ids) do not pile up.
+
+        An admitted call's tag is never ahead of its class's virtual time, so an idle tenant's next call
+        starts at the virtual time with or without it; a cancelled call's tag is dropped as it never ran.
+        """
+        queued = {(waiter.priority_class, waiter.tenant) for waiter in self._waiting}
+        self._last_finish = {key: finish for key, finish in self._last_finish.items() if key in queued}
+
+    def _release(self, priority_class: str):
+        self._in_flight[priority_class] -= 1
+        self._dispatch()
+
+    def _record(self, priority_class: str, wait: float):
+        self._calls[priority_class] += 1
+        self._waits[priority_class].append(wait)
+
+    def queued(self, priority_class: str) -> int:
+        """Calls of a class waiting for a slot (safe to read from another thread)."""
+        return sum(1 for waiter in list(self._waiting) if waiter.priority_class == priority_class)
+
+    def summary(self) -> Dict[str, Any]:
+        """Calls, current queue and queue-wait percentiles (seconds) per class."""
+        queued: Dict[str, int] = {name: 0 for name in self.classes}
+        for waiter in self._waiting:
+            queued[waiter.priority_class] += 1
+        return {
+            "max_in_flight": self.max_in_flight,
+            "preemptions": self.preemptions,
+            "classes": {
+                name: {
+                    "calls": self._calls[name],
+                    "in_flight": self._in_flight[name],
+                    "queued": queued[name],
+                    **{f"wait_p{pct}": (round(nearest_rank(list(self._waits[name]), pct), 3)
+                                        if self._waits[name] else None) for pct in (50, 95)},
+                    "wait_max": round(max(self._waits[name]), 3) if self._waits[name] else None
+                } for name in self.classes
+            }
+        }
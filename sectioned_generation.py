@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Parallel Section-wise Generation for Consulting Agents
+Splits a deliverable into the numbered sections its prompt asks for, so each
+section can be generated as its own concurrent call over a shared cached prefix,
+then stitches the sections back together in order
+"""
+
+import re
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional
+
+# Top-level numbered sections in the agent prompts: `1. **Executive Summary:**`
+_SECTION = re.compile(r"^[ \t]*(\d+)\.\s+\*\*(.+?):?\*\*", re.MULTILINE)
+
+CONSISTENCY_INSTRUCTIONS = """The sections above were written in parallel by different colleagues and are final.
+Review them together for contradictions (figures, priorities, recommendations), duplicated content and gaps between sections.
+Respond with a short "## Consistency Notes" section (at most 8 bullets) that states how each issue should be read, or that the sections are consistent.
+If your instructions ask for a structured JSON findings block, append it after the notes, covering the whole deliverable."""
+
+@dataclass
+class PromptSection:
+    """One numbered section a deliverable prompt asks for."""
+    number: int
+    title: str
+
+def split_prompt_sections(prompt: str) -> List[PromptSection]:
+    """Find the top-level numbered sections of a prompt.
+
+    Returns an empty list unless the sections are numbered 1..n in order, so prompts
+    without a clear section outline are generated in one call.
+    """
+    sections = [PromptSection(int(number), title.strip()) for number, title in _SECTION.findall(prompt)]
+    if [section.number for section in sections] != list(range(1, len(sections) + 1)):
+        return []
+    return sections
+
+def section_instruction(section: PromptSection, sections: List[PromptSection]) -> str:
+    """Instruction appended after the shared prompt to generate a single section."""
+    others = ", ".join(f"{s.number}. {s.title}" for s in sections if s.number != section.number)
+    return (f"Write ONLY section {section.number}: **{section.title}**. "
+            f"The other sections ({others}) are being written in parallel by colleagues.\n"
+            f"Start with the heading \"## {section.number}. {section.title}\". Do not write an introduction, "
+            "a conclusion, other sections, or a structured JSON findings block.")
+
+def cached_request(request: Dict[str, Any], suffix: str) -> Dict[str, Any]:
+    """Copy a Messages API request, marking the system prompt and user prompt as a cached prefix.
+
+    Every section call shares the system prompt and the full user prompt; only the
+    trailing `suffix` block differs, so all but the first call can read the prefix from cache.
+    """
+    user_prompt = request["messages"][0]["content"]
+    cached = dict(request)
+    cached["system"] = [{"type": "text", "text": request["system"], "cache_control": {"type": "ephemeral"}}]
+    cached["messages"] = [{"role": "user", "content": [
+        {"type": "text", "text": user_prompt, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": suffix}
+    ]}]
+    return cached
+
+def response_text(response: Any) -> str:
+    """Text of a Messages API response."""
+    return "".join(block.text for block in response.content if getattr(block, "type", "text") == "text")
+
+def stitch_sections(texts: List[str]) -> str:
+    """Join section texts in order into one markdown deliverable."""
+    return "\n\n".join(text.strip() for text in texts if text.strip()) + "\n"
+
+@dataclass
+class StitchedResponse:
+    """A Messages API-shaped response assembled from several calls."""
+    text: str
+    stop_reason: Optional[str] = "end_turn"
+    usage: Any = field(default_factory=lambda: SimpleNamespace(input_tokens=0, output_tokens=0))
+    calls: int = 1
+
+    @property
+    def content(self) -> List[Any]:
+        return [SimpleNamespace(type="text", text=self.text)]
+
+    @classmethod
+    def combine(cls, text: str, responses: List[Any], stop_reason: Optional[str] = None) -> "StitchedResponse":
+        """Combine responses: usage is summed and, unless `stop_reason` is given, a `max_tokens` stop in any part is kept."""
+        stop_reasons = [getattr(response, "stop_reason", None) for response in responses]
+        usage = SimpleNamespace(
+            input_tokens=sum(getattr(getattr(r, "usage", None), "input_tokens", 0) or 0 for r in responses),
+            output_tokens=sum(getattr(getattr(r, "usage", None), "output_tokens", 0) or 0 for r in responses)
+        )
+        if stop_reason is None:
+            stop_reason = "max_tokens" if "max_tokens" in stop_reasons else (stop_reasons[-1] if stop_reasons else None)
+        return cls(text=text, stop_reason=stop_reason, usage=usage, calls=len(responses))
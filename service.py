@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+HTTP Service for Consulting Engagements
+An asyncio HTTP/1.1 service wrapping ConsultingTeam: submit an engagement, poll its
+status, stream its progress as server-sent events and fetch its artifacts. Jobs are
+kept in a SQLite queue that survives restarts and run on a bounded worker pool;
+submissions beyond the queue limit are refused with 429
+
+Usage:
+    python service.py --port 8080 --workers 2
+    python service.py --stub-backend      # No API calls; see stub_backend.py
+
+Endpoints:
+    POST /engagements                         {"company", "brief", "tier", "deliverables", "team_options"}
+    GET  /engagements/<job_id>                Job status and result
+    DELETE /engagements/<job_id>              Cancel a queued or running job
+    GET  /engagements/<job_id>/events         Progress as text/event-stream
+    GET  /engagements/<job_id>/artifacts      Files written by the job's run
+    GET  /engagements/<job_id>/artifacts/<path>
+    GET  /health                              Queue depth and call queue waits per priority class
+    GET  /metrics                             Prometheus metrics (text exposition format)
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import argparse
+import itertools
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit, unquote
+from typing import Dict, List, Optional, Any, Tuple
+
+import metrics
+from artifact_io import io_executor, run_in_io_thread
+from cancellation import CancellationToken
+from daemon import engagement_errors, progress_to, routed_stdout, run_engagement
+from structured_logging import configure_logging
+
+MAX_BODY_BYTES = 1024 * 1024
+
+CONTENT_TYPES = {".md": "text/markdown; charset=utf-8", ".json": "application/json",
+                 ".html": "text/html; charset=utf-8", ".txt": "text/plain; charset=utf-8"}
+
+FINISHED_STATES = ("completed", "partial", "cancelled", "failed")
+
+class JobStore:
+    """SQLite table of engagement jobs and their progress lines, so the queue survives restarts.
+
+    Every method is called on the background I/O thread (see artifact_io.io_executor).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, submitted_at REAL NOT NULL,
+            started_at REAL, finished_at REAL, result TEXT, error TEXT)""")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS events (
+            job_id TEXT NOT NULL, seq INTEGER NOT NULL, message TEXT NOT NULL, PRIMARY KEY (job_id, seq))""")
+
+    def add(self, job: "Job"):
+        self.db.execute("INSERT INTO jobs (id, status, request, submitted_at) VALUES (?, ?, ?, ?)",
+                        (job.id, job.status, json.dumps(job.request), job.submitted_at))
+
+    def update(self, job: "Job"):
+        self.db.execute("UPDATE jobs SET status = ?, started_at = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                        (job.status, job.started_at, job.finished_at,
+                         json.dumps(job.result) if job.result is not None else None, job.error, job.id))
+
+    def add_event(self, job_id: str, seq: int, message: str):
+        self.db.execute("INSERT OR REPLACE INTO events (job_id, seq, message) VALUES (?, ?, ?)", (job_id, seq, message))
+
+    def load(self, job_id: str) -> Optional["Job"]:
+        """A job with its progress lines, or None if unknown."""
+        row = self.db.execute("SELECT id, status, request, submitted_at, started_at, finished_at, result, error "
+                              "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        events = [message for (message,) in self.db.execute(
+            "SELECT message FROM events WHERE job_id = ? ORDER BY seq", (job_id,))]
+        return Job(id=row[0], status=row[1], request=json.loads(row[2]), submitted_at=row[3], started_at=row[4],
+                   finished_at=row[5], result=json.loads(row[6]) if row[6] else None, error=row[7], events=events)
+
+    def recover(self) -> List[str]:
+        """Requeue jobs a previous process was running; returns queued job ids, oldest first."""
+        self.db.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+        return [job_id for (job_id,) in self.db.execute(
+            "SELECT id FROM jobs WHERE status = 'queued' ORDER BY submitted_at")]
+
+@dataclass
+class Job:
+    """One submitted engagement and the progress lines it printed."""
+    id: str
+    request: Dict[str, Any]
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON view of the job for status responses."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "company": self.request.get("company"),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress_lines": len(self.events),
+            "result": self.result,
+            "error": self.error
+        }
+
+class ConsultingService:
+    """Job queue, worker pool and HTTP front end for engagements."""
+
+    def __init__(self, resources: Any, output_dir: Path, jobs_db: Path, workers: int = 2,
+                 max_queue_depth: int = 20, retry_after_seconds: int = 10, scheduler: Any = None):
+        self.resources = resources
+        self.scheduler = scheduler  # Orders queued jobs by the priority class of their calls; None is FIFO
+        self.output_dir = Path(output_dir).resolve()
+        self.store = JobStore(jobs_db)
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.port: Optional[int] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._updated: Dict[str, asyncio.Event] = {}
+        self._cancellations: Dict[str, CancellationToken] = {}  # Tokens of running jobs
+        self._tasks: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        """Requeue unfinished jobs, start the workers and listen; returns the bound port."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._stopped = asyncio.Event()
+        for job_id in await run_in_io_thread(self.store.recover):
+            job = await run_in_io_thread(self.store.load, job_id)
+            self.jobs[job_id] = job
+            self._enqueue(job)
+        if self.jobs:
+            print(f"♻️  Requeued {len(self.jobs)} unfinished jobs from {self.store.path}")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        metrics.QUEUE_DEPTH.track(lambda: self.queue_depth, queue="service_jobs")
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, ready: Optional[threading.Event] = None):
+        """Run until stop() is called; running jobs are requeued on the next start."""
+        with routed_stdout():
+            await self.start(host, port)
+            if ready is not None:
+                ready.set()
+            print(f"🌐 Consulting service on http://{host}:{self.port} ({self.workers} workers, "
+                  f"queue limit {self.max_queue_depth})")
+            try:
+                async with self._server:
+                    await self._stopped.wait()
+            finally:
+                for task in self._tasks:
+                    task.cancel()
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self):
+        """Stop serving; safe to call from any thread."""
+        self._loop.call_soon_threadsafe(self._stopped.set)
+
+    # Jobs
+
+    async def submit(self, engagement: Dict[str, Any]) -> Job:
+        """Persist and enqueue a validated engagement."""
+        job = Job(id=uuid.uuid4().hex[:12], request=dict(engagement, output_dir=str(self.output_dir)))
+        await run_in_io_thread(self.store.add, job)
+        self.jobs[job.id] = job
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: Job):
+        """Queue a job behind waiting jobs of the same or a higher priority class."""
+        priority_class = (job.request.get("team_options") or {}).get("priority")
+        rank = 0
+        if self.scheduler is not None:
+            rank = int(self.scheduler.classes[priority_class or self.scheduler.default_class].get('priority', 0))
+        self._queue.put_nowait((rank, next(self._order), job.id))
+
+    async def get_job(self, job_id: str) -> Optional[Job]:
+        """A job from this process, or from the store if an earlier process ran it."""
+        if job_id not in self.jobs:
+            job = await run_in_io_thread(self.store.load, job_id)
+            if job is None:
+                return None
+            self.jobs[job_id] = job
+        return self.jobs[job_id]
+
+    def _add_event(self, job: Job, message: str):
+        """Record a progress line, persist it in order on the I/O thread and wake event streams."""
+        job.events.append(message)
+        asyncio.get_running_loop().run_in_executor(io_executor(), self.store.add_event, job.id,
+                                                   len(job.events), message)
+        self._notify(job)
+
+    def _notify(self, job: Job):
+        event = self._updated.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def _set_status(self, job: Job, status: str):
+        job.status = status
+        await run_in_io_thread(self.store.update, job)
+        self._notify(job)
+
+    async def _worker(self):
+        """Run queued jobs one at a time."""
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.started_at = time.time()
+            await self._set_status(job, "running")
+            cancellation = self._cancellations[job.id] = CancellationToken()
+            try:
+                with progress_to(lambda event: self._add_event(job, event["message"])):
+                    job.result = await run_engagement(self.resources, job.request, cancellation)
+                status = {"completed": "completed", "cancelled": "cancelled",
+                          "deadline_exceeded": "cancelled"}.get(job.result["status"], "partial")
+            except asyncio.CancelledError:
+                raise  # Shutting down: the job stays "running" in the store and is requeued on restart
+            except Exception as e:
+                job.error = str(e)
+                status = "failed"
+            finally:
+                self._cancellations.pop(job.id, None)
+            job.finished_at = time.time()
+            await self._set_status(job, status)
+
+    async def cancel(self, job: Job) -> bool:
+        """Cancel a queued job at once, or ask a running one to stop (it keeps its finished outputs).
+
+        Returns:
+            False if the job had already finished
+        """
+        if job.status == "queued":
+            job.finished_at = time.time()
+            job.error = "Cancelled before it started"
+            await self._set_status(job, "cancelled")
+            return True
+        cancellation = self._cancellations.get(job.id)
+        if cancellation is None:
+            return False
+        cancellation.cancel()
+        return True
+
+    def artifacts(self, job: Job) -> Dict[str, Path]:
+        """Files written by a job's run, keyed by their path relative to the project directory."""
+        if not job.result:
+            return {}
+        project_dir = Path(job.result["project_dir"]).resolve()
+        files = [path for path in project_dir.rglob("*") if path.is_file() and job.result["run_id"] in path.name]
+        files += [Path(path) for path in [job.result["final_report"]] + job.result["report_files"] if path]
+        return {str(path.resolve().relative_to(project_dir)): path.resolve() for path in files
+                if path.exists() and project_dir in path.resolve().parents}
+
+    # HTTP
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one request per connection."""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) != 3:
+                return self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"})
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY_BYTES:
+                return self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"})
+            body = await reader.readexactly(length) if length else b""
+            await self._route(request_line[0], unquote(urlsplit(request_line[1]).path), headers, body, writer)
+            await writer.drain()
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": f"Bad request: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes,
+                     writer: asyncio.StreamWriter):
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            running = sum(1 for job in self.jobs.values() if job.status == "running")
+            return self._respond(writer, HTTPStatus.OK, {"status": "ok", "workers": self.workers,
+                                                         "queue_depth": self.queue_depth, "running": running,
+                                                         "scheduler": self.scheduler.summary() if self.scheduler else {}})
+        if parts == ["metrics"] and method == "GET":
+            return self._respond(writer, HTTPStatus.OK, metrics.REGISTRY.render().encode('utf-8'), metrics.CONTENT_TYPE)
+        if parts == ["engagements"] and method == "POST":
+            return await self._submit(body, writer)
+        if len(parts) < 2 or parts[0] != "engagements":
+            return self._respond(writer, HTTPStatus.NOT_FOUND, {"error": f"No route for {path}"})
+        if method not in ("GET", "DELETE") or (method == "DELETE" and len(parts) != 2):
+            return self._respond(writer, HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed"})
+
+        job = await self.get_job(parts[1])
+        if job is None:
+            return self._respond(writer, HTTPStatus.NOT_FOUND, {"error": f"Unknown job: {parts[1]}"})
+        if method == "DELETE":
+            if not await self.cancel(job):
+                return self._respond(writer, HTTPStatus.CONFLICT, {"error": f"Job already {job.status}"})
+            # A running job stops at its next chunk or call; poll it for the final status
+            return self._respond(writer, HTTPStatus.OK if job.status == "cancelled" else HTTPStatus.ACCEPTED,
+                                 job.summary())
+        if len(parts) == 2:
+            return self._respond(writer, HTTPStatus.OK, job.summary())
+        if parts[2:] == ["events"]:
+            return await self._stream_events(job, int(headers.get("last-event-id") or 0), writer)
+        if parts[2] == "artifacts":
+            artifacts = await run_in_io_thread(self.artifacts, job)
+            if len(parts) == 3:
+                return self._respond(writer, HTTPStatus.OK, {"job_id": job.id, "artifacts": sorted(artifacts)})
+            artifact = artifacts.get("/".join(parts[3:]))
+            if artifact is None:
+                return self._respond(writer, HTTPStatus.NOT_FOUND, {"error": "Unknown artifact"})
+            content = await run_in_io_thread(artifact.read_bytes)
+            return self._respond(writer, HTTPStatus.OK, content,
+                                 CONTENT_TYPES.get(artifact.suffix, "application/octet-stream"))
+        return self._respond(writer, HTTPStatus.NOT_FOUND, {"error": f"No route for {path}"})
+
+    async def _submit(self, body: bytes, writer: asyncio.StreamWriter):
+        """Validate and enqueue an engagement, or refuse it when the queue is full."""
+        try:
+            engagement = json.loads(body or b"{}")
+        except ValueError as e:
+            return self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"})
+        if not isinstance(engagement, dict):
+            return self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Engagement must be a JSON object"})
+        error = engagement_errors(engagement, required=("company", "brief"))
+        priority_class = (engagement.get("team_options") or {}).get("priority")
+        if not error and priority_class and self.scheduler is not None and priority_class not in self.scheduler.classes:
+            error = f"Unknown priority class: {priority_class}"
+        if error:
+            return self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": error})
+        if self.queue_depth >= self.max_queue_depth:
+            return self._respond(writer, HTTPStatus.TOO_MANY_REQUESTS,
+                                 {"error": "Engagement queue is full", "queue_depth": self.queue_depth},
+                                 headers={"Retry-After": str(self.retry_after_seconds)})
+        job = await self.submit({key: engagement.get(key) for key in
+                                 ("company", "brief", "tier", "deliverables", "team_options")})
+        return self._respond(writer, HTTPStatus.ACCEPTED, job.summary(),
+                             headers={"Location": f"/engagements/{job.id}"})
+
+    async def _stream_events(self, job: Job, last_event_id: int, writer: asyncio.StreamWriter):
+        """Send progress lines as server-sent events until the job finishes, then its final status."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        sent = last_event_id
+        while True:
+            updated = self._updated.setdefault(job.id, asyncio.Event())
+            for seq in range(sent + 1, len(job.events) + 1):
+                writer.write(f"id: {seq}\nevent: progress\ndata: {json.dumps(job.events[seq - 1])}\n\n".encode('utf-8'))
+            sent = len(job.events)
+            if job.status in FINISHED_STATES:
+                writer.write(f"event: status\ndata: {json.dumps(job.summary())}\n\n".encode('utf-8'))
+                return
+            await writer.drain()
+            await updated.wait()
+
+    def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, body: Any,
+                 content_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, default=str).encode('utf-8')
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+
+def build_resources(prompt_manager: Any, stub_backend: bool = False, api_key: Optional[str] = None) -> Any:
+    """TeamResources on the API, or on the stub backend configured in the prompt config.
+
+    Raises:
+        ValueError: If no API key is available and the stub backend is not used
+    """
+    from strategy_consulting_agent import TeamResources
+    if stub_backend:
+        from stub_backend import StubAnthropic
+        return TeamResources("stub", client=StubAnthropic.from_config(prompt_manager.get_stub_backend_config()))
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it as a parameter.")
+    return TeamResources(api_key)
+
+def build_service(output_dir: Optional[str] = None, workers: Optional[int] = None,
+                  max_queue_depth: Optional[int] = None, stub_backend: bool = False,
+                  api_key: Optional[str] = None) -> Tuple[ConsultingService, Dict[str, Any]]:
+    """Service from the `service` section of the prompt config, with per-run overrides.
+
+    Raises:
+        ValueError: If no API key is available and the stub backend is not used
+    """
+    from prompt_manager import PromptManager
+    prompt_manager = PromptManager()
+    config = prompt_manager.get_service_config()
+    resources = build_resources(prompt_manager, stub_backend, api_key)
+    output_dir = Path(output_dir or config.get('output_dir', './consulting_projects'))
+    service = ConsultingService(
+        resources, output_dir, output_dir / config.get('jobs_db', 'service_jobs.sqlite3'),
+        workers=workers or int(config.get('workers', 2)),
+        max_queue_depth=max_queue_depth or int(config.get('max_queue_depth', 20)),
+        retry_after_seconds=int(config.get('retry_after_seconds', 10)),
+        scheduler=resources.scheduler(prompt_manager.get_scheduling_config())
+    )
+    return service, config
+
+def serve_in_thread(service: ConsultingService, host: str = "127.0.0.1", port: int = 0) -> threading.Thread:
+    """Run a service on its own event loop in a background thread (for load tests); stop with service.stop().
+
+    Raises:
+        RuntimeError: If the service does not start listening
+    """
+    ready = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(service.serve(host, port, ready),), daemon=True)
+    thread.start()
+    if not ready.wait(timeout=30):
+        raise RuntimeError("Consulting service did not start")
+    return thread
+
+def main():
+    """Run the HTTP service."""
+    parser = argparse.ArgumentParser(description="HTTP service for consulting engagements")
+    parser.add_argument("--host", help="Bind address (default: service.host in agent_prompts.yaml)")
+    parser.add_argument("--port", type=int, help="Port (default: service.port)")
+    parser.add_argument("--workers", type=int, help="Engagements run concurrently (default: service.workers)")
+    parser.add_argument("--max-queue-depth", type=int, help="Queued jobs before submissions get 429 (default: service.max_queue_depth)")
+    parser.add_argument("--output-dir", "-o", help="Output directory for projects and the job database")
+    parser.add_argument("--stub-backend", action="store_true", help="Answer every call from stub_backend.py instead of the API")
+    parser.add_argument("--api-key", help="OpenAI API key (optional, can use OPENAI_API_KEY env var)")
+    args = parser.parse_args()
+
+    try:
+        service, config = build_service(args.output_dir, args.workers, args.max_queue_depth, args.stub_backend,
+                                        args.api_key)
+        from prompt_manager import PromptManager
+        log_file = configure_logging(PromptManager().get_logging_config(), service.output_dir)
+        if log_file:
+            print(f"📜 Structured log: {log_file}")
+        asyncio.run(service.serve(args.host or config.get('host', '127.0.0.1'),
+                                  args.port if args.port is not None else int(config.get('port', 8080))))
+    except ValueError as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped; running jobs are requeued on the next start")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Single-flight Coalescing of Identical LLM Requests
+Concurrent calls with the same request in the same engagement share one network call and one result,
+so duplicate work (racing sections and retries of one run) is paid once
+"""
+
+import json
+import hashlib
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+# Transport settings that do not change the response
+_IGNORED_KEYS = ("timeout",)
+
+_shared: Optional["SingleFlight"] = None
+
+def request_key(request: Dict[str, Any], scope: Optional[str] = None) -> str:
+    """Stable key for a Messages API request (model, prompts and sampling parameters).
+
+    `scope` (the engagement's run id) keeps engagements from sharing calls: a shared call runs
+    the leader's budget admission, cancellation and spend records, which are per engagement.
+    """
+    canonical = {key: value for key, value in request.items() if key not in _IGNORED_KEYS}
+    encoded = json.dumps(canonical, sort_keys=True, default=str, ensure_ascii=False)
+    digest = hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    return f"{scope}:{digest}" if scope else digest
+
+class _Flight:
+    """One in-flight call and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @classmethod
+    def shared(cls) -> "SingleFlight":
+        """Process-wide instance; keys are scoped per engagement (see `request_key`)."""
+        global _shared
+        if _shared is None:
+            _shared = cls()
+        return _shared
+
+    async def do(self, key: str, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `make_call` unless a call with the same key is in flight; then wait for that one.
+
+        Args:
+            key: Request key (see `request_key`)
+            make_call: Factory for the awaitable that makes the call
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+
+        The shared call is only cancelled once every caller waiting on it has been cancelled.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(make_call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call with this key is currently in flight."""
+        return key in self._flights
+
+    def _forget(self, key: str, flight: _Flight):
+        """Drop a finished flight so later calls with the same key run again."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def summary(self) -> Dict[str, int]:
+        """Calls made and calls coalesced into another caller's call."""
+        return {"calls": self.calls, "coalesced": self.coalesced}
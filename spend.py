@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Spend Ledger and Engagement Budgets
+Prices every LLM call from its usage block with the local price table, checks each
+call's projected cost against the engagement's budget before it is sent, and decides
+how an engagement degrades as its budget runs low: a cheaper model first, then
+summarized dependency context, then skipping optional agents
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+from preflight import DEFAULT_PRICING
+from structured_logging import log_event
+from token_budget import estimate_tokens
+
+# Prompt caching prices relative to the input price, unless a model lists its own
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+class BudgetExceeded(Exception):
+    """Raised before a call whose projected cost does not fit in what is left of the budget."""
+
+    def __init__(self, label: str, projected_usd: float, remaining_usd: float):
+        self.label = label
+        self.projected_usd = projected_usd
+        self.remaining_usd = remaining_usd
+        super().__init__(f"{label} could cost ${projected_usd:.4f}; ${remaining_usd:.4f} of the budget is left")
+
+class PriceTable:
+    """USD per million tokens by model, from the `pricing` section of the prompt config."""
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None):
+        self.prices = prices or {}
+
+    def rates(self, model: str) -> Dict[str, float]:
+        """Per-million-token rates of a model (the default rates for unlisted models)."""
+        rates = dict(DEFAULT_PRICING, **self.prices.get(model, {}))
+        rates.setdefault('cache_write_per_mtok', rates['input_per_mtok'] * CACHE_WRITE_MULTIPLIER)
+        rates.setdefault('cache_read_per_mtok', rates['input_per_mtok'] * CACHE_READ_MULTIPLIER)
+        return rates
+
+    def cost(self, model: str, input_tokens: int = 0, output_tokens: int = 0,
+             cache_creation_input_tokens: int = 0, cache_read_input_tokens: int = 0) -> float:
+        """Cost in USD of the given token counts."""
+        rates = self.rates(model)
+        return (input_tokens * rates['input_per_mtok'] + output_tokens * rates['output_per_mtok']
+                + cache_creation_input_tokens * rates['cache_write_per_mtok']
+                + cache_read_input_tokens * rates['cache_read_per_mtok']) / 1_000_000
+
+    def projected_cost(self, model: str, request: Dict[str, Any]) -> float:
+        """Worst-case cost of a request: its prompt, estimated from its size, plus its full max_tokens."""
+        return self.cost(model, input_tokens=request_input_tokens(request),
+                         output_tokens=int(request.get("max_tokens") or 0))
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content or [] if isinstance(block, dict))
+
+def request_input_tokens(request: Dict[str, Any]) -> int:
+    """Estimated prompt tokens of a Messages API request."""
+    chars = len(_text(request.get("system", ""))) + sum(len(_text(message.get("content")))
+                                                        for message in request.get("messages", []))
+    return estimate_tokens(chars)
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """Token counts of a response's usage block (missing fields count as 0)."""
+    return {key: int(getattr(usage, key, 0) or 0) for key in
+            ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")}
+
+@dataclass
+class DegradePolicy:
+    """When and how an engagement trades quality for cost, by the fraction of its budget left."""
+    cheaper_model: Optional[str] = None
+    cheaper_model_below: float = 0.5
+    summarize_context_below: float = 0.35
+    context_chars: int = 6000
+    skip_optional_below: float = 0.2
+    optional_agents: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "DegradePolicy":
+        """Build a policy from `spend_budget.degrade` in the prompt config."""
+        return cls(
+            cheaper_model=config.get('cheaper_model'),
+            cheaper_model_below=float(config.get('cheaper_model_below', 0.5)),
+            summarize_context_below=float(config.get('summarize_context_below', 0.35)),
+            context_chars=int(config.get('context_chars', 6000)),
+            skip_optional_below=float(config.get('skip_optional_below', 0.2)),
+            optional_agents=list(config.get('optional_agents') or [])
+        )
+
+class SpendLedger:
+    """Calls and their cost for one engagement, checked against an optional budget.
+
+    Every call is admitted with its projected (worst-case) cost reserved, so concurrent calls
+    cannot overrun the budget together; the reservation is replaced by the actual cost from
+    the usage block once the call returns. Runs on the event loop thread only.
+    """
+
+    def __init__(self, budget_usd: Optional[float] = None, prices: Optional[PriceTable] = None,
+                 policy: Optional[DegradePolicy] = None):
+        self.budget_usd = budget_usd
+        self.prices = prices or PriceTable()
+        self.policy = policy or DegradePolicy()
+        self.entries: List[Dict[str, Any]] = []
+        self.degradations: List[Dict[str, Any]] = []
+        self.reserved = 0.0
+        self.refused = 0
+        self._settled: Optional[asyncio.Event] = None
+
+    @property
+    def spent(self) -> float:
+        return sum(entry["cost_usd"] for entry in self.entries)
+
+    def remaining(self) -> Optional[float]:
+        """USD left after what was spent and what calls in flight may still spend; None without a budget."""
+        if self.budget_usd is None:
+            return None
+        return max(self.budget_usd - self.spent - self.reserved, 0.0)
+
+    def fraction_left(self) -> Optional[float]:
+        remaining = self.remaining()
+        if remaining is None or not self.budget_usd:
+            return None
+        return remaining / self.budget_usd
+
+    def _below(self, threshold: float) -> bool:
+        fraction = self.fraction_left()
+        return fraction is not None and fraction < threshold
+
+    async def admit(self, label: str, request: Dict[str, Any]) -> float:
+        """Reserve a call's projected cost; returns the amount to settle or release.
+
+        A call that does not fit switches `request["model"]` to the cheaper model if that fits.
+        Otherwise, if it only fails to fit because of calls in flight, it waits for them to settle.
+
+        Raises:
+            BudgetExceeded: If the projected cost cannot fit in the remaining budget
+        """
+        while True:
+            projected = self.prices.projected_cost(request["model"], request)
+            remaining = self.remaining()
+            if remaining is None or projected <= remaining:
+                break
+            cheaper = self.policy.cheaper_model
+            cheapest = projected
+            if cheaper and cheaper != request["model"]:
+                cheapest = min(projected, self.prices.projected_cost(cheaper, request))
+                if cheapest <= remaining:
+                    self._degrade("cheaper_model", label, f"{request['model']} -> {cheaper}")
+                    request["model"] = cheaper
+                    continue
+            if self.reserved > 0 and cheapest <= self.budget_usd - self.spent:
+                if self._settled is None:
+                    self._settled = asyncio.Event()
+                await self._settled.wait()
+                continue
+            self.refused += 1
+            raise BudgetExceeded(label, projected, remaining)
+        self.reserved += projected
+        return projected
+
+    def try_reserve(self, request: Dict[str, Any]) -> Optional[float]:
+        """Reserve a call's projected cost only if it fits now (no waiting, no cheaper model); None if not."""
+        projected = self.prices.projected_cost(request["model"], request)
+        remaining = self.remaining()
+        if remaining is not None and projected > remaining:
+            return None
+        self.reserved += projected
+        return projected
+
+    def release(self, reserved: float):
+        """Free a reservation without recording a call (it failed or was never sent)."""
+        self.reserved = max(self.reserved - reserved, 0.0)
+        if self._settled is not None:
+            self._settled.set()
+            self._settled = None
+
+    def settle(self, reserved: float, label: str, model: str, usage: Any, **details) -> float:
+        """Replace a reservation with the cost of the call's usage; returns that cost."""
+        self.release(reserved)
+        return self.record(label, model, usage_counts(usage), **details)
+
+    def record(self, label: str, model: str, counts: Dict[str, int], **details) -> float:
+        """Record the cost of one call from its token counts."""
+        cost = self.prices.cost(model, **counts)
+        self.entries.append(dict(label=label, model=model, cost_usd=cost, **counts, **details))
+        return cost
+
+    def model_for(self, label: str, model: str) -> str:
+        """The model a call should use: the cheaper model once the budget runs low."""
+        cheaper = self.policy.cheaper_model
+        if not cheaper or cheaper == model or not self._below(self.policy.cheaper_model_below):
+            return model
+        self._degrade("cheaper_model", label, f"{model} -> {cheaper}")
+        return cheaper
+
+    def summarize_context(self, role: str) -> bool:
+        """Whether dependency outputs should be summarized to save input tokens."""
+        if not self._below(self.policy.summarize_context_below):
+            return False
+        self._degrade("summarized_context", role, f"dependency context capped at {self.policy.context_chars} chars")
+        return True
+
+    def skip_optional(self, role: str) -> bool:
+        """Whether an optional agent should be skipped to keep the budget for the others."""
+        if role not in self.policy.optional_agents or not self._below(self.policy.skip_optional_below):
+            return False
+        self._degrade("skipped_agent", role, "optional agent skipped")
+        return True
+
+    def _degrade(self, step: str, subject: str, detail: str):
+        if any(entry["step"] == step and entry["subject"] == subject for entry in self.degradations):
+            return
+        fraction = self.fraction_left()
+        log_event("budget.degraded", f"💸 Budget {fraction:.0%} left: {detail} ({subject})", logging.WARNING,
+                  step=step, subject=subject, detail=detail, budget_left=round(fraction, 3))
+        self.degradations.append({"step": step, "subject": subject, "detail": detail,
+                                  "budget_left": round(fraction, 3)})
+
+    def summary(self) -> Dict[str, Any]:
+        """Spend breakdown for the run metadata."""
+        by_role: Dict[str, float] = {}
+        by_model: Dict[str, float] = {}
+        for entry in self.entries:
+            role = entry["label"].split(".")[0]
+            by_role[role] = by_role.get(role, 0.0) + entry["cost_usd"]
+            by_model[entry["model"]] = by_model.get(entry["model"], 0.0) + entry["cost_usd"]
+        return {
+            "budget_usd": self.budget_usd,
+            "spent_usd": round(self.spent, 6),
+            "remaining_usd": round(self.remaining(), 6) if self.budget_usd is not None else None,
+            "calls": len(self.entries),
+            "refused_calls": self.refused,
+            **{key: sum(entry[key] for entry in self.entries) for key in
+               ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")},
+            "by_role": {role: round(cost, 6) for role, cost in sorted(by_role.items())},
+            "by_model": {model: round(cost, 6) for model, cost in sorted(by_model.items())},
+            "degradations": self.degradations
+        }
@@ -8,13 +8,36 @@ Each agent has specific expertise and can collaborate with others to produce con
 import os
 import json
 import asyncio
+import logging
 import argparse
+import functools
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
-import anthropic
 from enum import Enum
+from latency import LatencyHistogram, HedgedCaller, HedgePolicy
+from retry import RetryPolicy, CircuitBreakerRegistry, CircuitOpenError, call_with_retry, classify_error
+from structured_output import extract_structured_output, load_structured_sidecar, render_compact
+from sectioned_generation import (split_prompt_sections, section_instruction, cached_request, response_text,
+                                  stitch_sections, StitchedResponse, PromptSection, CONSISTENCY_INSTRUCTIONS)
+from continuation import is_truncated, continuation_request
+from token_budget import TokenBudgetPolicy, OutputLengthHistory, AdaptiveTokenLimits, format_report
+from single_flight import SingleFlight, request_key
+from scheduler import CallScheduler, DEFAULT_CLASSES
+from cancellation import CancellationToken, EngagementCancelled, CHECKPOINT_SUFFIX
+from spend import SpendLedger, PriceTable, DegradePolicy, BudgetExceeded, request_input_tokens, usage_counts
+from tracing import Tracer, maybe_span
+from structured_logging import (log_event, console, log_context, bind_log_context, configure_logging,
+                                shutdown_logging)
+import metrics
+from stream_validation import StreamMonitor, StreamValidationError, build_rules
+from preflight import check_templates, estimate_call, format_estimate, EngagementEstimate
+from report_writer import ReportWriter, ReportSection, REPORT_FORMATS, REPORT_EXTENSIONS
+from artifact_io import (atomic_write_text, atomic_write_json, mark_complete, is_complete, find_latest_output,
+                         new_run_id, run_in_io_thread)
 
 class AgentRole(Enum):
     """Enumeration of agent roles in the consulting team."""
@@ -32,25 +55,120 @@ class AgentOutput:
     """Data structure for agent outputs."""
     agent_role: str
     company_name: str
-    output_content: str
+    output_content: str  # Emptied by ConsultingTeam once saved; the text stays in file_path
     timestamp: str
     parameters_used: Dict[str, Any]
     dependencies: List[str]
     status: str
     file_path: str
+    call_metadata: Dict[str, Any] = field(default_factory=dict)
+    structured_output: Optional[Dict[str, Any]] = None
 
 class BaseAgent:
     """Base class for all consulting agents."""
     
+    # Whether the dependency section names the dependencies before their outputs
+    LISTS_DEPENDENCIES = False
+    
     def __init__(self, role: AgentRole, api_key: str, company_name: str, project_dir: Path):
         self.role = role
         self.api_key = api_key
         self.company_name = company_name
         self.project_dir = project_dir
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self._client = None
         self.output_dir = project_dir / "agent_outputs" / role.value
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Latency and retry controls, wired up by ConsultingTeam
+        self.timeout: Optional[float] = None
+        self.caller: Optional[HedgedCaller] = None
+        self.retry_policy: Optional[RetryPolicy] = None
+        self.breakers: Optional[CircuitBreakerRegistry] = None
+        self.call_stats: Dict[str, Any] = {}
+        
+        # Output token limit for this engagement, overriding the configured limit when set
+        self.max_tokens: Optional[int] = None
+        
+        # Run-scoped id for output filenames, set per engagement by ConsultingTeam
+        self.run_id: Optional[str] = None
+        
+        # Structured findings: whether responses carry them, and whether dependencies are read through them
+        self.structured_outputs = False
+        self.structured_context = False
+        
+        # Section-wise generation settings when enabled for the engagement, else None
+        self.section_generation: Optional[Dict[str, Any]] = None
+        
+        # Numbered sections of the agent's prompt template (not the rendered prompt, whose dependency
+        # outputs may hold numbered lists of their own)
+        self.prompt_sections: List[PromptSection] = []
+        
+        # Follow-up calls allowed to resume a response cut off at max_tokens
+        self.max_continuations = 0
+        
+        # Coalesces identical concurrent requests when enabled, shared by every team in the process
+        self.single_flight: Optional[SingleFlight] = None
+        
+        # Stream validation rule specs for deliverable calls; empty means calls are not streamed
+        self.stream_validators: List[Dict[str, Any]] = []
+        
+        # Shared client and caches of a long-running process; None means this agent builds its own
+        self.resources: Optional["TeamResources"] = None
+        
+        # Call slots shared by the engagements of a long-running process, and this agent's place in them
+        self.scheduler: Optional[CallScheduler] = None
+        self.priority_class: Optional[str] = None
+        self.tenant: Optional[str] = None
+        
+        # Engagement deadline and cancel flag, checked before every call and between streamed chunks
+        self.cancellation: Optional[CancellationToken] = None
+        
+        # Stream every call so a cancel or deadline can abort it mid-response (validated calls always stream)
+        self.stream_calls = False
+        
+        # Resuming an interrupted run: continue calls from the partial streams it checkpointed
+        self.resume_checkpoints = False
+        
+        # Engagement spend ledger: prices every call and refuses calls that would overrun the budget
+        self.spend: Optional[SpendLedger] = None
+        
+        # Engagement trace the agent's calls, dependency loads and saves are recorded in; None when tracing is off
+        self.tracer: Optional[Tracer] = None
+        
+        # Live dashboard the agent's calls report their streamed tokens to, when one is shown
+        self.dashboard: Optional["ProgressDashboard"] = None
+
+    @property
+    def client(self):
+        """Anthropic client, created on first use so commands that never call the API skip the SDK import."""
+        if self._client is None:
+            if self.resources is not None:
+                return self.resources.client
+            import anthropic
+            self._client = anthropic.Anthropic(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def prompt_variables(self, parameters: Dict[str, Any], dependencies: Optional[List[str]],
+                         dependency_outputs: List[str]) -> Dict[str, str]:
+        """Values for the user prompt template placeholders (declared under `templates:` in agent_prompts.yaml)."""
+        dependencies = dependencies or []
+        if not dependency_outputs:
+            dependency_outputs_section = ''
+        elif self.LISTS_DEPENDENCIES:
+            dependency_outputs_section = f"Dependencies: {', '.join(dependencies)}\n\n{chr(10).join(dependency_outputs)}"
+        else:
+            dependency_outputs_section = f"Dependency Outputs: {chr(10).join(dependency_outputs)}"
+        return {
+            "company_name": self.company_name,
+            "analysis_parameters": json.dumps(parameters, indent=2),
+            "dependency_outputs_section": dependency_outputs_section,
+            "agent_list": "\n".join(f"- {dep}" for dep in dependencies)
+        }
+    
     async def execute(self, parameters: Dict[str, Any], dependencies: Optional[List[str]] = None) -> AgentOutput:
         """Execute the agent's analysis. To be implemented by subclasses.
         
@@ -65,42 +183,409 @@ class BaseAgent:
             NotImplementedError: This method must be implemented by subclasses
         """
         raise NotImplementedError("Subclasses must implement execute()")
+    
+    async def _create_message(self, label: Optional[str] = None, stats: Optional[Dict[str, Any]] = None,
+                              **request) -> Any:
+        """Call the Messages API off the event loop with timeout, hedging and retries.
+        
+        Args:
+            label: Latency histogram key for auxiliary calls (e.g. "senior_partner.review"); these
+                keep their own max_tokens instead of the engagement override. Defaults to the role
+            stats: Dictionary to record call statistics in instead of `call_stats`
+            **request: Keyword arguments for `client.messages.create`
+            
+        Returns:
+            The Messages API response of the first attempt to succeed
+            
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within the agent's timeout
+            CircuitOpenError: If the backend's circuit breaker is open
+        """
+        if stats is None:
+            stats = self.call_stats
+        if self.max_tokens and label is None:
+            request["max_tokens"] = self.max_tokens
+        if self.section_generation and label is None:
+            sections = self.prompt_sections
+            if len(sections) >= int(self.section_generation.get('min_sections', 3)):
+                return await self._create_sectioned_message(request, sections, stats)
+        return await self._call_to_completion(label or self.role.value, stats, request)
+    
+    async def _call_to_completion(self, label: str, stats: Dict[str, Any], request: Dict[str, Any]) -> Any:
+        """Make a call and, while it stops at max_tokens, resume it with continuation calls.
+        
+        Each continuation prefills the assistant turn with the text so far and reuses the cached
+        prompt prefix. After `max_continuations` follow-ups the response is returned as it stands,
+        with a `max_tokens` stop reason. When resuming an interrupted run, a call whose stream was
+        checkpointed continues from the checkpoint instead of starting over.
+        """
+        partial = self._load_checkpoint(label) if self.resume_checkpoints else None
+        if partial:
+            log_event("call.resumed", f"♻️  {label} continuing from a {len(partial)}-character checkpoint",
+                      call=label, checkpoint_chars=len(partial))
+            responses = [await self._call_model(f"{label}.continuation", stats, continuation_request(request, partial))]
+            text = partial.rstrip() + response_text(responses[0])
+        else:
+            response = await self._call_model(label, stats, request)
+            if not is_truncated(response) or not self.max_continuations:
+                return response
+            responses = [response]
+            text = response_text(response)
+        while is_truncated(responses[-1]) and len(responses) <= self.max_continuations:
+            log_event("call.continued", f"✂️  {label} hit max_tokens; continuing ({len(responses)}/{self.max_continuations})",
+                      call=label, continuation=len(responses))
+            continued = await self._call_model(f"{label}.continuation", stats, continuation_request(request, text))
+            text = text.rstrip() + response_text(continued)
+            responses.append(continued)
+        stats["continuations"] = stats.get("continuations", 0) + len(responses) - 1
+        return StitchedResponse.combine(text, responses, stop_reason=getattr(responses[-1], "stop_reason", None))
+    
+    async def _call_model(self, label: str, stats: Dict[str, Any], request: Dict[str, Any]) -> Any:
+        """Make one Messages API call with the agent's timeout, hedging, retry and circuit breaker.
+        
+        With single-flight enabled, a concurrent identical request of the same engagement shares the call
+        already in flight (including its retries) instead of making its own.
+        """
+        loop = asyncio.get_running_loop()
+        request = dict(request)
+        if self.spend is not None:
+            request["model"] = self.spend.model_for(label, request["model"])
+        if self.timeout:
+            # Let the SDK abandon the HTTP request as well, so executor threads are not leaked
+            request.setdefault("timeout", self.timeout)
+        
+        # Only whole deliverables are validated; sections and continuations do not start a response
+        validate = bool(self.stream_validators) and label == self.role.value
+        # A continuation's partial text is useless without what it continues, so only first calls are checkpointed
+        checkpoint_label = None if label.endswith(".continuation") else label
+        
+        def make_call(progress: Optional["CallProgress"] = None):
+            if validate or self.stream_calls:
+                return loop.run_in_executor(None, self._stream_call, checkpoint_label, request, validate, progress)
+            return loop.run_in_executor(None, functools.partial(self.client.messages.create, **request))
+        
+        async def attempt():
+            span.add("llm.attempts", 1)
+            if self.scheduler is None:
+                return await scheduled_attempt()
+            async with self.scheduler.slot(self.priority_class, self.tenant or self.role.value,
+                                           request.get("max_tokens", 1)) as wait:
+                stats["queue_wait"] = round(stats.get("queue_wait", 0.0) + wait, 3)
+                span.add("llm.queue_wait_seconds", round(wait, 3))
+                return await scheduled_attempt()
+        
+        async def scheduled_attempt():
+            timeout = self.timeout
+            if self.cancellation is not None:
+                # Nothing new starts once the engagement is cancelled, and no call runs past its deadline
+                self.cancellation.check()
+                timeout = self.cancellation.bound(timeout)
+                if timeout is not None:
+                    request["timeout"] = timeout
+            # Every attempt, retries included, must fit in what is left of the budget
+            reserved = await self.spend.admit(label, request) if self.spend is not None else None
+            attempt_stats = {}
+            hedge_reserved: List[float] = []
+            # One dashboard row per request sent (a hedge is a second one), so retries and duplicates
+            # never stream into the same counter; coalesced followers send nothing and get no row
+            rows: List["CallProgress"] = []
+            
+            def start_call():
+                progress = None
+                if self.dashboard is not None:
+                    progress = self.dashboard.start(self.company_name, label, request["model"],
+                                                    request.get("max_tokens", 0), request_input_tokens(request))
+                    rows.append(progress)
+                return make_call(progress)
+            
+            def finish_rows(response: Any = None):
+                winner = 1 if attempt_stats.get("hedge_won") else 0
+                for index, row in enumerate(rows):
+                    if response is not None and index == winner:
+                        self.dashboard.finish(row, usage_counts(getattr(response, "usage", None)))
+                    else:
+                        self.dashboard.finish(row, failed=True)
+            
+            def may_hedge() -> bool:
+                # Cancelling the losing attempt does not stop its worker thread: the request runs to the
+                # end, so a duplicate is only fired if its whole max_tokens fits in the budget
+                if self.spend is None:
+                    return True
+                amount = self.spend.try_reserve(request)
+                if amount is None:
+                    return False
+                hedge_reserved.append(amount)
+                return True
+            
+            started = time.monotonic()
+            metrics.LLM_IN_FLIGHT.inc()
+            try:
+                if self.caller is None:
+                    response = await asyncio.wait_for(start_call(), timeout)
+                else:
+                    response, attempt_stats = await self.caller.call(label, start_call, timeout, may_hedge)
+                    stats.update(attempt_stats)
+                    span.set("llm.hedged", bool(attempt_stats.get("hedged")) or None)
+            except StreamValidationError as e:
+                finish_rows()
+                metrics.record_call(self.role.value, request["model"], error_class="validation")
+                log_event("call.aborted", f"🛑 {label} aborted early: {e}", logging.WARNING, call=label,
+                          generated_tokens=e.generated_tokens)
+                stats["validation_aborts"] = stats.get("validation_aborts", 0) + 1
+                stats["aborted_tokens"] = stats.get("aborted_tokens", 0) + e.generated_tokens
+                stats["saved_tokens"] = stats.get("saved_tokens", 0) + e.saved_tokens
+                if reserved is not None:
+                    # The aborted stream was billed for its prompt and what it generated; no usage block says how much
+                    self.spend.release(reserved + sum(hedge_reserved))
+                    self.spend.record(label, request["model"], {"input_tokens": request_input_tokens(request),
+                                                                "output_tokens": e.generated_tokens}, estimated=True)
+                raise
+            except BaseException as e:
+                finish_rows()
+                metrics.record_call(self.role.value, request["model"], error_class=classify_error(e) or type(e).__name__)
+                if reserved is not None:
+                    self.spend.release(reserved + sum(hedge_reserved))
+                raise
+            finally:
+                metrics.LLM_IN_FLIGHT.dec()
+            finish_rows(response)
+            metrics.record_call(self.role.value, request["model"], time.monotonic() - started,
+                                usage_counts(getattr(response, "usage", None)))
+            if reserved is not None:
+                self.spend.settle(reserved, label, request["model"], getattr(response, "usage", None))
+                if hedge_reserved:
+                    # The losing attempt runs to completion and its usage is never seen: charge it at max_tokens
+                    self.spend.release(sum(hedge_reserved))
+                    self.spend.record(f"{label}.hedge", request["model"],
+                                      {"input_tokens": usage_counts(getattr(response, "usage", None))["input_tokens"],
+                                       "output_tokens": int(request.get("max_tokens", 0))}, estimated=True)
+            return response
+        
+        async def call():
+            if self.retry_policy is None:
+                return await attempt()
+            breaker = self.breakers.get(request["model"]) if self.breakers else None
+            try:
+                return await call_with_retry(attempt, self.retry_policy, breaker, stats)
+            finally:
+                if span.attributes.get("llm.attempts", 0) > 1:
+                    metrics.LLM_RETRIES.inc(span.attributes["llm.attempts"] - 1, role=self.role.value)
+        
+        with maybe_span(self.tracer, f"llm.call {label}", {"agent.role": self.role.value,
+                                                             "gen_ai.request.max_tokens": request.get("max_tokens"),
+                                                             "llm.streamed": validate or self.stream_calls}) as span:
+            if self.single_flight is None:
+                response = await call()
+            else:
+                key = request_key(request, scope=self.run_id)
+                if self.single_flight.in_flight(key):
+                    stats["coalesced"] = stats.get("coalesced", 0) + 1
+                    span.set("llm.coalesced", True)
+                    metrics.CACHE_HITS.inc(cache="single_flight")
+                response = await self.single_flight.do(key, call)
+            span.set("gen_ai.request.model", request["model"])
+            counts = usage_counts(getattr(response, "usage", None))
+            for key, count in counts.items():
+                span.set(f"gen_ai.usage.{key}", count)
+            span.set("llm.cost_usd", round(self.spend.prices.cost(request["model"], **counts), 6)
+                     if self.spend is not None else None)
+            span.set("gen_ai.response.finish_reasons", [getattr(response, "stop_reason", None) or "unknown"])
+            return response
+    
+    def _stream_call(self, checkpoint_label: Optional[str], request: Dict[str, Any], validate: bool = False,
+                     progress: Optional["CallProgress"] = None) -> Any:
+        """Stream a call, checking its opening against the agent's validators and the engagement's
+        cancellation between chunks (runs in a worker thread). Leaving the stream closes the connection.
+        Streamed text is counted into the dashboard's `progress` row when one is given.
+        
+        Raises:
+            StreamValidationError: As soon as a validation rule fails
+            EngagementCancelled: When the engagement is cancelled mid-response; the text so far is
+                checkpointed under `checkpoint_label` for a resumed run to continue from
+        """
+        monitor = None
+        if validate:
+            monitor = StreamMonitor(build_rules(self.stream_validators),
+                                    {"company_name": self.company_name, "role": self.role.value},
+                                    request.get("max_tokens", 0))
+        chunks = []
+        with self.client.messages.stream(**request) as stream:
+            for text in stream.text_stream:
+                if monitor is not None:
+                    monitor.feed(text)
+                chunks.append(text)
+                if progress is not None:
+                    progress.add_text(text)
+                if self.cancellation is not None and self.cancellation.cancelled:
+                    checkpoint = self._save_checkpoint(checkpoint_label, "".join(chunks)) if checkpoint_label else None
+                    raise EngagementCancelled(self.cancellation.reason, checkpoint)
+            response = stream.get_final_message()
+        if monitor is not None:
+            monitor.finish()
+        return response
+    
+    def _checkpoint_path(self, label: str) -> Path:
+        """Partial-stream checkpoint of a call in this run (not picked up as an output: no .md suffix)."""
+        return self.output_dir / f"{label}_{self.run_id}.md{CHECKPOINT_SUFFIX}"
+    
+    def _save_checkpoint(self, label: str, text: str) -> Optional[str]:
+        if not text.strip():
+            return None
+        path = self._checkpoint_path(label)
+        atomic_write_text(path, text)
+        return str(path)
+    
+    def _load_checkpoint(self, label: str) -> Optional[str]:
+        path = self._checkpoint_path(label)
+        return path.read_text(encoding='utf-8') if path.exists() else None
+    
+    async def _create_sectioned_message(self, request: Dict[str, Any], sections: List[Any],
+                                        stats: Dict[str, Any]) -> StitchedResponse:
+        """Generate each numbered section as a concurrent call, then stitch them with a consistency pass.
+        
+        All calls share the system prompt and user prompt as a cached prefix. Each section gets
+        an even share of the output token limit plus headroom; the consistency pass reviews the
+        stitched draft and appends its notes (and the structured findings block).
+        """
+        config = self.section_generation
+        start = time.monotonic()
+        section_tokens = max(int(request["max_tokens"] / len(sections) * float(config.get('token_headroom', 1.25))), 256)
+        tasks = [
+            asyncio.ensure_future(self._call_to_completion(
+                f"{self.role.value}.section", stats,
+                dict(cached_request(request, section_instruction(section, sections)), max_tokens=section_tokens)
+            ))
+            for section in sections
+        ]
+        try:
+            responses = list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        text = stitch_sections([response_text(response) for response in responses])
+        if config.get('consistency_pass', True):
+            consistency = await self._call_to_completion(
+                f"{self.role.value}.consistency", stats,
+                dict(cached_request(request, f"Draft deliverable:\n\n{text}\n{CONSISTENCY_INSTRUCTIONS}"),
+                     max_tokens=int(config.get('consistency_max_tokens', 800)))
+            )
+            text = stitch_sections([text, response_text(consistency)])
+            responses.append(consistency)
+        
+        stats["sections"] = len(sections)
+        stats["latency_seconds"] = round(time.monotonic() - start, 3)
+        return StitchedResponse.combine(text, responses)
+    
+    def _build_output(self, response: Any, parameters: Dict[str, Any], dependencies: Optional[List[str]]) -> AgentOutput:
+        """Build the agent output from a Messages API response, splitting off the structured findings block."""
+        content, structured, errors = response.content[0].text, None, []
+        if self.structured_outputs:
+            content, structured, errors = extract_structured_output(content)
+        output = AgentOutput(
+            agent_role=self.role.value,
+            company_name=self.company_name,
+            output_content=content,
+            timestamp=datetime.now().isoformat(),
+            parameters_used=parameters,
+            dependencies=dependencies or [],
+            status="completed",
+            file_path="",
+            structured_output=structured
+        )
+        if errors:
+            output.call_metadata["structured_errors"] = errors
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            output.call_metadata["input_tokens"] = getattr(usage, "input_tokens", None)
+            output.call_metadata["output_tokens"] = getattr(usage, "output_tokens", None)
+        if is_truncated(response):
+            log_event("output.truncated", f"⚠️  {self.role.value} output is truncated at max_tokens", logging.WARNING)
+            output.call_metadata["truncated"] = True
+        return output
         
     def save_output(self, output: AgentOutput) -> str:
-        """Save agent output to markdown file and metadata to JSON."""
-        # Save markdown content
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.role.value}_{timestamp}.md"
-        filepath = self.output_dir / filename
+        """Save agent output to markdown file, metadata to JSON and structured findings to a sidecar JSON.
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(output.output_content)
+        Each file is written atomically under a run-scoped name; a completion marker written last
+        tells readers the whole set is there.
+        """
+        # Run-scoped names keep concurrent engagements and fast reruns from colliding
+        run_id = self.run_id or new_run_id()
+        stem = f"{self.role.value}_{run_id}"
+        filepath = self.output_dir / f"{stem}.md"
+        atomic_write_text(filepath, output.output_content)
+        written = [filepath]
         
-        # Save metadata
+        # Save structured findings next to the markdown
         metadata = asdict(output)
+        structured = metadata.pop('structured_output')
+        if structured is not None:
+            structured_file = self.output_dir / f"{stem}_structured.json"
+            atomic_write_json(structured_file, structured)
+            written.append(structured_file)
+            metadata['structured_file'] = str(structured_file)
+        
+        # Save metadata
         metadata['file_path'] = str(filepath)
-        metadata_file = self.output_dir / f"{self.role.value}_{timestamp}_metadata.json"
+        metadata_file = self.output_dir / f"{stem}_metadata.json"
+        atomic_write_json(metadata_file, metadata)
+        written.append(metadata_file)
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        mark_complete(filepath, written)
         
+        # Checkpoints of this run's interrupted calls are superseded by the complete output
+        for checkpoint in self.output_dir.glob(f"*_{run_id}.md{CHECKPOINT_SUFFIX}"):
+            checkpoint.unlink()
         return str(filepath)
     
+    def load_saved_output(self) -> Optional[AgentOutput]:
+        """This run's complete output as saved by `save_output`, or None (used to resume a run)."""
+        md_file = self.output_dir / f"{self.role.value}_{self.run_id}.md"
+        if not is_complete(md_file):
+            return None
+        with open(md_file.with_name(f"{md_file.stem}_metadata.json"), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        metadata.pop('structured_file', None)
+        return AgentOutput(**metadata, structured_output=load_structured_sidecar(md_file))
+    
+    async def save_output_async(self, output: AgentOutput) -> str:
+        """Save agent output on the background I/O thread so the event loop keeps running."""
+        return await run_in_io_thread(self.save_output, output)
+    
     def load_dependency_outputs(self, dependencies: List[str]) -> List[str]:
         """Load outputs from dependent agents."""
+        with maybe_span(self.tracer, "dependencies.load", {"agent.role": self.role.value,
+                                                           "dependencies": list(dependencies)}) as span:
+            outputs = self._load_dependency_outputs(dependencies)
+            span.set("dependencies.loaded", len(outputs))
+            span.set("bytes", sum(len(output.encode('utf-8')) for output in outputs))
+            return outputs
+    
+    def _load_dependency_outputs(self, dependencies: List[str]) -> List[str]:
         outputs = []
+        # A tight budget summarizes dependencies: structured digests, else the start of each output
+        summarize = bool(dependencies) and self.spend is not None and self.spend.summarize_context(self.role.value)
         for dep in dependencies:
-            dep_dir = self.project_dir / "agent_outputs" / dep
-            if dep_dir.exists():
-                # Find the most recent markdown file for this dependency
-                md_files = list(dep_dir.glob("*.md"))
-                if md_files:
-                    latest_file = max(md_files, key=lambda x: x.stat().st_mtime)
-                    try:
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            outputs.append(f.read())
-                    except IOError as e:
-                        print(f"Warning: Could not read dependency file {latest_file}: {e}")
+            # Find this run's output for the dependency, else the most recent complete one
+            latest_file = find_latest_output(self.project_dir / "agent_outputs" / dep, self.run_id)
+            if latest_file is None:
+                continue
+            structured = load_structured_sidecar(latest_file) if self.structured_context or summarize else None
+            if structured is not None:
+                outputs.append(render_compact(dep, structured))
+                continue
+            try:
+                with open(latest_file, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                context_chars = self.spend.policy.context_chars if summarize else None
+                if context_chars and len(text) > context_chars:
+                    text = text[:context_chars].rstrip() + "\n\n[... truncated to fit the engagement budget]"
+                outputs.append(text)
+            except IOError as e:
+                log_event("dependency.unreadable", f"Warning: Could not read dependency file {latest_file}: {e}",
+                          logging.WARNING, path=str(latest_file))
         return outputs
 
 class BusinessModelAnalyst(BaseAgent):
@@ -126,12 +611,10 @@ class BusinessModelAnalyst(BaseAgent):
         # Format user prompt with parameters
         user_prompt = prompt_manager.format_user_prompt(
             "business_model_analyst",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
         
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("business_model_analyst"),
             system=system_prompt,
@@ -140,16 +623,7 @@ class BusinessModelAnalyst(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         
         return output
 
@@ -175,12 +649,10 @@ class MarketResearcher(BaseAgent):
         # Format user prompt with parameters
         user_prompt = prompt_manager.format_user_prompt(
             "market_researcher",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
         
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("market_researcher"),
             system=system_prompt,
@@ -189,16 +661,7 @@ class MarketResearcher(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         
         return output
 
@@ -218,12 +681,10 @@ class CompetitiveAnalyst(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("competitive_analyst")
         user_prompt = prompt_manager.format_user_prompt(
             "competitive_analyst",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("competitive_analyst"),
             system=system_prompt,
@@ -232,16 +693,7 @@ class CompetitiveAnalyst(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         return output
 
 class FinancialAnalyst(BaseAgent):
@@ -260,12 +712,10 @@ class FinancialAnalyst(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("financial_analyst")
         user_prompt = prompt_manager.format_user_prompt(
             "financial_analyst",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("financial_analyst"),
             system=system_prompt,
@@ -274,16 +724,7 @@ class FinancialAnalyst(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         return output
 
 class RiskAssessor(BaseAgent):
@@ -302,12 +743,10 @@ class RiskAssessor(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("risk_assessor")
         user_prompt = prompt_manager.format_user_prompt(
             "risk_assessor",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("risk_assessor"),
             system=system_prompt,
@@ -316,21 +755,14 @@ class RiskAssessor(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         return output
 
 class StrategyStoryteller(BaseAgent):
     """Agent specialized in creating compelling strategy narratives."""
     
+    LISTS_DEPENDENCIES = True
+    
     def __init__(self, api_key: str, company_name: str, project_dir: Path):
         super().__init__(AgentRole.STRATEGY_STORYTELLER, api_key, company_name, project_dir)
         
@@ -345,12 +777,10 @@ class StrategyStoryteller(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("strategy_storyteller")
         user_prompt = prompt_manager.format_user_prompt(
             "strategy_storyteller",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f"Dependencies: {', '.join(dependencies or [])}\n\n{chr(10).join(dependency_outputs)}" if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("strategy_storyteller"),
             system=system_prompt,
@@ -359,16 +789,7 @@ class StrategyStoryteller(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         
         return output
 
@@ -388,12 +809,10 @@ class ImplementationSpecialist(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("implementation_specialist")
         user_prompt = prompt_manager.format_user_prompt(
             "implementation_specialist",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f'Dependency Outputs: {chr(10).join(dependency_outputs)}' if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("implementation_specialist"),
             system=system_prompt,
@@ -402,27 +821,27 @@ class ImplementationSpecialist(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
-        )
+        output = self._build_output(response, parameters, dependencies)
         return output
 
 class SeniorPartner(BaseAgent):
     """Senior partner agent that reviews and synthesizes all work."""
     
+    LISTS_DEPENDENCIES = True
+    
     def __init__(self, api_key: str, company_name: str, project_dir: Path):
         super().__init__(AgentRole.SENIOR_PARTNER, api_key, company_name, project_dir)
         
+        # Map-reduce review: per-deliverable review tasks started by ConsultingTeam, None for a single review
+        self.review_tasks: Optional[Dict[str, "asyncio.Task"]] = None
+        self.review_stats: Dict[str, Dict[str, Any]] = {}
+        
     async def execute(self, parameters: Dict[str, Any], dependencies: List[str] = None) -> AgentOutput:
         """Review and synthesize all agent outputs as a senior partner."""
         
+        if self.review_tasks is not None:
+            return await self._synthesize_reviews(parameters, dependencies or [])
+        
         # This agent depends on outputs from all other agents
         dependency_outputs = self.load_dependency_outputs(dependencies or [])
         
@@ -431,12 +850,10 @@ class SeniorPartner(BaseAgent):
         system_prompt = prompt_manager.get_enhanced_system_prompt("senior_partner")
         user_prompt = prompt_manager.format_user_prompt(
             "senior_partner",
-            company_name=self.company_name,
-            analysis_parameters=json.dumps(parameters, indent=2),
-            dependency_outputs_section=f"Dependencies: {', '.join(dependencies or [])}\n\n{chr(10).join(dependency_outputs)}" if dependency_outputs else ''
+            **self.prompt_variables(parameters, dependencies, dependency_outputs)
         )
 
-        response = self.client.messages.create(
+        response = await self._create_message(
             model=prompt_manager.get_model_name(),
             max_tokens=prompt_manager.get_agent_token_limit("senior_partner"),
             system=system_prompt,
@@ -445,26 +862,224 @@ class SeniorPartner(BaseAgent):
             ]
         )
 
-        output = AgentOutput(
-            agent_role=self.role.value,
-            company_name=self.company_name,
-            output_content=response.content[0].text,
-            timestamp=datetime.now().isoformat(),
-            parameters_used=parameters,
-            dependencies=dependencies or [],
-            status="completed",
-            file_path=""
+        output = self._build_output(response, parameters, dependencies)
+        return output
+    
+    def review_prompt_variables(self, deliverable: str, content: str) -> Dict[str, str]:
+        """Values for the placeholders of the per-deliverable review prompt."""
+        return {
+            "company_name": self.company_name,
+            "deliverable": deliverable.replace('_', ' ').title(),
+            "deliverable_content": content
+        }
+    
+    def synthesis_prompt_variables(self, parameters: Dict[str, Any], dependencies: List[str],
+                                   reviews: List[str]) -> Dict[str, str]:
+        """Values for the placeholders of the review synthesis prompt."""
+        variables = self.prompt_variables(parameters, dependencies, [])
+        return {
+            "company_name": variables["company_name"],
+            "analysis_parameters": variables["analysis_parameters"],
+            "agent_list": variables["agent_list"],
+            "deliverable_reviews": "\n\n".join(reviews)
+        }
+    
+    async def review_deliverable(self, deliverable: str, content: str) -> str:
+        """Map step: a short quality review of one deliverable, run as soon as it is produced.
+        
+        Args:
+            deliverable: Role of the agent that produced the deliverable
+            content: The deliverable's markdown content
+            
+        Returns:
+            The review as markdown
+        """
+        from prompt_manager import PromptManager
+        prompt_manager = PromptManager()
+        review_config = prompt_manager.get_review_config()
+        user_prompt = prompt_manager.format_review_prompt("review", **self.review_prompt_variables(deliverable, content))
+        
+        response = await self._create_message(
+            label="senior_partner.review",
+            stats=self.review_stats.setdefault(deliverable, {}),
+            model=prompt_manager.get_model_name(),
+            max_tokens=int(review_config.get('review_max_tokens', 800)),
+            system=prompt_manager.get_agent_prompt("senior_partner").system_prompt,
+            messages=[
+                {"role": "user", "content": user_prompt}
+            ]
         )
+        return response.content[0].text
+    
+    async def _synthesize_reviews(self, parameters: Dict[str, Any], dependencies: List[str]) -> AgentOutput:
+        """Reduce step: synthesize the per-deliverable reviews in one short call.
+        
+        A deliverable whose review failed (or never started) is passed in as its saved output instead.
+        """
+        reviewed = [dep for dep in dependencies if dep in self.review_tasks]
+        results = await asyncio.gather(*[self.review_tasks[dep] for dep in reviewed], return_exceptions=True)
+        reviews = {dep: result for dep, result in zip(reviewed, results) if isinstance(result, str)}
+        for dep, result in zip(reviewed, results):
+            if isinstance(result, Exception):
+                log_event("review.failed", f"⚠️  Review of {dep} failed ({result}); synthesizing from its output instead",
+                          logging.WARNING, deliverable=dep, error=str(result))
+        unreviewed = [dep for dep in dependencies if dep not in reviews]
+        
+        sections = [f"### {dep.replace('_', ' ').title()}\n\n{review}" for dep, review in reviews.items()]
+        sections.extend(self.load_dependency_outputs(unreviewed))
+        
+        from prompt_manager import PromptManager
+        prompt_manager = PromptManager()
+        review_config = prompt_manager.get_review_config()
+        user_prompt = prompt_manager.format_review_prompt(
+            "synthesis", **self.synthesis_prompt_variables(parameters, dependencies, sections)
+        )
+        
+        response = await self._create_message(
+            label="senior_partner.synthesis",
+            model=prompt_manager.get_model_name(),
+            max_tokens=int(review_config.get('synthesis_max_tokens', 2000)),
+            system=prompt_manager.get_enhanced_system_prompt("senior_partner"),
+            messages=[
+                {"role": "user", "content": user_prompt}
+            ]
+        )
+        
+        output = self._build_output(response, parameters, dependencies)
+        if reviews:
+            output.output_content += "\n\n## Quality Rating per Deliverable\n\n" + "\n\n".join(sections[:len(reviews)])
+        output.call_metadata["review_mode"] = "map_reduce"
+        output.call_metadata["reviews"] = {dep: self.review_stats.get(dep, {}) for dep in reviews}
+        if unreviewed:
+            output.call_metadata["unreviewed_dependencies"] = unreviewed
         return output
 
+class TeamResources:
+    """Client and caches a long-running process (see daemon.py) shares across engagements.
+
+    Without it every ConsultingTeam starts cold; with it the API client's connection pool, latency
+    percentiles, circuit breaker state and the output-length index of saved artifacts stay warm.
+    """
+
+    def __init__(self, api_key: str, client: Any = None):
+        self.api_key = api_key
+        self._client = client  # e.g. stub_backend.StubAnthropic for load tests; None builds the real client
+        self._histograms: Dict[Path, LatencyHistogram] = {}
+        self._breakers: Optional[CircuitBreakerRegistry] = None
+        self._output_history: Dict[Tuple[Path, ...], OutputLengthHistory] = {}
+        self._scheduler: Optional[CallScheduler] = None
+
+    @property
+    def client(self):
+        """Anthropic client shared by every agent, created on first use."""
+        if self._client is None:
+            import anthropic
+            self._client = anthropic.Anthropic(api_key=self.api_key)
+        return self._client
+
+    def latency_histogram(self, history_file: Path, window: int) -> LatencyHistogram:
+        """Latency history for an output directory, read from disk only the first time."""
+        history_file = Path(history_file).resolve()
+        if history_file not in self._histograms:
+            self._histograms[history_file] = LatencyHistogram(history_file, window=window)
+        return self._histograms[history_file]
+
+    def breakers(self, config: Dict[str, Any]) -> CircuitBreakerRegistry:
+        """Circuit breakers shared by all engagements, so an open backend stays open between them."""
+        if self._breakers is None:
+            self._breakers = CircuitBreakerRegistry.from_config(config)
+        return self._breakers
+
+    def scheduler(self, config: Dict[str, Any]) -> CallScheduler:
+        """Call slots shared by all engagements, so interactive calls overtake queued bulk calls."""
+        if self._scheduler is None:
+            self._scheduler = scheduler = CallScheduler.from_config(config)
+            for priority_class in scheduler.classes:
+                metrics.SCHEDULER_QUEUED.track(functools.partial(scheduler.queued, priority_class),
+                                               priority_class=priority_class)
+        return self._scheduler
+
+    async def output_history(self, dirs: List[Path], chars_per_token: float) -> OutputLengthHistory:
+        """Output lengths of saved agent outputs under `dirs`, scanned once and then kept up to date."""
+        key = tuple(Path(d).resolve() for d in dirs)
+        if key not in self._output_history:
+            self._output_history[key] = await run_in_io_thread(OutputLengthHistory.from_artifacts, dirs,
+                                                               chars_per_token)
+        return self._output_history[key]
+
+    def record_output(self, project_dir: Path, role: str, output_tokens: int):
+        """Add a newly saved output to every cached history a fresh scan would find it in."""
+        project_dir = Path(project_dir).resolve()
+        for key, history in self._output_history.items():
+            if any(root in project_dir.parents for root in key):
+                history.add(role, output_tokens)
+
+    def summary(self) -> Dict[str, Any]:
+        """What is currently warm."""
+        return {
+            "client": self._client is not None,
+            "latency_histories": len(self._histograms),
+            "circuit_breakers": self._breakers.summary() if self._breakers else {},
+            "scheduler": self._scheduler.summary() if self._scheduler else {},
+            "output_histories": {str(key[0]): sum(len(s) for s in history.samples.values())
+                                 for key, history in self._output_history.items()}
+        }
+
 class ConsultingTeam:
     """Manages the team of consulting agents and orchestrates their collaboration."""
     
-    def __init__(self, api_key: str, company_name: str, project_dir: Path):
+    DEPENDENCY_POLICIES = ("wait", "degraded", "skip")
+    REVIEW_MODES = ("map_reduce", "single")
+    VALIDATION_STATS = ("validation_aborts", "aborted_tokens", "saved_tokens")
+    
+    # Deliverable names used in engagement parameters and the agent that produces each
+    DELIVERABLE_AGENTS = {
+        "business_model_analysis": AgentRole.BUSINESS_MODEL_ANALYST,
+        "market_research": AgentRole.MARKET_RESEARCHER,
+        "competitive_analysis": AgentRole.COMPETITIVE_ANALYST,
+        "financial_analysis": AgentRole.FINANCIAL_ANALYST,
+        "risk_assessment": AgentRole.RISK_ASSESSOR,
+        "implementation_plan": AgentRole.IMPLEMENTATION_SPECIALIST,
+        "strategy_narrative": AgentRole.STRATEGY_STORYTELLER,
+        "senior_partner_review": AgentRole.SENIOR_PARTNER
+    }
+    
+    # Inputs each agent cannot run without, and inputs it reads but whose agents may be skipped to save budget
+    CORE_ANALYSIS = [AgentRole.BUSINESS_MODEL_ANALYST, AgentRole.MARKET_RESEARCHER, AgentRole.COMPETITIVE_ANALYST]
+    AGENT_REQUIRES = {
+        AgentRole.FINANCIAL_ANALYST: CORE_ANALYSIS,
+        AgentRole.RISK_ASSESSOR: CORE_ANALYSIS,
+        AgentRole.IMPLEMENTATION_SPECIALIST: CORE_ANALYSIS + [AgentRole.FINANCIAL_ANALYST, AgentRole.RISK_ASSESSOR],
+        AgentRole.STRATEGY_STORYTELLER: CORE_ANALYSIS
+    }
+    AGENT_USES = {
+        AgentRole.STRATEGY_STORYTELLER: [AgentRole.FINANCIAL_ANALYST, AgentRole.RISK_ASSESSOR,
+                                         AgentRole.IMPLEMENTATION_SPECIALIST],
+        AgentRole.SENIOR_PARTNER: CORE_ANALYSIS + [AgentRole.FINANCIAL_ANALYST, AgentRole.RISK_ASSESSOR,
+                                                   AgentRole.IMPLEMENTATION_SPECIALIST, AgentRole.STRATEGY_STORYTELLER]
+    }
+    
+    def __init__(self, api_key: str, company_name: str, project_dir: Path, hedging: Optional[bool] = None,
+                 dependency_policy: Optional[str] = None, report_formats: Optional[List[str]] = None,
+                 review_mode: Optional[str] = None, parallel_sections: Optional[bool] = None,
+                 adaptive_tokens: Optional[bool] = None, priority: Optional[str] = None,
+                 tenant: Optional[str] = None, deadline_seconds: Optional[float] = None,
+                 cancellation: Optional[CancellationToken] = None, budget_usd: Optional[float] = None,
+                 debug: Optional[bool] = None, resources: Optional[TeamResources] = None,
+                 dashboard: Optional["ProgressDashboard"] = None):
         self.api_key = api_key
+        self.resources = resources
         self.company_name = company_name
         self.project_dir = project_dir
         self.project_dir.mkdir(parents=True, exist_ok=True)
+        self.report_formats = report_formats or ["markdown"]
+        for report_format in self.report_formats:
+            if report_format not in REPORT_FORMATS:
+                raise ValueError(f"Unknown report format: {report_format}")
+        self.report_files: List[str] = []
+        self.run_id: Optional[str] = None
+        self.agent_seconds: Dict[str, float] = {}  # Wall time of each agent's last run
+        self.selected_agents: List[AgentRole] = []
         
         # Initialize all agents
         self.agents = {
@@ -478,6 +1093,119 @@ class ConsultingTeam:
             AgentRole.SENIOR_PARTNER: SeniorPartner(api_key, company_name, project_dir)
         }
         
+        # Per-agent timeouts and hedging; latency history is shared by all projects in the output directory
+        from prompt_manager import PromptManager
+        prompt_manager = PromptManager()
+        self.prompt_manager = prompt_manager
+        latency_config = prompt_manager.get_latency_config()
+        hedge_policy = HedgePolicy.from_config(latency_config.get('hedging', {}))
+        if hedging is not None:
+            hedge_policy.enabled = hedging
+        history_file = self.project_dir.parent / "latency_history.json"
+        history_window = latency_config.get('history_window', 200)
+        if resources is not None:
+            self.latency_histogram = resources.latency_histogram(history_file, history_window)
+        else:
+            self.latency_histogram = LatencyHistogram(history_file, window=history_window)
+        self.caller = HedgedCaller(self.latency_histogram, hedge_policy)
+        self.single_flight = SingleFlight.shared() if latency_config.get('single_flight', True) else None
+        
+        # Retries per error class, circuit breaking per backend, and what to do with downstream agents
+        reliability_config = prompt_manager.get_reliability_config()
+        self.retry_policy = RetryPolicy.from_config(reliability_config.get('retry', {}))
+        breaker_config = reliability_config.get('circuit_breaker', {})
+        self.breakers = (resources.breakers(breaker_config) if resources is not None
+                         else CircuitBreakerRegistry.from_config(breaker_config))
+        self.dependency_policy = dependency_policy or reliability_config.get('on_dependency_failure', 'wait')
+        if self.dependency_policy not in self.DEPENDENCY_POLICIES:
+            raise ValueError(f"Unknown dependency failure policy: {self.dependency_policy}")
+        self.recovery_attempts = int(reliability_config.get('recovery_attempts', 1))
+        self.recovery_delay = float(reliability_config.get('recovery_delay_seconds', 30))
+        
+        # Senior partner review: one long call at the end, or per-deliverable reviews plus a short synthesis
+        self.review_mode = review_mode or prompt_manager.get_review_config().get('mode', 'single')
+        if self.review_mode not in self.REVIEW_MODES:
+            raise ValueError(f"Unknown senior partner review mode: {self.review_mode}")
+        
+        # Structured findings replace full prose in downstream prompts and the final report when enabled
+        structured_config = prompt_manager.get_structured_output_config()
+        self.structured_outputs = bool(structured_config.get('enabled', False))
+        self.structured_context = (self.structured_outputs
+                                   and structured_config.get('downstream_context', 'full') == 'structured')
+        
+        # Output token limits learned from past outputs (this output directory plus the configured history)
+        adaptive_config = prompt_manager.get_adaptive_token_config()
+        self.token_policy = TokenBudgetPolicy.from_config(adaptive_config)
+        if adaptive_tokens is not None:
+            self.token_policy.enabled = adaptive_tokens
+        self.token_history_dirs = [self.project_dir.parent] + [
+            Path(__file__).parent / d for d in adaptive_config.get('history_dirs', [])
+        ]
+        self.token_limits: Optional[AdaptiveTokenLimits] = None
+        
+        # Opt-in: generate the numbered sections of each deliverable as concurrent calls
+        section_config = dict(prompt_manager.get_section_generation_config())
+        if parallel_sections is not None:
+            section_config['enabled'] = parallel_sections
+        
+        # Priority class and fair-share tenant of this engagement's calls in a shared process
+        scheduling_config = prompt_manager.get_scheduling_config()
+        self.scheduler = resources.scheduler(scheduling_config) if resources is not None else None
+        self.priority = priority or scheduling_config.get('default_class', 'interactive')
+        if self.priority not in (scheduling_config.get('classes') or DEFAULT_CLASSES):
+            raise ValueError(f"Unknown priority class: {self.priority}")
+        self.tenant = tenant
+        
+        # Overall deadline, and the token that cancels the engagement (the caller's, to cancel it from outside)
+        control_config = prompt_manager.get_engagement_control_config()
+        self.deadline_seconds = deadline_seconds or control_config.get('deadline_seconds')
+        self.cancellation = cancellation or CancellationToken()
+        self.cancel_grace_seconds = float(control_config.get('cancel_grace_seconds', 2.0))
+        
+        # Every call is priced into the ledger; with a budget, calls that would overrun it are refused
+        spend_config = prompt_manager.get_spend_budget_config()
+        self.prices = PriceTable(prompt_manager.get_pricing())
+        self.spend = SpendLedger(budget_usd if budget_usd is not None else spend_config.get('engagement_usd'),
+                                 self.prices, DegradePolicy.from_config(spend_config.get('degrade', {})))
+        
+        # Spans for every phase, agent, call and file operation, exported as an OpenTelemetry trace
+        self.tracing_config = prompt_manager.get_tracing_config()
+        self.tracer = Tracer.from_config(self.tracing_config, **{"consulting.company": company_name})
+        
+        # Debug mode: report callbacks that block the event loop and each phase's memory
+        self.debug_config = prompt_manager.get_debug_config()
+        self.debug = debug if debug is not None else bool(self.debug_config.get('enabled', False))
+        self.memory_profiler: Optional["MemoryProfiler"] = None
+        
+        max_continuations = int(prompt_manager.get_continuation_config().get('max_continuations', 0))
+        validation_config = prompt_manager.get_stream_validation_config()
+        
+        for role, agent in self.agents.items():
+            agent.max_continuations = max_continuations
+            if validation_config.get('enabled', False):
+                agent.stream_validators = (list(validation_config.get('default', []))
+                                           + list(validation_config.get('roles', {}).get(role.value, [])))
+                build_rules(agent.stream_validators)  # Fail fast on unknown rule types
+            agent.section_generation = section_config if section_config.get('enabled', False) else None
+            if agent.section_generation:
+                agent.prompt_sections = split_prompt_sections(
+                    prompt_manager.get_agent_prompt(role.value).user_prompt_template)
+            agent.structured_outputs = self.structured_outputs
+            agent.structured_context = self.structured_context
+            agent.timeout = prompt_manager.get_agent_timeout(role.value)
+            agent.caller = self.caller
+            agent.single_flight = self.single_flight
+            agent.retry_policy = self.retry_policy
+            agent.breakers = self.breakers
+            agent.resources = resources
+            agent.scheduler = self.scheduler
+            agent.priority_class = self.priority
+            agent.cancellation = self.cancellation
+            agent.spend = self.spend
+            agent.tracer = self.tracer
+            agent.dashboard = dashboard
+            agent.stream_calls = bool(control_config.get('stream_calls', True))
+        
         # Define execution dependencies
         self.execution_order = [
             # Phase 1: Core analysis (can run in parallel)
@@ -492,141 +1220,702 @@ class ConsultingTeam:
             [AgentRole.SENIOR_PARTNER]
         ]
         
-    async def execute_consulting_engagement(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the complete consulting engagement with all agents."""
+    async def execute_consulting_engagement(self, parameters: Dict[str, Any],
+                                            resume_run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute the consulting engagement with the agents its deliverables need.
         
-        print(f"🚀 Starting consulting engagement for {self.company_name}")
-        print("=" * 60)
+        `parameters["deliverables"]` (or the deliverables of `parameters["engagement_tier"]`) selects
+        the agents to run; without either, all agents run.
+        
+        Once the engagement is cancelled or its deadline passes, running calls are aborted and no
+        agent starts; agents that usually take longer than the time left are not started either.
+        The run is then saved as resumable: `resume_run_id` continues it, reusing its complete
+        outputs and checkpointed partial streams.
+        
+        The engagement is traced as one span tree, written to the project directory when it ends
+        (however it ends). In debug mode, event-loop stalls and per-phase memory are written
+        there too.
+        """
+        started = time.monotonic()
+        status = "failed"
+        watchdog = self._start_debug()
+        try:
+            with log_context(company=self.company_name), \
+                    maybe_span(self.tracer, "engagement", {"consulting.company": self.company_name,
+                                                           "consulting.resumed_run": resume_run_id}) as span:
+                engagement = await self._execute_engagement(parameters, resume_run_id)
+                status = engagement["status"]
+                span.set("consulting.run_id", self.run_id)
+                span.set("consulting.status", status)
+                span.set("llm.cost_usd", engagement["spend"]["spent_usd"])
+                return engagement
+        except asyncio.CancelledError:
+            status = "interrupted"
+            raise
+        finally:
+            metrics.ENGAGEMENTS.inc(status=status)
+            metrics.ENGAGEMENT_DURATION.observe(time.monotonic() - started)
+            if watchdog is not None:
+                await self._finish_debug(watchdog, time.time() - (time.monotonic() - started))
+            if self.tracer is not None:
+                await self.tracer.export_async(self.trace_file, self.tracing_config.get('collector_endpoint'))
+    
+    @property
+    def trace_file(self) -> Path:
+        return self.project_dir / self.tracing_config.get('file', 'trace.json')
+    
+    def _start_debug(self) -> Optional["LoopWatchdog"]:
+        """Watch the event loop and trace allocations for this engagement (debug mode only)."""
+        if not self.debug:
+            return None
+        from loop_health import LoopWatchdog, MemoryProfiler  # tracemalloc is only imported in debug mode
+        watchdog = LoopWatchdog.acquire(float(self.debug_config.get('slow_callback_ms', 100)) / 1000,
+                                        stack_depth=int(self.debug_config.get('stack_depth', 12)))
+        if self.debug_config.get('memory', True):
+            self.memory_profiler = MemoryProfiler(int(self.debug_config.get('top_allocators', 10)),
+                                                  int(self.debug_config.get('traceback_frames', 1)), watchdog)
+            self.memory_profiler.start()
+        return watchdog
+    
+    async def _finish_debug(self, watchdog: "LoopWatchdog", started: float):
+        """Stop the debug instrumentation and write what it saw to the project directory."""
+        watchdog.release()
+        phases = []
+        if self.memory_profiler is not None:
+            self.memory_profiler.stop()
+            phases = [memory.to_dict() for memory in self.memory_profiler.phases]
+        stalls = watchdog.stalls_since(started)
+        report = {
+            "run_id": self.run_id,
+            "slow_callback_ms": watchdog.threshold * 1000,
+            "loop_stalls": [stall.to_dict() for stall in stalls],
+            "blocked_seconds": round(sum(stall.seconds for stall in stalls), 4),
+            "phases": phases
+        }
+        path = self.project_dir / self.debug_config.get('file', 'debug_report.json')
+        await run_in_io_thread(atomic_write_json, path, report)
+        log_event("debug.report", f"🩺 {len(stalls)} event-loop stalls over {watchdog.threshold * 1000:.0f}ms; "
+                  f"debug report: {path}", loop_stalls=len(stalls), path=str(path))
+    
+    @contextmanager
+    def _phase_memory(self, name: str, span: Any) -> Iterator[None]:
+        """Measure a phase's memory in debug mode, onto its span and the progress output."""
+        if self.memory_profiler is None:
+            yield
+            return
+        with self.memory_profiler.phase(name) as measured:
+            yield
+        memory = measured.get("memory")
+        if memory is not None:
+            from loop_health import format_phase_memory
+            span.set("memory.peak_bytes", memory.peak_bytes)
+            span.set("memory.growth_bytes", memory.growth_bytes)
+            log_event("phase.memory", format_phase_memory(memory), phase=name, peak_bytes=memory.peak_bytes,
+                      growth_bytes=memory.growth_bytes)
+    
+    async def _execute_engagement(self, parameters: Dict[str, Any], resume_run_id: Optional[str]) -> Dict[str, Any]:
+        self.cancellation.start(self.deadline_seconds)
+        
+        log_event("engagement.started", f"🚀 Starting consulting engagement for {self.company_name}")
+        console("=" * 60)
+        
+        # Fail before any API spend if a prompt template cannot be rendered
+        template_errors, _ = self.validate_templates()
+        if template_errors:
+            raise ValueError("Prompt template errors:\n" + "\n".join(template_errors))
+        
+        # Prune the agent DAG to the requested deliverables and their required inputs
+        tier = self._get_engagement_tier(parameters)
+        deliverables = parameters.get("deliverables") or tier.get("deliverables")
+        self.selected_agents = self.select_agents(deliverables)
+        if self.token_policy.enabled:
+            if self.resources is not None:
+                history = await self.resources.output_history(self.token_history_dirs, self.token_policy.chars_per_token)
+            else:
+                history = await run_in_io_thread(OutputLengthHistory.from_artifacts, self.token_history_dirs,
+                                                 self.token_policy.chars_per_token)
+            self.token_limits = AdaptiveTokenLimits(history, self.token_policy)
+        self._apply_tier_token_limits(tier)
+        execution_order = [[role for role in phase if role in self.selected_agents] for phase in self.execution_order]
+        execution_order = [phase for phase in execution_order if phase]
+        log_event("engagement.planned", f"🧭 Engagement plan: {len(self.selected_agents)} of {len(self.agents)} agents"
+                  f"{' (' + parameters['engagement_tier'] + ' tier)' if parameters.get('engagement_tier') else ''}",
+                  agents=[role.value for role in self.selected_agents], tier=parameters.get('engagement_tier'))
         
         results = {}
+        unavailable = set()  # Roles whose output is not available to downstream agents
+        
+        # One run id per engagement names every artifact it writes; a resumed run keeps its id
+        self.run_id = resume_run_id or new_run_id()
+        bind_log_context(run_id=self.run_id)
+        for agent in self.agents.values():
+            agent.run_id = self.run_id
+            agent.tenant = self.tenant or self.run_id  # Without a tenant, each engagement gets its own share
+            agent.resume_checkpoints = resume_run_id is not None
+        if resume_run_id:
+            log_event("engagement.resumed", f"♻️  Resuming run {resume_run_id}")
+        if self.cancellation.deadline is not None:
+            log_event("engagement.deadline", f"⏰ Deadline: {self.deadline_seconds:.0f}s",
+                      deadline_seconds=self.deadline_seconds)
+        
+        # In map-reduce review mode the senior partner reviews each deliverable as soon as it is produced
+        senior_partner = self.agents[AgentRole.SENIOR_PARTNER]
+        map_reduce = self.review_mode == "map_reduce" and AgentRole.SENIOR_PARTNER in self.selected_agents
+        senior_partner.review_tasks = {} if map_reduce else None
+        senior_partner.review_stats = {}
         
         # Execute agents in phases
-        for phase_num, phase_agents in enumerate(self.execution_order, 1):
-            print(f"\n📋 Phase {phase_num}: Executing {len(phase_agents)} agents")
-            print("-" * 40)
-            
-            # Execute agents in this phase (can run in parallel)
-            phase_tasks = []
-            for agent_role in phase_agents:
-                # Determine dependencies for this agent
-                dependencies = self._get_agent_dependencies(agent_role)
-                task = self._execute_agent_with_dependencies(agent_role, parameters, dependencies)
-                phase_tasks.append(task)
-            
-            # Wait for all agents in this phase to complete
-            phase_results = await asyncio.gather(*phase_tasks, return_exceptions=True)
-            
-            # Process results
-            for agent_role, result in zip(phase_agents, phase_results):
-                if isinstance(result, Exception):
-                    print(f"❌ {agent_role.value} failed: {result}")
-                    results[agent_role.value] = {"status": "error", "error": str(result)}
-                else:
-                    print(f"✅ {agent_role.value} completed successfully")
-                    results[agent_role.value] = result
-                    
-                    # Save output
-                    filepath = self.agents[agent_role].save_output(result)
-                    print(f"   📁 Output saved to: {filepath}")
+        try:
+            for phase_num, phase_agents in enumerate(execution_order, 1):
+                with maybe_span(self.tracer, f"phase {phase_num}",
+                                {"consulting.phase": phase_num,
+                                 "consulting.agents": [role.value for role in phase_agents]}) as span, \
+                        self._phase_memory(f"phase {phase_num}", span):
+                    await self._execute_phase(phase_num, phase_agents, parameters, results, unavailable,
+                                              resume_run_id is not None)
+        except asyncio.CancelledError:
+            # Ctrl-C or a shutting-down server: record what finished so the run can be resumed, then stop
+            self.cancellation.cancel("interrupted")
+            await self._discard_pending_reviews()
+            for role in self.selected_agents:
+                results.setdefault(role.value, {"status": "cancelled", "reason": "interrupted"})
+            await run_in_io_thread(self._save_run_metadata, self._engagement_record(parameters, results, None))
+            log_event("engagement.interrupted", f"⏸️  Engagement interrupted; resume with --resume (run {self.run_id})",
+                      logging.WARNING)
+            raise
+        
+        # Reviews whose synthesis never ran (senior partner skipped or failed) are not needed any more
+        await self._discard_pending_reviews()
         
         # Generate final report
-        final_report = await self._generate_final_report(results, parameters)
+        with maybe_span(self.tracer, "report.write", {"report.formats": self.report_formats}) as span, \
+                self._phase_memory("report", span):
+            final_report = await self._generate_final_report(results, parameters)
+            span.set("bytes", sum(Path(path).stat().st_size for path in self.report_files))
         
-        return {
+        # Persist latency observations so the next run hedges against warm percentiles
+        await run_in_io_thread(self.latency_histogram.save)
+        
+        engagement = self._engagement_record(parameters, results, final_report)
+        spend = engagement["spend"]
+        budget = f" of a ${spend['budget_usd']:.2f} budget" if spend["budget_usd"] is not None else ""
+        log_event("engagement.spend", f"💰 Spend: ${spend['spent_usd']:.4f} over {spend['calls']} calls{budget}",
+                  spent_usd=spend["spent_usd"], calls=spend["calls"], budget_usd=spend["budget_usd"])
+        if self.token_limits is not None:
+            engagement["token_budget"] = self._token_budget_report(results)
+            await run_in_io_thread(atomic_write_text, self.project_dir / "token_budget_report.md",
+                                   format_report(engagement["token_budget"]))
+            log_event("token_budget.report", f"🎯 Adaptive token limits reclaimed "
+                      f"{engagement['token_budget']['reclaimed_tokens']} output tokens of rate-limit reservation",
+                      reclaimed_tokens=engagement['token_budget']['reclaimed_tokens'])
+        await run_in_io_thread(self._save_run_metadata, engagement)
+        return engagement
+    
+    async def _execute_phase(self, phase_num: int, phase_agents: List[AgentRole], parameters: Dict[str, Any],
+                             results: Dict[str, Any], unavailable: set, resuming: bool = False):
+        """Run the agents of one phase in parallel and record their results.
+        
+        Agents whose output was saved by the run being resumed are reused. Once the engagement is
+        cancelled no agent starts, and with a deadline an agent whose median duration exceeds the
+        time left is skipped; agents still running when the deadline passes are cancelled.
+        """
+        console("")
+        log_event("phase.started", f"📋 Phase {phase_num}: Executing {len(phase_agents)} agents", phase=phase_num,
+                  agents=[role.value for role in phase_agents])
+        console("-" * 40)
+        
+        # Execute agents in this phase (can run in parallel)
+        phase_tasks = []
+        runnable = []
+        for agent_role in phase_agents:
+            if resuming:
+                saved = await run_in_io_thread(self.agents[agent_role].load_saved_output)
+                if saved is not None:
+                    log_event("agent.reused", f"♻️  {agent_role.value} reused from the interrupted run", role=agent_role.value)
+                    results[agent_role.value] = saved
+                    self._start_review(agent_role, saved)
+                    self._release_content(saved)
+                    continue
+            if self.cancellation.cancelled:
+                log_event("agent.not_started", f"⏹️  {agent_role.value} not started: engagement {self.cancellation.reason}",
+                          role=agent_role.value, reason=self.cancellation.reason)
+                results[agent_role.value] = {"status": "cancelled", "reason": self.cancellation.reason}
+                unavailable.add(agent_role.value)
+                continue
+            # Determine dependencies for this agent
+            dependencies = self._get_agent_dependencies(agent_role)
+            missing = [dep for dep in dependencies if dep in unavailable]
+            if missing and self.dependency_policy != "degraded":
+                log_event("agent.skipped", f"⏭️  {agent_role.value} skipped: missing inputs from {', '.join(missing)}",
+                          role=agent_role.value, reason="missing_dependencies", missing=missing)
+                results[agent_role.value] = {"status": "skipped", "missing_dependencies": missing}
+                unavailable.add(agent_role.value)
+                continue
+            estimate = self.latency_histogram.percentile(agent_role.value, 50)
+            if not self.cancellation.can_finish(estimate):
+                log_event("agent.skipped", f"⏭️  {agent_role.value} skipped: usually takes {estimate:.0f}s, "
+                          f"{self.cancellation.remaining():.0f}s left before the deadline",
+                          role=agent_role.value, reason="deadline", estimated_seconds=round(estimate, 3))
+                results[agent_role.value] = {"status": "skipped", "reason": "deadline",
+                                             "estimated_seconds": round(estimate, 3)}
+                unavailable.add(agent_role.value)
+                continue
+            if not self._required_by_selected(agent_role) and self.spend.skip_optional(agent_role.value):
+                results[agent_role.value] = {"status": "skipped", "reason": "budget"}
+                unavailable.add(agent_role.value)
+                continue
+            if missing:
+                log_event("agent.degraded", f"⚠️  {agent_role.value} running degraded without {', '.join(missing)}",
+                          logging.WARNING, role=agent_role.value, missing=missing)
+                dependencies = [dep for dep in dependencies if dep not in unavailable]
+            phase_tasks.append(asyncio.ensure_future(
+                self._execute_agent_with_dependencies(agent_role, parameters, dependencies, missing)
+            ))
+            runnable.append((agent_role, dependencies, missing))
+        
+        # Wait for all agents in this phase to complete, or for the engagement to be cancelled
+        await self.cancellation.wait_for(phase_tasks, self.cancel_grace_seconds)
+        phase_results = await asyncio.gather(*phase_tasks, return_exceptions=True)
+        
+        # Under the "wait" policy, give failed agents another chance before their dependents start
+        if self.dependency_policy == "wait" and not self.cancellation.cancelled:
+            phase_results = await self._recover_failed_agents(runnable, phase_results, parameters)
+        
+        # Process results
+        for (agent_role, _, _), result in zip(runnable, phase_results):
+            if isinstance(result, AgentOutput):
+                log_event("agent.completed", f"✅ {agent_role.value} completed successfully\n"
+                          f"   📁 Output saved to: {result.file_path}", role=agent_role.value,
+                          duration_seconds=self.agent_seconds.get(agent_role.value), path=result.file_path,
+                          input_tokens=result.call_metadata.get("input_tokens"),
+                          output_tokens=result.call_metadata.get("output_tokens"))
+                results[agent_role.value] = result
+            elif isinstance(result, BudgetExceeded):
+                log_event("agent.skipped", f"💸 {agent_role.value} skipped: {result}", role=agent_role.value, reason="budget")
+                results[agent_role.value] = {"status": "skipped", "reason": "budget",
+                                             "projected_usd": round(result.projected_usd, 6),
+                                             "remaining_usd": round(result.remaining_usd, 6)}
+                unavailable.add(agent_role.value)
+            elif self.cancellation.cancelled or not isinstance(result, Exception):
+                # Aborted by the cancellation, or failed only because its calls were cut short
+                checkpoint = getattr(result, "checkpoint", None)
+                log_event("agent.cancelled", f"⏹️  {agent_role.value} cancelled: engagement {self.cancellation.reason}"
+                          f"{f' (partial response kept in {checkpoint})' if checkpoint else ''}",
+                          logging.WARNING, role=agent_role.value, reason=self.cancellation.reason,
+                          checkpoint=checkpoint)
+                results[agent_role.value] = {"status": "cancelled", "reason": self.cancellation.reason,
+                                             "checkpoint": checkpoint}
+                unavailable.add(agent_role.value)
+            else:
+                log_event("agent.failed", f"❌ {agent_role.value} failed: {result}", logging.ERROR, role=agent_role.value,
+                          error_class=classify_error(result) or type(result).__name__, error=str(result))
+                call_stats = self.agents[agent_role].call_stats
+                results[agent_role.value] = {
+                    "status": "error",
+                    "error": str(result),
+                    "error_class": classify_error(result) or type(result).__name__,
+                    "retries": call_stats.get("retries", 0),
+                    "errors": call_stats.get("errors", {}),
+                    **{key: call_stats[key] for key in self.VALIDATION_STATS if key in call_stats}
+                }
+                unavailable.add(agent_role.value)
+    
+    def _required_by_selected(self, agent_role: AgentRole) -> bool:
+        """Whether another agent of the engagement cannot run without this one."""
+        return any(agent_role in self.AGENT_REQUIRES.get(role, []) for role in self.selected_agents)
+    
+    def _engagement_status(self, results: Dict[str, Any]) -> str:
+        """completed, partial (agents failed or were skipped), or why the engagement was cut short."""
+        statuses = [result if isinstance(result, dict) else {} for result in results.values()]
+        if any(status.get("status") == "cancelled" for status in statuses):
+            return "deadline_exceeded" if self.cancellation.reason == "deadline" else "cancelled"
+        if any(status.get("reason") == "deadline" for status in statuses):
+            return "deadline_exceeded"
+        return "completed" if not any(statuses) else "partial"
+    
+    def _engagement_record(self, parameters: Dict[str, Any], results: Dict[str, Any],
+                           final_report: Optional[str]) -> Dict[str, Any]:
+        """The engagement result returned to callers and saved (without agent outputs) as run metadata."""
+        engagement = {
             "company_name": self.company_name,
+            "run_id": self.run_id,
             "engagement_parameters": parameters,
+            "selected_agents": [role.value for role in self.selected_agents],
             "agent_results": results,
             "final_report": final_report,
+            "report_files": self.report_files,
+            "latency": {
+                "percentiles": self.latency_histogram.summary(),
+                "calls": self.caller.calls,
+                "hedged_calls": self.caller.hedges,
+                "coalesced_calls": sum(result.call_metadata.get("coalesced", 0) for result in results.values()
+                                       if isinstance(result, AgentOutput)),
+                "priority_class": self.priority,
+                "queue_wait_seconds": round(sum(result.call_metadata.get("queue_wait", 0.0)
+                                                for result in results.values() if isinstance(result, AgentOutput)), 3)
+            },
+            "reliability": self._summarize_reliability(results),
+            "spend": self.spend.summary(),
+            "trace": {"trace_id": self.tracer.trace_id, "file": str(self.trace_file)} if self.tracer else None,
             "timestamp": datetime.now().isoformat(),
-            "status": "completed"
+            "status": self._engagement_status(results),
+            "cancellation": {
+                "reason": self.cancellation.reason,
+                "deadline_seconds": self.deadline_seconds,
+                "elapsed_seconds": round(self.cancellation.elapsed(), 3)
+            }
         }
+        engagement["resumable"] = engagement["status"] in ("cancelled", "deadline_exceeded")
+        return engagement
+    
+    def resumable_run(self) -> Optional[Dict[str, Any]]:
+        """Run metadata of this company's last engagement if it was cut short and can be resumed."""
+        path = self.project_dir / "run_metadata.json"
+        if not path.exists():
+            return None
+        run_metadata = json.loads(path.read_text(encoding='utf-8'))
+        return run_metadata if run_metadata.get("resumable") else None
+    
+    async def _recover_failed_agents(self, runnable: List[tuple], phase_results: List[Any],
+                                     parameters: Dict[str, Any]) -> List[Any]:
+        """Re-run agents of a phase that failed transiently so downstream agents wait for their inputs.
+        
+        Only retryable errors and open circuits are worth waiting for; errors such as a bad
+        prompt template would fail the same way again.
+        """
+        phase_results = list(phase_results)
+        for attempt in range(self.recovery_attempts):
+            failed = [i for i, result in enumerate(phase_results)
+                      if isinstance(result, Exception)
+                      and (classify_error(result) is not None or isinstance(result, CircuitOpenError))]
+            if not failed or not self.cancellation.can_finish(self.recovery_delay):
+                break
+            log_event("recovery.waiting", f"⏳ Waiting {self.recovery_delay:.0f}s before recovery attempt {attempt + 1} "
+                      f"for {', '.join(runnable[i][0].value for i in failed)}",
+                      attempt=attempt + 1, roles=[runnable[i][0].value for i in failed])
+            await asyncio.sleep(self.recovery_delay)
+            tasks = [asyncio.ensure_future(self._execute_agent_with_dependencies(
+                runnable[i][0], parameters, runnable[i][1], runnable[i][2], recovery=True)) for i in failed]
+            await self.cancellation.wait_for(tasks, self.cancel_grace_seconds)
+            retried = await asyncio.gather(*tasks, return_exceptions=True)
+            for i, result in zip(failed, retried):
+                phase_results[i] = result
+        return phase_results
+    
+    def _summarize_reliability(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Aggregate error and retry counts across agents for the run metadata."""
+        errors: Dict[str, int] = {}
+        retries = 0
+        validation = {key: 0 for key in self.VALIDATION_STATS}
+        for result in results.values():
+            stats = result.call_metadata if isinstance(result, AgentOutput) else result
+            retries += stats.get("retries", 0)
+            for error_class, count in stats.get("errors", {}).items():
+                errors[error_class] = errors.get(error_class, 0) + count
+            for key in self.VALIDATION_STATS:
+                validation[key] += stats.get(key, 0)
+        return {
+            "dependency_policy": self.dependency_policy,
+            "retries": retries,
+            "errors": errors,
+            "stream_validation": validation,
+            "failed_agents": [role for role, r in results.items() if isinstance(r, dict) and r.get("status") == "error"],
+            "skipped_agents": [role for role, r in results.items() if isinstance(r, dict) and r.get("status") == "skipped"],
+            "cancelled_agents": [role for role, r in results.items()
+                                 if isinstance(r, dict) and r.get("status") == "cancelled"],
+            "degraded_agents": [role for role, r in results.items()
+                                if isinstance(r, AgentOutput) and r.call_metadata.get("missing_dependencies")],
+            "circuit_breakers": self.breakers.summary()
+        }
+    
+    def _save_run_metadata(self, engagement: Dict[str, Any]):
+        """Save run-level metadata (status, latency, reliability) next to the agent outputs."""
+        run_metadata = {key: value for key, value in engagement.items() if key != "agent_results"}
+        run_metadata["agent_status"] = {
+            role: result.status if isinstance(result, AgentOutput) else result.get("status")
+            for role, result in engagement["agent_results"].items()
+        }
+        atomic_write_json(self.project_dir / "run_metadata.json", run_metadata)
+    
+    def validate_templates(self) -> Tuple[List[str], List[str]]:
+        """Check every prompt template against the placeholders the agents supply.
+        
+        Returns:
+            Tuple of (errors, warnings)
+        """
+        senior_partner = self.agents[AgentRole.SENIOR_PARTNER]
+        supplied = set(senior_partner.prompt_variables({}, [], []))
+        review_supplied = {
+            "review": set(senior_partner.review_prompt_variables("", "")),
+            "synthesis": set(senior_partner.synthesis_prompt_variables({}, [], []))
+        }
+        return check_templates(self.prompt_manager, supplied, review_supplied)
+    
+    def dry_run(self, parameters: Dict[str, Any]) -> EngagementEstimate:
+        """Plan the engagement and estimate its tokens, cost and wall time without calling the API.
+        
+        Renders every selected agent's full prompt, with short placeholders standing in for
+        dependency outputs; their size is taken from past outputs (or the structured digest size).
+        Output lengths come from output history and durations from the latency histogram.
+        
+        Args:
+            parameters: Engagement parameters as for execute_consulting_engagement
+            
+        Returns:
+            The estimate, including rendered prompts and any template errors
+        """
+        tier = self._get_engagement_tier(parameters)
+        self.selected_agents = self.select_agents(parameters.get("deliverables") or tier.get("deliverables"))
+        history = OutputLengthHistory.from_artifacts(self.token_history_dirs, self.token_policy.chars_per_token)
+        if self.token_policy.enabled:
+            self.token_limits = AdaptiveTokenLimits(history, self.token_policy)
+        self._apply_tier_token_limits(tier)
+        
+        config = self.prompt_manager.get_dry_run_config()
+        model = self.prompt_manager.get_model_name()
+        estimate = EngagementEstimate(model, self.prices.rates(model))
+        estimate.errors, estimate.warnings = self.validate_templates()
+        estimate.phases = [[role.value for role in phase if role in self.selected_agents]
+                           for phase in self.execution_order]
+        estimate.phases = [phase for phase in estimate.phases if phase]
+        tokens_per_second = float(config.get('output_tokens_per_second', 60))
+        digest_tokens = int(config.get('dependency_digest_tokens', 400))
+        review_config = self.prompt_manager.get_review_config()
+        
+        def max_tokens(role: AgentRole) -> int:
+            return self.agents[role].max_tokens or self.prompt_manager.get_agent_token_limit(role.value)
+        
+        def context_tokens(dep: str) -> int:
+            if self.structured_context:
+                return digest_tokens
+            return history.percentile(dep, 50) or max_tokens(AgentRole(dep))
+        
+        for role in self.selected_agents:
+            agent = self.agents[role]
+            dependencies = self._get_agent_dependencies(role)
+            placeholders = [f"[{dep} output]" for dep in dependencies]
+            system_prompt = self.prompt_manager.get_enhanced_system_prompt(role.value)
+            try:
+                if role == AgentRole.SENIOR_PARTNER and self.review_mode == "map_reduce":
+                    review_tokens = int(review_config.get('review_max_tokens', 800))
+                    user_prompt = self.prompt_manager.format_review_prompt(
+                        "synthesis", **agent.synthesis_prompt_variables(parameters, dependencies, placeholders))
+                    estimate.add(role.value, estimate_call(
+                        "senior_partner.synthesis", system_prompt + user_prompt, review_tokens * len(dependencies),
+                        None, int(review_config.get('synthesis_max_tokens', 2000)),
+                        self.latency_histogram.percentile("senior_partner.synthesis", 50), tokens_per_second))
+                    for dep in dependencies:
+                        review_prompt = self.prompt_manager.format_review_prompt(
+                            "review", **agent.review_prompt_variables(dep, ""))
+                        estimate.add(role.value, estimate_call(
+                            f"senior_partner.review ({dep})",
+                            self.prompt_manager.get_agent_prompt("senior_partner").system_prompt + review_prompt,
+                            history.percentile(dep, 50) or max_tokens(AgentRole(dep)), None, review_tokens,
+                            self.latency_histogram.percentile("senior_partner.review", 50), tokens_per_second))
+                else:
+                    user_prompt = self.prompt_manager.format_user_prompt(
+                        role.value, **agent.prompt_variables(parameters, dependencies, placeholders))
+                    estimate.add(role.value, estimate_call(
+                        role.value, system_prompt + user_prompt, sum(context_tokens(dep) for dep in dependencies),
+                        history.percentile(role.value, 50), max_tokens(role),
+                        self.latency_histogram.percentile(role.value, 50), tokens_per_second))
+            except (KeyError, ValueError, IndexError) as e:
+                estimate.errors.append(f"{role.value} prompt does not render: {e!r}")
+                continue
+            estimate.prompts[role.value] = f"{system_prompt}\n\n---\n\n{user_prompt}"
+        return estimate
+    
+    def select_agents(self, deliverables: Optional[List[str]] = None) -> List[AgentRole]:
+        """Compute the minimal set of agents for the requested deliverables.
+        
+        Each deliverable's agent is selected together with the transitive closure of its inputs,
+        required and optional, so the storyteller and the senior partner get every output they read.
+        
+        Args:
+            deliverables: Deliverable names (see DELIVERABLE_AGENTS); None selects every agent
+            
+        Returns:
+            Selected agent roles in execution order
+            
+        Raises:
+            ValueError: If a deliverable is unknown
+        """
+        if not deliverables:
+            return list(self.agents.keys())
+        
+        unknown = [d for d in deliverables if d not in self.DELIVERABLE_AGENTS]
+        if unknown:
+            raise ValueError(f"Unknown deliverables: {', '.join(unknown)}. "
+                             f"Choose from: {', '.join(self.DELIVERABLE_AGENTS)}")
+        
+        selected = set()
+        pending = [self.DELIVERABLE_AGENTS[d] for d in deliverables]
+        while pending:
+            role = pending.pop()
+            if role not in selected:
+                selected.add(role)
+                pending.extend(self.AGENT_REQUIRES.get(role, []) + self.AGENT_USES.get(role, []))
+        return [role for phase in self.execution_order for role in phase if role in selected]
+    
+    def _get_engagement_tier(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Look up the engagement tier named in the parameters, if any."""
+        tier_name = parameters.get("engagement_tier")
+        return self.prompt_manager.get_engagement_tier(tier_name) if tier_name else {}
+    
+    def _apply_tier_token_limits(self, tier: Dict[str, Any]):
+        """Set each agent's output token limit: adaptive or configured, scaled by the tier's max_tokens_scale."""
+        scale = float(tier.get("max_tokens_scale", 1.0))
+        for role, agent in self.agents.items():
+            limit = self.prompt_manager.get_agent_token_limit(role.value)
+            if self.token_limits is not None:
+                limit = self.token_limits.predict(role.value, limit)
+            agent.max_tokens = int(limit * scale) if scale != 1.0 or self.token_limits is not None else None
+    
+    def _token_budget_report(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Predicted vs. actual output tokens for the agents that ran in this engagement."""
+        configured = {role.value: self.prompt_manager.get_agent_token_limit(role.value) for role in self.selected_agents}
+        actual = {role: result.call_metadata.get("output_tokens") for role, result in results.items()
+                  if isinstance(result, AgentOutput)}
+        return self.token_limits.report(configured, actual)
     
     def _get_agent_dependencies(self, agent_role: AgentRole) -> List[str]:
-        """Get the list of agent roles that this agent depends on."""
-        if agent_role == AgentRole.STRATEGY_STORYTELLER:
-            # Depends on all analysis agents
-            return [role.value for role in [AgentRole.BUSINESS_MODEL_ANALYST, AgentRole.MARKET_RESEARCHER, 
-                                          AgentRole.COMPETITIVE_ANALYST, AgentRole.FINANCIAL_ANALYST, 
-                                          AgentRole.RISK_ASSESSOR, AgentRole.IMPLEMENTATION_SPECIALIST]]
-        elif agent_role == AgentRole.SENIOR_PARTNER:
-            # Depends on all agents
-            return [role.value for role in self.agents.keys() if role != AgentRole.SENIOR_PARTNER]
-        elif agent_role in [AgentRole.FINANCIAL_ANALYST, AgentRole.RISK_ASSESSOR]:
-            # Depends on core analysis agents
-            return [role.value for role in [AgentRole.BUSINESS_MODEL_ANALYST, AgentRole.MARKET_RESEARCHER, 
-                                          AgentRole.COMPETITIVE_ANALYST]]
-        elif agent_role == AgentRole.IMPLEMENTATION_SPECIALIST:
-            # Depends on analysis and risk assessment
-            return [role.value for role in [AgentRole.BUSINESS_MODEL_ANALYST, AgentRole.MARKET_RESEARCHER, 
-                                          AgentRole.COMPETITIVE_ANALYST, AgentRole.FINANCIAL_ANALYST, 
-                                          AgentRole.RISK_ASSESSOR]]
-        else:
-            # No dependencies for core analysis agents
-            return []
+        """Get the list of agent roles that this agent depends on in the current engagement."""
+        selected = self.selected_agents or list(self.agents.keys())
+        required = self.AGENT_REQUIRES.get(agent_role, [])
+        optional = [role for role in self.AGENT_USES.get(agent_role, []) if role in selected]
+        return [role.value for role in required + optional]
     
-    async def _execute_agent_with_dependencies(self, agent_role: AgentRole, parameters: Dict[str, Any], dependencies: List[str]) -> AgentOutput:
-        """Execute an agent with its dependencies."""
+    async def _execute_agent_with_dependencies(self, agent_role: AgentRole, parameters: Dict[str, Any], dependencies: List[str],
+                                               missing_dependencies: Optional[List[str]] = None,
+                                               recovery: bool = False) -> AgentOutput:
+        """Execute an agent with its dependencies and save its output as soon as it finishes.
+        
+        Saving here, not after the phase, keeps finished outputs of a phase that is later cancelled.
+        """
         agent = self.agents[agent_role]
-        return await agent.execute(parameters, dependencies)
+        if not recovery:
+            agent.call_stats = {}
+        with log_context(role=agent_role.value), \
+                maybe_span(self.tracer, f"agent {agent_role.value}", {"agent.role": agent_role.value,
+                                                                      "agent.recovery": recovery or None}) as span:
+            output = await agent.execute(parameters, dependencies)
+            output.call_metadata.update(agent.call_stats)
+            if missing_dependencies:
+                output.call_metadata["missing_dependencies"] = missing_dependencies
+            span.set("gen_ai.usage.input_tokens", output.call_metadata.get("input_tokens"))
+            span.set("gen_ai.usage.output_tokens", output.call_metadata.get("output_tokens"))
+            with maybe_span(self.tracer, "output.save", {"agent.role": agent_role.value}) as save_span:
+                output.file_path = await agent.save_output_async(output)
+                save_span.set("bytes", len(output.output_content.encode('utf-8')))
+        self.agent_seconds[agent_role.value] = round(span.duration, 3)
+        if self.resources is not None and output.call_metadata.get("output_tokens"):
+            self.resources.record_output(self.project_dir, agent_role.value, output.call_metadata["output_tokens"])
+        self._start_review(agent_role, output)
+        self._release_content(output)
+        return output
+    
+    @staticmethod
+    def _release_content(output: AgentOutput):
+        """Drop a saved output's text so results do not hold every deliverable until the engagement ends.
+        
+        Dependents and the final report read the saved file, and a map-reduce review holds its own reference.
+        """
+        if output.file_path:
+            output.output_content = ""
+    
+    def _start_review(self, agent_role: AgentRole, output: AgentOutput):
+        """Start the senior partner's review of a finished deliverable without waiting for it (map-reduce mode)."""
+        senior_partner = self.agents[AgentRole.SENIOR_PARTNER]
+        if senior_partner.review_tasks is None:
+            return
+        if agent_role.value not in self._get_agent_dependencies(AgentRole.SENIOR_PARTNER):
+            return
+        senior_partner.review_tasks[agent_role.value] = asyncio.create_task(
+            senior_partner.review_deliverable(agent_role.value, output.output_content)
+        )
+    
+    async def _discard_pending_reviews(self):
+        """Cancel review tasks nobody is waiting for and collect their errors."""
+        review_tasks = self.agents[AgentRole.SENIOR_PARTNER].review_tasks
+        if not review_tasks:
+            return
+        for task in review_tasks.values():
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*review_tasks.values(), return_exceptions=True)
     
     async def _generate_final_report(self, results: Dict[str, Any], parameters: Dict[str, Any]) -> str:
-        """Generate a final comprehensive report."""
+        """Generate a final comprehensive report in each configured format.
         
-        # Load all agent outputs
-        all_outputs = []
+        Sections are streamed from the saved agent outputs into the report files, so the report is
+        never held in memory as a whole. Returns the path of the first format written.
+        """
+        sections = []
         for role, result in results.items():
+            title = role.replace('_', ' ').title()
             # Handle both AgentOutput objects and dictionaries
             if hasattr(result, 'status') and result.status == "completed":
                 # AgentOutput object
-                if hasattr(result, 'output_content') and result.output_content:
-                    all_outputs.append(f"## {role.replace('_', ' ').title()}\n\n{result.output_content}\n\n")
+                digest = None
+                if self.structured_context and getattr(result, 'structured_output', None):
+                    digest = render_compact(role, result.structured_output)
+                if getattr(result, 'file_path', ''):
+                    sections.append(self._report_section(title, Path(result.file_path), digest))
+                elif hasattr(result, 'output_content') and result.output_content:
+                    sections.append(ReportSection(title, text=result.output_content, digest=digest))
                 else:
                     # Fallback to reading from file
-                    agent_dir = self.project_dir / "agent_outputs" / role
-                    if agent_dir.exists():
-                        md_files = list(agent_dir.glob("*.md"))
-                        if md_files:
-                            latest_file = max(md_files, key=lambda x: x.stat().st_mtime)
-                            with open(latest_file, 'r', encoding='utf-8') as f:
-                                all_outputs.append(f"## {role.replace('_', ' ').title()}\n\n{f.read()}\n\n")
+                    latest_file = self._latest_output_file(role)
+                    if latest_file:
+                        sections.append(self._report_section(title, latest_file, digest))
             elif isinstance(result, dict) and result.get("status") == "completed":
                 # Dictionary result (for error cases)
-                agent_dir = self.project_dir / "agent_outputs" / role
-                if agent_dir.exists():
-                    md_files = list(agent_dir.glob("*.md"))
-                    if md_files:
-                        latest_file = max(md_files, key=lambda x: x.stat().st_mtime)
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            all_outputs.append(f"## {role.replace('_', ' ').title()}\n\n{f.read()}\n\n")
+                latest_file = self._latest_output_file(role)
+                if latest_file:
+                    sections.append(self._report_section(title, latest_file))
         
-        # Create final report
-        final_report_content = f"""# Strategic Analysis Report: {self.company_name}
-
-**Generated:** {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
-**Analysis Parameters:** {json.dumps(parameters, indent=2)}
-
-## Executive Summary
-
-This comprehensive strategic analysis was conducted by an AI-powered consulting team consisting of specialized agents, each focusing on different aspects of strategic analysis.
-
-## Detailed Analysis
-
-{chr(10).join(all_outputs)}
-
-## Conclusion
-
-This analysis represents the collaborative work of multiple specialized AI agents, each bringing deep expertise in their respective domains. The findings provide a comprehensive strategic assessment with actionable recommendations for {self.company_name}.
-
----
-*Report generated by AI Consulting Team using GPT-5 technology*
-"""
+        writer = ReportWriter(self.company_name, parameters, sections,
+                              generated=datetime.now().strftime("%B %d, %Y at %I:%M %p"))
         
-        # Save final report
-        final_report_path = self.project_dir / f"final_strategic_report_{self.company_name.replace(' ', '_')}.md"
-        with open(final_report_path, 'w', encoding='utf-8') as f:
-            f.write(final_report_content)
+        # Write each format on the background I/O thread
+        report_stem = f"final_strategic_report_{self.company_name.replace(' ', '_')}"
+        self.report_files = []
+        for report_format in self.report_formats:
+            report_path = self.project_dir / f"{report_stem}{REPORT_EXTENSIONS[report_format]}"
+            await run_in_io_thread(writer.write, report_path, report_format)
+            self.report_files.append(str(report_path))
         
-        return str(final_report_path)
+        return self.report_files[0]
+    
+    def _latest_output_file(self, role: str) -> Optional[Path]:
+        """Most recent complete markdown output saved for a role, if any."""
+        return find_latest_output(self.project_dir / "agent_outputs" / role, self.run_id)
+    
+    def _report_section(self, title: str, markdown_file: Path, digest: Optional[str] = None) -> ReportSection:
+        """Report section streamed from a saved output, with its metadata sidecars as bundle attachments."""
+        attachments = [markdown_file.with_name(f"{markdown_file.stem}{suffix}")
+                       for suffix in ("_metadata.json", "_structured.json")]
+        return ReportSection(title, source_file=markdown_file, digest=digest,
+                             attachments=[path for path in attachments if path.exists()])
+
+def project_directory(output_dir: str, company_name: str) -> Path:
+    """Project directory for a company under an output directory."""
+    return Path(output_dir) / company_name.replace(' ', '_').replace('/', '_')
+
+def engagement_parameters(brief: str, deliverables: Optional[List[str]], tier: Optional[str],
+                          prompt_manager: Any) -> Dict[str, Any]:
+    """Engagement parameters for a brief, its deliverables and an optional engagement tier."""
+    parameters = {
+        "analysis_brief": brief,
+        "engagement_type": "comprehensive_strategic_analysis",
+        "analysis_depth": "executive_level",
+        "deliverables": deliverables or ([] if tier else list(ConsultingTeam.DELIVERABLE_AGENTS))
+    }
+    if tier:
+        parameters["engagement_tier"] = tier
+        parameters["analysis_depth"] = prompt_manager.get_engagement_tier(tier).get("analysis_depth",
+                                                                               parameters["analysis_depth"])
+    return parameters
 
 async def main():
     """Main function to run the consulting team."""
@@ -640,8 +1929,7 @@ async def main():
     )
     parser.add_argument(
         "--brief", "-b", 
-        required=True, 
-        help="Analysis brief describing what to analyze"
+        help="Analysis brief describing what to analyze (required unless --resume)"
     )
     parser.add_argument(
         "--output-dir", "-o", 
@@ -652,56 +1940,238 @@ async def main():
         "--api-key", 
         help="OpenAI API key (optional, can use OPENAI_API_KEY env var)"
     )
+    parser.add_argument(
+        "--tier",
+        help="Engagement tier from agent_prompts.yaml (e.g. quick_scan, standard, deep)"
+    )
+    parser.add_argument(
+        "--deliverables",
+        nargs="+",
+        choices=list(ConsultingTeam.DELIVERABLE_AGENTS),
+        help="Deliverables to produce; only the agents they need are run (default: all, or the tier's)"
+    )
+    parser.add_argument(
+        "--on-dependency-failure",
+        choices=ConsultingTeam.DEPENDENCY_POLICIES,
+        help="What downstream agents do when an input agent fails: wait for a recovery run, run degraded, or skip"
+    )
+    parser.add_argument(
+        "--report-format",
+        action="append",
+        choices=REPORT_FORMATS,
+        help="Final report format; repeat for several (default: markdown)"
+    )
+    parser.add_argument(
+        "--review-mode",
+        choices=ConsultingTeam.REVIEW_MODES,
+        help="Senior partner review: one review at the end (default), or per-deliverable reviews plus a short synthesis"
+    )
+    parser.add_argument(
+        "--parallel-sections",
+        action="store_true",
+        default=None,
+        help="Generate the numbered sections of each deliverable as concurrent calls, then stitch them"
+    )
+    parser.add_argument(
+        "--adaptive-tokens",
+        action="store_true",
+        default=None,
+        help="Set each agent's max_tokens from the lengths of its past outputs instead of token_limits"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate prompts and estimate tokens, cost and wall time for the planned agents without any API call"
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        default=None,
+        help="Fire a duplicate request when an agent call passes its p95 latency"
+    )
+    parser.add_argument(
+        "--priority",
+        help="Priority class of the engagement's calls on a daemon or service shared with other engagements "
+             "(default: scheduling.default_class in agent_prompts.yaml)"
+    )
+    parser.add_argument(
+        "--tenant",
+        help="Fair-share tenant of the engagement's calls on a shared daemon or service (default: the engagement)"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Wall-clock budget for the engagement: agents that would not finish are skipped, "
+             "calls still running when it passes are cancelled, and the run is saved as resumable"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        metavar="USD",
+        help="Spend ceiling for the engagement: calls are checked against it before they are sent, "
+             "and the engagement degrades as it runs low (default: spend_budget.engagement_usd)"
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=None,
+        help="Report callbacks that block the event loop (with their stack and agent) and each phase's "
+             "peak memory and top allocators (settings: debug in agent_prompts.yaml)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the company's last cancelled, interrupted or deadline-exceeded engagement, "
+             "reusing its finished outputs and partial responses"
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Show a live table of the running agent calls (tokens, tokens/sec, ETA, spend) "
+             "instead of the progress lines (settings: dashboard in agent_prompts.yaml)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Submit the engagement to the warm daemon (python daemon.py start) and stream its progress"
+    )
     
     args = parser.parse_args()
+    if not args.brief and not args.resume:
+        parser.error("--brief is required unless --resume is given")
+    if args.resume and args.daemon:
+        parser.error("--resume runs the engagement locally; it cannot be combined with --daemon")
+    if args.dashboard and args.daemon:
+        parser.error("--dashboard shows the calls of a local run; it cannot be combined with --daemon")
+    
+    team_options = {
+        "hedging": args.hedge,
+        "dependency_policy": args.on_dependency_failure,
+        "report_formats": args.report_format,
+        "review_mode": args.review_mode,
+        "parallel_sections": args.parallel_sections,
+        "adaptive_tokens": args.adaptive_tokens,
+        "priority": args.priority,
+        "tenant": args.tenant,
+        "deadline_seconds": args.deadline,
+        "budget_usd": args.budget,
+        "debug": args.debug
+    }
+    
+    if args.daemon and not args.dry_run:
+        # The daemon holds its own API key; only the engagement is sent over the socket
+        from daemon import submit_engagement, DaemonError
+        try:
+            results = submit_engagement({
+                "command": "engage",
+                "company": args.company,
+                "brief": args.brief,
+                "output_dir": str(Path(args.output_dir).resolve()),
+                "tier": args.tier,
+                "deliverables": args.deliverables,
+                "team_options": team_options
+            }, on_progress=print)
+        except DaemonError as e:
+            print(f"❌ Error: {str(e)}")
+            return 1
+        print("\n" + "="*60)
+        print(f"🎉 Consulting engagement {results['status']} on the daemon!")
+        print(f"📋 Final report: {results['final_report']}")
+        print(f"📁 All outputs saved to: {results['project_dir']}")
+        print("="*60)
+        return 0
     
     try:
+        # Progress goes through the structured log: JSON Lines in the output directory, console optional
+        from prompt_manager import PromptManager
+        prompt_manager = PromptManager()
+        dashboard = None
+        log_config = prompt_manager.get_logging_config()
+        if args.dashboard and not args.dry_run:
+            # The dashboard takes over the console; progress lines still go to the JSON log
+            from progress_dashboard import ProgressDashboard
+            dashboard = ProgressDashboard.from_config(prompt_manager.get_dashboard_config(),
+                                                      PriceTable(prompt_manager.get_pricing()))
+            log_config = dict(log_config, console=False)
+        log_file = configure_logging(log_config, Path(args.output_dir))
+        
         # Get API key
         api_key = args.api_key or os.getenv('OPENAI_API_KEY')
+        if not api_key and args.dry_run:
+            api_key = "dry-run"  # No request is sent
         if not api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it as a parameter.")
         
         # Create project directory
-        project_dir = Path(args.output_dir) / args.company.replace(' ', '_').replace('/', '_')
+        project_dir = project_directory(args.output_dir, args.company)
         project_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize consulting team
-        print("🤖 Initializing AI Consulting Team...")
-        team = ConsultingTeam(api_key, args.company, project_dir)
-        
-        # Define engagement parameters
-        parameters = {
-            "analysis_brief": args.brief,
-            "engagement_type": "comprehensive_strategic_analysis",
-            "analysis_depth": "executive_level",
-            "deliverables": ["business_model_analysis", "market_research", "competitive_analysis", 
-                           "financial_analysis", "risk_assessment", "implementation_plan", 
-                           "strategy_narrative", "senior_partner_review"]
-        }
+        log_event("team.initializing", "🤖 Initializing AI Consulting Team...")
+        team = ConsultingTeam(api_key, args.company, project_dir, dashboard=dashboard, **team_options)
+        
+        # Define engagement parameters; a resumed engagement keeps those of the run it continues
+        resume_run_id = None
+        if args.resume:
+            run_metadata = team.resumable_run()
+            if run_metadata is None:
+                raise ValueError(f"No cancelled or interrupted engagement to resume in {project_dir}")
+            parameters = run_metadata["engagement_parameters"]
+            resume_run_id = run_metadata["run_id"]
+            args.brief = parameters["analysis_brief"]
+        else:
+            parameters = engagement_parameters(args.brief, args.deliverables, args.tier, team.prompt_manager)
+        
+        if args.dry_run:
+            estimate = team.dry_run(parameters)
+            dry_run_dir = project_dir / "dry_run"
+            dry_run_dir.mkdir(exist_ok=True)
+            for role, prompt in estimate.prompts.items():
+                atomic_write_text(dry_run_dir / f"{role}_prompt.md", prompt)
+            atomic_write_json(dry_run_dir / "dry_run.json", estimate.summary())
+            console(format_estimate(estimate))
+            log_event("dry_run.saved", f"📁 Rendered prompts saved to: {dry_run_dir}", path=str(dry_run_dir),
+                      errors=len(estimate.errors))
+            return 1 if estimate.errors else 0
         
         # Execute consulting engagement
-        print(f"📊 Starting comprehensive analysis for: {args.company}")
-        print(f"📝 Analysis brief: {args.brief}")
-        print(f"📁 Project directory: {project_dir}")
-        print("\n" + "="*60)
+        console(f"📊 Starting comprehensive analysis for: {args.company}")
+        console(f"📝 Analysis brief: {args.brief}")
+        console(f"📁 Project directory: {project_dir}")
+        if log_file:
+            console(f"📜 Structured log: {log_file}")
+        console("\n" + "="*60)
         
-        results = await team.execute_consulting_engagement(parameters)
+        with dashboard or nullcontext():
+            results = await team.execute_consulting_engagement(parameters, resume_run_id)
         
-        print("\n" + "="*60)
-        print("🎉 Consulting engagement completed successfully!")
-        print(f"📋 Final report: {results['final_report']}")
-        print(f"📁 All outputs saved to: {project_dir}")
-        print("="*60)
+        console("\n" + "="*60)
+        if results["resumable"]:
+            log_event("engagement.stopped", f"⏹️  Consulting engagement {results['status'].replace('_', ' ')}; "
+                      f"finish it with --resume\n📋 Partial report: {results['final_report']}",
+                      logging.WARNING, run_id=results["run_id"], status=results["status"])
+            console("="*60)
+            return 1
+        log_event("engagement.completed", f"🎉 Consulting engagement completed successfully!\n"
+                  f"📋 Final report: {results['final_report']}\n📁 All outputs saved to: {project_dir}",
+                  run_id=results["run_id"], status=results["status"], report=results["final_report"])
+        console("="*60)
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        print("\nMake sure you have:")
-        print("1. Set the OPENAI_API_KEY environment variable, or")
-        print("2. Pass the --api-key parameter")
-        print("3. Have sufficient OpenAI API credits")
+        log_event("engagement.error", f"❌ Error: {str(e)}", logging.ERROR, company=args.company, error=str(e))
+        console("\nMake sure you have:")
+        console("1. Set the OPENAI_API_KEY environment variable, or")
+        console("2. Pass the --api-key parameter")
+        console("3. Have sufficient OpenAI API credits")
         return 1
     
     return 0
 
 if __name__ == "__main__":
-    exit(asyncio.run(main()))
+    try:
+        exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        shutdown_logging()  # Queued progress first
+        print("\n⏹️  Interrupted; finished outputs were kept. Continue with --resume")
+        exit(130)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Early-abort Stream Validators for Consulting Agents
+Inspects the first tokens of a streamed deliverable and aborts the call as soon
+as a rule fails (a refusal, the wrong company, an off-format opening), so a bad
+generation is retried instead of paid for in full
+"""
+
+import re
+from typing import Dict, List, Optional, Any, Tuple, Type
+
+CHARS_PER_TOKEN = 4
+
+DEFAULT_REFUSAL_PATTERNS = [
+    r"\bI (?:can(?:no|')t|am unable to|'m unable to|won't) (?:help|assist|provide|complete)",
+    r"\bAs an AI\b",
+    r"\bI'm sorry, but\b",
+    r"\bI apologi[sz]e, but\b"
+]
+
+# Words a company name may carry that the analysis does not repeat ("The Home Depot, Inc." -> "Home Depot")
+_NAME_ARTICLES = {"the", "a", "an"}
+_LEGAL_SUFFIXES = {"inc", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "plc", "ag", "sa",
+                   "se", "nv", "gmbh", "group", "holdings"}
+
+def company_aliases(company: str) -> List[str]:
+    """The company name, and the name without a leading article or trailing legal suffixes."""
+    words = re.findall(r"[\w&'.-]+", company)
+    words = [word.rstrip(".,") for word in words if word.rstrip(".,")]
+    while words and words[0].lower() in _NAME_ARTICLES:
+        words.pop(0)
+    while len(words) > 1 and words[-1].lower() in _LEGAL_SUFFIXES:
+        words.pop()
+    return [alias for alias in dict.fromkeys([company.strip(), " ".join(words)]) if alias]
+
+class StreamValidationError(Exception):
+    """Raised when a streamed response fails a validator; the call is aborted and retried."""
+
+    def __init__(self, rule: str, reason: str, generated_tokens: int, max_tokens: int):
+        super().__init__(f"{rule}: {reason} (aborted after ~{generated_tokens} tokens)")
+        self.rule = rule
+        self.reason = reason
+        self.generated_tokens = generated_tokens
+        self.saved_tokens = max(max_tokens - generated_tokens, 0)
+
+class StreamRule:
+    """A check on the opening of a response.
+
+    `check` returns (decided, failure reason): undecided rules are checked again as more text
+    arrives, and every rule is decided at the latest once `window_tokens` have streamed.
+    """
+
+    name = "rule"
+
+    def __init__(self, window_tokens: int = 300, **options):
+        self.window_chars = int(window_tokens) * CHARS_PER_TOKEN
+
+    def check(self, text: str, context: Dict[str, Any], final: bool) -> Tuple[bool, Optional[str]]:
+        raise NotImplementedError("Stream rules must implement check()")
+
+    def window_reached(self, text: str, final: bool) -> bool:
+        return final or len(text) >= self.window_chars
+
+class RefusalRule(StreamRule):
+    """Fails as soon as the opening reads like a refusal."""
+
+    name = "refusal"
+
+    def __init__(self, window_tokens: int = 200, patterns: Optional[List[str]] = None, **options):
+        super().__init__(window_tokens)
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in (patterns or DEFAULT_REFUSAL_PATTERNS)]
+
+    def check(self, text, context, final):
+        opening = text[:self.window_chars]
+        for pattern in self.patterns:
+            match = pattern.search(opening)
+            if match:
+                return True, f"refusal detected ({match.group(0)!r})"
+        return self.window_reached(text, final), None
+
+class CompanyMentionRule(StreamRule):
+    """Fails if the company under analysis is not named within the window.
+
+    The full name or the name without article and legal suffix must appear as whole words;
+    a single word of a multi-word name (such as "The" or "Home") does not count.
+    """
+
+    name = "mentions_company"
+
+    def check(self, text, context, final):
+        company = context.get("company_name", "")
+        names = company_aliases(company)
+        opening = text[:self.window_chars]
+        if not names or any(re.search(rf"(?<!\w){re.escape(name)}(?!\w)", opening, re.IGNORECASE) for name in names):
+            return True, None
+        if self.window_reached(text, final):
+            return True, f"{company} not mentioned in the first {self.window_chars // CHARS_PER_TOKEN} tokens"
+        return False, None
+
+class FirstHeadingRule(StreamRule):
+    """Requires the response to open with a section header (optionally matching a pattern)."""
+
+    name = "first_heading"
+    _HEADING = re.compile(r"^\s*(?:#{1,6}\s+(.+?)|\*\*([^*\n]+)\*\*:?)\s*$", re.MULTILINE)
+
+    def __init__(self, window_tokens: int = 300, pattern: Optional[str] = None, **options):
+        super().__init__(window_tokens)
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+
+    def check(self, text, context, final):
+        opening = text[:self.window_chars]
+        complete = opening if final else opening[:opening.rfind("\n") + 1]
+        match = self._HEADING.search(complete)
+        if match:
+            heading = match.group(1) or match.group(2)
+            if self.pattern is not None and not self.pattern.search(heading):
+                return True, f"first heading {heading!r} does not match {self.pattern.pattern!r}"
+            return True, None
+        if self.window_reached(text, final):
+            return True, f"no section header in the first {self.window_chars // CHARS_PER_TOKEN} tokens"
+        return False, None
+
+class ForbiddenPatternRule(StreamRule):
+    """Fails as soon as a configured pattern appears within the window."""
+
+    name = "forbidden"
+
+    def __init__(self, window_tokens: int = 300, pattern: str = "", **options):
+        super().__init__(window_tokens)
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+
+    def check(self, text, context, final):
+        match = self.pattern.search(text[:self.window_chars])
+        if match:
+            return True, f"forbidden text {match.group(0)!r}"
+        return self.window_reached(text, final), None
+
+STREAM_RULES: Dict[str, Type[StreamRule]] = {
+    rule.name: rule for rule in (RefusalRule, CompanyMentionRule, FirstHeadingRule, ForbiddenPatternRule)
+}
+
+def register_stream_rule(rule: Type[StreamRule]):
+    """Make a custom rule available to `stream_validation` in agent_prompts.yaml under its `name`."""
+    STREAM_RULES[rule.name] = rule
+
+def build_rules(specs: List[Dict[str, Any]]) -> List[StreamRule]:
+    """Instantiate rules from config entries such as `{type: refusal, window_tokens: 200}`.
+
+    Raises:
+        ValueError: If a rule type is unknown
+    """
+    rules = []
+    for spec in specs:
+        options = dict(spec)
+        rule_type = options.pop('type', None)
+        if rule_type not in STREAM_RULES:
+            raise ValueError(f"Unknown stream validation rule: {rule_type}. Available: {', '.join(STREAM_RULES)}")
+        rules.append(STREAM_RULES[rule_type](**options))
+    return rules
+
+class StreamMonitor:
+    """Feeds streamed text to the undecided rules and raises on the first failure.
+
+    Rules only look at their window, so the monitor keeps the opening up to the largest window
+    and stops collecting text once every rule is decided; `chars` counts everything streamed.
+    """
+
+    def __init__(self, rules: List[StreamRule], context: Dict[str, Any], max_tokens: int = 0):
+        self.pending = list(rules)
+        self.context = context
+        self.max_tokens = max_tokens
+        self.text = ""
+        self.chars = 0
+        self.window_chars = max((rule.window_chars for rule in rules), default=0)
+
+    def feed(self, chunk: str):
+        """Add streamed text and check the rules that are still undecided."""
+        self.chars += len(chunk)
+        if not self.pending:
+            return
+        if len(self.text) < self.window_chars:
+            self.text += chunk[:self.window_chars - len(self.text)]
+        self._check(final=False)
+
+    def finish(self):
+        """Decide every remaining rule against the complete response."""
+        if self.pending:
+            self._check(final=True)
+
+    def _check(self, final: bool):
+        undecided = []
+        for rule in self.pending:
+            decided, reason = rule.check(self.text, self.context, final)
+            if reason is not None:
+                raise StreamValidationError(rule.name, reason, self.chars // CHARS_PER_TOKEN, self.max_tokens)
+            if not decided:
+                undecided.append(rule)
+        self.pending = undecided
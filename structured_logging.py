@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Structured Logging for Concurrent Engagements
+Engagement progress as structured records (event, run id, company, role, durations and
+other fields) written as JSON Lines by a background thread. Callers only put the record on a
+bounded queue, so logging never blocks the event loop on console or file writes; records
+beyond the queue's bound are dropped and counted. A human-readable console renderer is an
+optional second sink.
+
+Without `configure_logging` (library use, tests) messages are printed as before. Inside a
+daemon or service engagement they go to that engagement's client (see daemon.progress_to).
+"""
+
+import sys
+import json
+import queue
+import atexit
+import logging
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Optional, Any, Iterator
+
+import metrics
+
+LOGGER_NAME = "consulting"
+
+# Correlation fields (run_id, company, role) of the running task; tasks inherit their creator's
+_log_context: contextvars.ContextVar = contextvars.ContextVar("log_context", default={})
+
+# Sink for the progress of the engagement running in the current task (None outside engagements)
+progress_sink: contextvars.ContextVar = contextvars.ContextVar("progress_sink", default=None)
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False  # Records only reach the sinks configured here
+_listener: Optional[QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+@contextmanager
+def log_context(**fields) -> Iterator[Dict[str, Any]]:
+    """Add correlation fields to every record logged in the block (and in tasks it starts)."""
+    context = dict(_log_context.get(), **fields)
+    token = _log_context.set(context)
+    try:
+        yield context
+    finally:
+        _log_context.reset(token)
+
+def bind_log_context(**fields):
+    """Add fields to the innermost log_context, e.g. a run id known only once the engagement starts.
+
+    Tasks the block already started share the context, so they see the new fields too.
+    """
+    _log_context.get().update(fields)
+
+def log_event(event: str, message: str, level: int = logging.INFO, **fields):
+    """Log one engagement event.
+
+    Args:
+        event: Dotted event name, e.g. "agent.completed"
+        message: Human-readable line for the console and engagement clients
+        level: logging level of the record
+        **fields: Structured fields of the record (durations, counts, paths)
+    """
+    sink = progress_sink.get()
+    if sink is not None:
+        sink.write(message + "\n")
+    if _listener is None:
+        if sink is None:
+            print(message)
+        return
+    if level < _logger.level:
+        return
+    metrics.LOG_RECORDS.inc(level=logging.getLevelName(level).lower())
+    _logger.log(level, message, extra={"event": event, "fields": fields, "context": dict(_log_context.get()),
+                                       "to_console": sink is None})
+
+def console(message: str):
+    """A console-only line (rules, blank lines) that is not a structured record."""
+    sink = progress_sink.get()
+    if sink is not None:
+        sink.write(message + "\n")
+    elif _listener is None:
+        print(message)
+    else:
+        _logger.log(logging.INFO, message, extra={"event": None, "fields": {}, "context": {}, "to_console": True})
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, event, correlation fields, message and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": record.event
+        }
+        entry.update(record.context)
+        entry["message"] = record.getMessage().strip()
+        entry.update(record.fields)
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        metrics.LOG_BYTES.inc(len(line) + 1)
+        return line
+
+class BoundedQueueHandler(QueueHandler):
+    """Puts records on a bounded queue without waiting; when it is full the record is dropped and counted."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Fields are formatted by the writer thread; the record is not touched again by the caller
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_DROPPED.inc()
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # Waits for room in a full queue instead of raising
+
+def configure_logging(config: Dict[str, Any], directory: Optional[Path] = None,
+                      file_name: Optional[str] = None) -> Optional[Path]:
+    """Route log_event records through a bounded queue to the sinks of the `logging` config section.
+
+    Args:
+        config: The `logging` section of the prompt config
+        directory: Where the JSON Lines file goes (default: the working directory)
+        file_name: File name instead of `config["file"]` (e.g. one per batch worker)
+
+    Returns:
+        The JSON Lines file, or None if records are not written to a file
+    """
+    global _listener, _queue
+    shutdown_logging()
+    if not config.get('enabled', True):
+        return None
+    handlers = []
+    path = None
+    if file_name or config.get('file'):
+        path = Path(directory or ".") / (file_name or config['file'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(path, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        file_handler.addFilter(lambda record: record.event is not None)
+        handlers.append(file_handler)
+    if config.get('console', True):
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        console_handler.addFilter(lambda record: record.to_console)
+        handlers.append(console_handler)
+    _queue = queue.Queue(int(config.get('queue_size', 10000)))
+    _logger.handlers = [BoundedQueueHandler(_queue)]
+    _logger.setLevel(logging.getLevelName(str(config.get('level', 'INFO')).upper()))
+    metrics.QUEUE_DEPTH.track(_queue.qsize, queue="log_records")
+    _listener = _Listener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return path
+
+def shutdown_logging():
+    """Write the records still queued and stop the writer thread (registered to run at exit)."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    _logger.handlers = []
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+atexit.register(shutdown_logging)
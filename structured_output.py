@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Structured Outputs for Consulting Agents
+Schema, extraction and validation for the machine-readable findings block each
+agent appends to its markdown deliverable, plus a compact renderer for downstream use
+"""
+
+import re
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from structured_logging import log_event
+
+STRUCTURED_SCHEMA_VERSION = 1
+
+# Compact schema description embedded in the system prompt
+STRUCTURED_OUTPUT_INSTRUCTIONS = """After the markdown analysis, append one fenced ```json block with your findings in this exact shape:
+{
+  "key_findings": ["<one-sentence finding>", ...],
+  "metrics": [{"name": "<metric>", "value": "<number or text>", "unit": "<optional unit>"}, ...],
+  "risks": [{"risk": "<risk>", "likelihood": <1-5>, "impact": <1-5>}, ...],
+  "recommendations": [{"recommendation": "<action>", "priority": "high|medium|low"}, ...],
+  "ratings": {"<deliverable>": <1-10>, ...}
+}
+Keep 3-7 entries per list. Use "ratings" only when reviewing other deliverables; otherwise use {}.
+Do not add any text after the JSON block."""
+
+_JSON_BLOCK = re.compile(r"```json\s*(\{.*\})\s*```\s*$", re.DOTALL)
+_PRIORITIES = ("high", "medium", "low")
+
+def split_structured_block(text: str) -> Tuple[str, Optional[str]]:
+    """Split a response into its markdown body and the trailing JSON block, if any."""
+    start = text.rfind("```json")
+    match = _JSON_BLOCK.match(text, start) if start != -1 else None
+    if not match:
+        return text, None
+    return text[:start].rstrip() + "\n", match.group(1)
+
+def _is_score(value: Any, low: int, high: int) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and low <= value <= high
+
+def _entries(payload: Dict[str, Any], key: str, errors: List[str]) -> List[Any]:
+    """The list under `key` (missing or null: empty); any other type is reported as an error."""
+    value = payload.get(key) or []
+    if not isinstance(value, list):
+        errors.append(f"{key} must be a list")
+        return []
+    return value
+
+def validate_payload(payload: Any) -> List[str]:
+    """Validate a structured payload against the schema; returns a list of problems."""
+    if not isinstance(payload, dict):
+        return ["payload must be a JSON object"]
+
+    errors = []
+    findings = payload.get("key_findings")
+    if not isinstance(findings, list) or not all(isinstance(f, str) for f in findings):
+        errors.append("key_findings must be a list of strings")
+
+    for i, metric in enumerate(_entries(payload, "metrics", errors)):
+        if not isinstance(metric, dict) or not isinstance(metric.get("name"), str) or "value" not in metric:
+            errors.append(f"metrics[{i}] needs a name and a value")
+
+    for i, risk in enumerate(_entries(payload, "risks", errors)):
+        if not isinstance(risk, dict) or not isinstance(risk.get("risk"), str):
+            errors.append(f"risks[{i}] needs a risk description")
+        elif not (_is_score(risk.get("likelihood"), 1, 5) and _is_score(risk.get("impact"), 1, 5)):
+            errors.append(f"risks[{i}] likelihood and impact must be scores from 1 to 5")
+
+    for i, rec in enumerate(_entries(payload, "recommendations", errors)):
+        if not isinstance(rec, dict) or not isinstance(rec.get("recommendation"), str):
+            errors.append(f"recommendations[{i}] needs a recommendation")
+        elif rec.get("priority") not in _PRIORITIES:
+            errors.append(f"recommendations[{i}] priority must be one of {', '.join(_PRIORITIES)}")
+
+    ratings = payload.get("ratings") or {}
+    if not isinstance(ratings, dict) or not all(_is_score(v, 1, 10) for v in ratings.values()):
+        errors.append("ratings must map deliverables to scores from 1 to 10")
+
+    return errors
+
+def extract_structured_output(text: str) -> Tuple[str, Optional[Dict[str, Any]], List[str]]:
+    """Extract and validate the structured payload from an agent response.
+
+    Returns:
+        Tuple of (markdown body, payload or None, validation errors)
+    """
+    body, raw = split_structured_block(text)
+    if raw is None:
+        return text, None, ["no structured JSON block found"]
+    try:
+        payload = json.loads(raw)
+    except ValueError as e:
+        return body, None, [f"invalid JSON: {e}"]
+
+    errors = validate_payload(payload)
+    if errors:
+        return body, None, errors
+    for key in ("metrics", "risks", "recommendations"):
+        payload[key] = payload.get(key) or []
+    payload["ratings"] = payload.get("ratings") or {}
+    payload["schema_version"] = STRUCTURED_SCHEMA_VERSION
+    return body, payload, []
+
+def load_structured_sidecar(markdown_file: Path) -> Optional[Dict[str, Any]]:
+    """Load the structured findings saved next to an agent's markdown output, if present."""
+    sidecar = markdown_file.with_name(f"{markdown_file.stem}_structured.json")
+    if not sidecar.exists():
+        return None
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (IOError, ValueError) as e:
+        log_event("structured_output.unreadable", f"Warning: Could not read structured output {sidecar}: {e}",
+                  logging.WARNING, path=str(sidecar), error=str(e))
+        return None
+    return payload if not validate_payload(payload) else None
+
+def render_compact(role: str, payload: Dict[str, Any]) -> str:
+    """Render a structured payload as a compact markdown digest for prompts and reports."""
+    lines = [f"### {role.replace('_', ' ').title()} (structured findings)"]
+    if payload.get("key_findings"):
+        lines.append("Key findings:")
+        lines.extend(f"- {finding}" for finding in payload["key_findings"])
+    if payload.get("metrics"):
+        lines.append("Metrics:")
+        lines.extend(f"- {m['name']}: {m['value']}{' ' + m['unit'] if m.get('unit') else ''}"
+                     for m in payload["metrics"])
+    if payload.get("risks"):
+        lines.append("Risks (likelihood x impact):")
+        lines.extend(f"- {r['risk']} ({r['likelihood']}x{r['impact']})"
+                     for r in sorted(payload["risks"], key=lambda r: -r['likelihood'] * r['impact']))
+    if payload.get("recommendations"):
+        lines.append("Recommendations:")
+        lines.extend(f"- [{r['priority']}] {r['recommendation']}" for r in payload["recommendations"])
+    if payload.get("ratings"):
+        lines.append("Ratings:")
+        lines.extend(f"- {deliverable}: {score}/10" for deliverable, score in payload["ratings"].items())
+    return "\n".join(lines) + "\n"
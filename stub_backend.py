@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Stub LLM Backend for Load Tests and Offline Runs
+A stand-in for the Anthropic client (messages.create and messages.stream) that
+returns well-formed deliverables after a configurable delay, so the service, the
+daemon and the load generator can be exercised without an API key or spend
+"""
+
+import re
+import json
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Dict, Any, Iterator, Optional
+
+CHARS_PER_TOKEN = 4
+
+_COMPANY = re.compile(r"^\s*Company:\s*(.+?)\s*$", re.MULTILINE)
+_SECTION_HEADING = re.compile(r'Start with the heading "(#+ [^"]+)"')
+
+_STRUCTURED_FINDINGS = {
+    "key_findings": ["Stub finding one", "Stub finding two", "Stub finding three"],
+    "metrics": [{"name": "Revenue", "value": 100, "unit": "USD m"}],
+    "risks": [{"risk": "Stub execution risk", "likelihood": 2, "impact": 3}],
+    "recommendations": [{"recommendation": "Stub recommendation", "priority": "high"}],
+    "ratings": {}
+}
+
+def _text(content: Any) -> str:
+    """Flatten a string or a list of content blocks to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content or [] if isinstance(block, dict))
+
+class StubStream:
+    """Context manager mimicking a Messages API stream over a finished stub response."""
+
+    def __init__(self, response: SimpleNamespace, chunk_chars: int = 64):
+        self.response = response
+        self.chunk_chars = chunk_chars
+
+    def __enter__(self) -> "StubStream":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        text = self.response.content[0].text
+        for start in range(0, len(text), self.chunk_chars):
+            yield text[start:start + self.chunk_chars]
+
+    def get_final_message(self) -> SimpleNamespace:
+        return self.response
+
+class StubMessages:
+    """The `messages` resource of the stub client."""
+
+    def __init__(self, backend: "StubAnthropic"):
+        self.backend = backend
+
+    def create(self, **request) -> SimpleNamespace:
+        return self.backend.respond(request)
+
+    def stream(self, **request) -> StubStream:
+        return StubStream(self.backend.respond(request))
+
+class StubAnthropic:
+    """Anthropic client stand-in: every call sleeps for the configured latency, then answers.
+
+    Responses name the company from the prompt, open with a heading, honour section-wise
+    instructions and carry a structured findings block when the system prompt asks for one,
+    so stream validators and structured output extraction behave as with the real API.
+    """
+
+    def __init__(self, latency_seconds: float = 0.2, jitter: float = 0.25, seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.jitter = jitter
+        self.messages = StubMessages(self)
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "StubAnthropic":
+        """Build a stub from the `stub_backend` section of the prompt config."""
+        return cls(
+            latency_seconds=float(config.get('latency_seconds', 0.2)),
+            jitter=float(config.get('jitter', 0.25))
+        )
+
+    def respond(self, request: Dict[str, Any]) -> SimpleNamespace:
+        """Sleep for one call's latency and return a Messages API shaped response."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_seconds * (1 + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(max(delay, 0.0))
+        text = self.render(request)
+        prompt_chars = len(_text(request.get("system", ""))) + sum(
+            len(_text(message.get("content"))) for message in request.get("messages", []))
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=prompt_chars // CHARS_PER_TOKEN,
+                                  output_tokens=len(text) // CHARS_PER_TOKEN),
+            model=request.get("model")
+        )
+
+    def render(self, request: Dict[str, Any]) -> str:
+        """Deterministic deliverable text for a request."""
+        prompt = "\n".join(_text(message.get("content")) for message in request.get("messages", [])
+                           if message.get("role") == "user")
+        company_match = _COMPANY.search(prompt)
+        company = company_match.group(1) if company_match else "the company"
+        section = _SECTION_HEADING.search(prompt)
+        if section:
+            return f"{section.group(1)}\n\n{company}: stub section body.\n"
+
+        text = (f"# {company}: Stub Deliverable\n\n"
+                f"## 1. Summary\n\n{company} stub analysis for load testing.\n\n"
+                f"## 2. Recommendations\n\n- Stub recommendation for {company}\n")
+        if "Structured Output" in _text(request.get("system", "")):
+            text += "\n```json\n" + json.dumps(_STRUCTURED_FINDINGS) + "\n```\n"
+        return text
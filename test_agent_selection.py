@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for deliverable-based agent selection
+Verifies that each requested deliverable brings in every agent whose output it reads
+"""
+
+import tempfile
+from pathlib import Path
+
+from strategy_consulting_agent import ConsultingTeam, AgentRole
+
+def make_team(directory: str) -> ConsultingTeam:
+    return ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False)
+
+def test_senior_partner_review_selects_every_agent():
+    """The senior partner reviews every deliverable, so its review runs the whole team."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = make_team(directory)
+        selected = team.select_agents(["senior_partner_review"])
+        assert selected == list(team.agents.keys())
+        team.selected_agents = selected
+        dependencies = team._get_agent_dependencies(AgentRole.SENIOR_PARTNER)
+        assert set(dependencies) == {role.value for role in team.agents if role != AgentRole.SENIOR_PARTNER}
+
+def test_storyteller_gets_its_inputs():
+    """The narrative reads the financial, risk and implementation outputs as well as the core analysis."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = make_team(directory)
+        selected = team.select_agents(["strategy_narrative"])
+        assert AgentRole.SENIOR_PARTNER not in selected
+        assert {AgentRole.FINANCIAL_ANALYST, AgentRole.RISK_ASSESSOR, AgentRole.IMPLEMENTATION_SPECIALIST} <= set(selected)
+        team.selected_agents = selected
+        assert len(team._get_agent_dependencies(AgentRole.STRATEGY_STORYTELLER)) == 6
+
+def test_deliverables_prune_unneeded_agents():
+    """A single analysis runs only its own required inputs, in execution order."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = make_team(directory)
+        assert team.select_agents(["market_research"]) == [AgentRole.MARKET_RESEARCHER]
+        assert team.select_agents(["financial_analysis"]) == ConsultingTeam.CORE_ANALYSIS + [AgentRole.FINANCIAL_ANALYST]
+        try:
+            team.select_agents(["unknown"])
+        except ValueError as e:
+            assert "Unknown deliverables" in str(e)
+        else:
+            raise AssertionError("unknown deliverable accepted")
+
+if __name__ == "__main__":
+    test_senior_partner_review_selects_every_agent()
+    test_storyteller_gets_its_inputs()
+    test_deliverables_prune_unneeded_agents()
+    print("🎉 All agent selection tests passed!")
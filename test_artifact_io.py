@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for durable artifact I/O
+Verifies atomic writes, completion markers and latest-output selection
+"""
+
+import os
+import time
+import tempfile
+from pathlib import Path
+
+from artifact_io import atomic_open, atomic_write_text, mark_complete, find_latest_output, new_run_id
+
+def test_failed_write_keeps_previous_file():
+    """A write that fails midway leaves the old content and no temp files behind."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "market_researcher_run.md"
+        atomic_write_text(path, "complete analysis")
+        try:
+            with atomic_open(path) as f:
+                f.write("truncated")
+                raise IOError("disk full")
+        except IOError:
+            pass
+        assert path.read_text(encoding='utf-8') == "complete analysis"
+        assert os.listdir(tmp) == ["market_researcher_run.md"]
+
+def test_incomplete_outputs_are_ignored():
+    """Outputs without a completion marker are never picked as the latest."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        complete = output_dir / "risk_assessor_20250101_000000_aaaaaa.md"
+        atomic_write_text(complete, "done")
+        mark_complete(complete, [complete])
+        time.sleep(0.01)
+        (output_dir / "risk_assessor_20250101_000001_bbbbbb.md").write_text("half writt", encoding='utf-8')
+        assert find_latest_output(output_dir) == complete
+
+def test_run_id_preferred_and_legacy_fallback():
+    """The current run's output wins; directories without markers fall back to the newest file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        run_ids = [new_run_id(), new_run_id()]
+        assert run_ids[0] != run_ids[1]
+        paths = []
+        for run_id in run_ids:
+            path = output_dir / f"financial_analyst_{run_id}.md"
+            atomic_write_text(path, run_id)
+            mark_complete(path, [path])
+            paths.append(path)
+            time.sleep(0.01)
+        assert find_latest_output(output_dir, run_ids[0]) == paths[0]
+        assert find_latest_output(output_dir) == paths[1]
+
+        legacy_dir = output_dir / "legacy"
+        legacy_dir.mkdir()
+        legacy = legacy_dir / "financial_analyst_20250824_224624.md"
+        legacy.write_text("legacy", encoding='utf-8')
+        assert find_latest_output(legacy_dir) == legacy
+        assert find_latest_output(output_dir / "missing") is None
+
+if __name__ == "__main__":
+    test_failed_write_keeps_previous_file()
+    test_incomplete_outputs_are_ignored()
+    test_run_id_preferred_and_legacy_fallback()
+    print("🎉 All artifact I/O tests passed!")
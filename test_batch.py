@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for sharded batch runs
+Verifies manifest parsing, shard-local claims, work stealing, lease expiry, batch budgets and a stub-backend worker
+"""
+
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+from batch import BatchWorker, LeaseQueue, load_manifest
+from strategy_consulting_agent import TeamResources
+from stub_backend import StubAnthropic
+
+def _engagements(count: int):
+    return [{"company": f"Co {i}", "brief": "Test", "deliverables": ["market_research"]} for i in range(count)]
+
+def test_manifest_formats():
+    """CSV and JSON Lines manifests give the same engagements; invalid rows are rejected."""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        (root / "m.csv").write_text("company,brief,deliverables\nAcme,Grow,market_research financial_analysis\n")
+        (root / "m.jsonl").write_text('{"company": "Acme", "brief": "Grow", '
+                                      '"deliverables": ["market_research", "financial_analysis"]}\n')
+        assert load_manifest(root / "m.csv") == load_manifest(root / "m.jsonl")
+        assert load_manifest(root / "m.csv")[0]["deliverables"] == ["market_research", "financial_analysis"]
+        (root / "bad.csv").write_text("company,brief\nAcme,\n")
+        try:
+            load_manifest(root / "bad.csv")
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert str(e) == "Manifest row 1: Missing fields: brief"
+
+def test_claims_steal_and_reclaim():
+    """Workers drain their shard from the front, steal from the back of the fullest shard, and take over expired leases."""
+    with tempfile.TemporaryDirectory() as directory:
+        queue = LeaseQueue(Path(directory) / "queue.sqlite3", max_attempts=2)
+        queue.enqueue(_engagements(6), shards=2)  # Shard 0: tasks 1, 3, 5; shard 1: tasks 2, 4, 6
+        for worker, shard in (("a", 0), ("b", 1)):
+            queue.register(worker, shard)
+
+        assert [queue.claim("a", 0, 60).id for _ in range(3)] == [1, 3, 5]
+        stolen = queue.claim("a", 0, 60)
+        assert (stolen.id, stolen.shard, stolen.stolen) == (6, 1, True)
+        assert queue.claim("b", 1, 60).id == 2
+
+        # "a" stops heartbeating on tasks 1 and 3: "b" finishes its shard, then reclaims them from the back
+        assert queue.heartbeat("a", [1, 3], lease_seconds=-1) == [1, 3]
+        assert [queue.claim("b", 1, 60).id for _ in range(3)] == [4, 3, 1]
+        assert queue.complete("a", 1, {"status": "completed"}) is False
+        assert queue.complete("b", 1, {"status": "completed"}) is True
+        assert queue.fail("b", 3, "boom") == "failed"
+
+        # Task 5 expires on both of its attempts and is failed instead of being claimed a third time
+        queue.heartbeat("a", [5], lease_seconds=-1)
+        assert queue.claim("b", 1, 60).id == 5
+        queue.heartbeat("b", [5], lease_seconds=-1)
+        assert queue.claim("b", 1, 60) is None
+        workers = {worker["worker"]: worker for worker in queue.workers()}
+        assert (workers["a"]["stolen"], workers["b"]["stolen"], workers["b"]["reclaimed"]) == (1, 3, 3)
+        assert queue.counts() == {"pending": 0, "leased": 3, "done": 1, "failed": 2}
+        assert queue.outstanding("a") == 2
+
+def test_batch_budget_is_shared_by_engagements():
+    """Engagements get an even share of what is left; once the batch budget is spent, tasks go back unstarted."""
+    with tempfile.TemporaryDirectory() as directory:
+        queue = LeaseQueue(Path(directory) / "queue.sqlite3")
+        queue.enqueue(_engagements(4), shards=1)
+        queue.register("a", 0)
+        first, second = queue.claim("a", 0, 60), queue.claim("a", 0, 60)
+        assert queue.reserve_budget("a", first.id, 1.0) == 0.25  # $1 over this and 3 pending tasks
+        assert queue.reserve_budget("a", second.id, 1.0, engagement_usd=0.5) == 0.5
+        assert queue.spend() == {"spent_usd": 0.0, "reserved_usd": 0.75}
+        assert queue.complete("a", first.id, {"status": "completed", "spend_usd": 0.05})
+        assert queue.spend() == {"spent_usd": 0.05, "reserved_usd": 0.5}
+
+        third = queue.claim("a", 0, 60)
+        assert queue.reserve_budget("a", third.id, 0.55) is None
+        queue.release("a", third.id)
+        assert queue.counts()["pending"] == 2
+        assert queue.claim("a", 0, 60).attempts == 1
+
+def test_failed_attempts_count_their_spend():
+    """A failed attempt's spend stays counted when the task is retried, and replaces the reservation once it fails for good."""
+    with tempfile.TemporaryDirectory() as directory:
+        queue = LeaseQueue(Path(directory) / "queue.sqlite3", max_attempts=2)
+        queue.enqueue(_engagements(1), shards=1)
+        queue.register("a", 0)
+        task = queue.claim("a", 0, 60)
+        queue.reserve_budget("a", task.id, 1.0)
+        assert queue.fail("a", task.id, "boom", spent_usd=0.1) == "pending"
+        assert queue.spend() == {"spent_usd": 0.1, "reserved_usd": 0.0}
+        task = queue.claim("a", 0, 60)
+        assert queue.reserve_budget("a", task.id, 1.0) == 0.9
+        assert queue.fail("a", task.id, "boom", spent_usd=0.2) == "failed"
+        assert queue.spend() == {"spent_usd": 0.3, "reserved_usd": 0.0}
+
+def test_worker_runs_batch_on_stub_backend():
+    """A worker runs every engagement of a small batch and records each one."""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        queue = LeaseQueue(root / "queue.sqlite3")
+        queue.enqueue(_engagements(4), shards=2)
+        resources = TeamResources("stub", client=StubAnthropic(latency_seconds=0.0))
+        worker = BatchWorker(queue, resources, root, shard=1, concurrency=2, poll_seconds=0.01)
+        start = time.time()
+        asyncio.run(worker.run())
+        assert time.time() - start < 60
+        assert queue.counts()["done"] == 4
+        assert queue.workers()[0]["stolen"] == 2
+        assert len(list((root / "batch_logs").glob("task-*.log"))) == 4
+
+if __name__ == "__main__":
+    test_manifest_formats()
+    test_claims_steal_and_reclaim()
+    test_batch_budget_is_shared_by_engagements()
+    test_failed_attempts_count_their_spend()
+    test_worker_runs_batch_on_stub_backend()
+    print("🎉 All batch tests passed!")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for engagement deadlines and cancellation
+Verifies the token, task cancellation, deadline skips, mid-stream checkpoints and resumed runs
+"""
+
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+from cancellation import CancellationToken, EngagementCancelled
+from strategy_consulting_agent import ConsultingTeam
+from stub_backend import StubAnthropic, StubStream
+
+DELIVERABLES = ["financial_analysis"]  # Phase 1: the three core analysts; phase 2: the financial analyst
+
+class InterruptingStream(StubStream):
+    """Stub stream that cancels the engagement after its second chunk."""
+
+    def __init__(self, response, token: CancellationToken):
+        super().__init__(response, chunk_chars=16)
+        self.token = token
+
+    @property
+    def text_stream(self):
+        for index, chunk in enumerate(super().text_stream):
+            if index == 2:
+                self.token.cancel()
+            yield chunk
+
+class InterruptingMessages:
+    """Answers like the stub, but the `cancel_on`-th streamed call is cancelled mid-response."""
+
+    def __init__(self, backend: StubAnthropic, token: CancellationToken, cancel_on: int):
+        self.backend = backend
+        self.token = token
+        self.cancel_on = cancel_on
+        self.streams = 0
+        self._lock = threading.Lock()
+
+    def create(self, **request):
+        return self.backend.respond(request)
+
+    def stream(self, **request):
+        with self._lock:
+            self.streams += 1
+            interrupt = self.streams == self.cancel_on
+        response = self.backend.respond(request)
+        return InterruptingStream(response, self.token) if interrupt else StubStream(response)
+
+def _team(directory: str, client, **options) -> ConsultingTeam:
+    team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False, **options)
+    for agent in team.agents.values():
+        agent.client = client
+    return team
+
+def _parameters():
+    return {"analysis_brief": "Test", "deliverables": DELIVERABLES}
+
+def test_token_deadline_and_bound():
+    """The deadline cancels the token by itself and bounds call timeouts; cancel() keeps its first reason."""
+    token = CancellationToken(deadline_seconds=0.05)
+    assert not token.cancelled and token.bound(30) <= 0.05 and token.can_finish(0.01)
+    assert not token.can_finish(10)
+    time.sleep(0.06)
+    assert token.reason == "deadline" and token.remaining() == 0.0
+    try:
+        token.check()
+        assert False, "expected EngagementCancelled"
+    except EngagementCancelled as e:
+        assert str(e) == "Engagement deadline passed"
+
+    token = CancellationToken()
+    assert token.bound(30) == 30 and token.remaining() is None and token.can_finish(1e9)
+    token.cancel("interrupted")
+    token.cancel()
+    assert token.reason == "interrupted"
+
+def test_wait_for_cancels_unfinished_tasks():
+    """A cancel from another thread wakes wait_for, which cancels the tasks still running."""
+    token = CancellationToken()
+
+    async def run():
+        fast = asyncio.ensure_future(asyncio.sleep(0))
+        slow = asyncio.ensure_future(asyncio.sleep(30))
+        threading.Timer(0.05, token.cancel).start()
+        start = time.monotonic()
+        await token.wait_for([fast, slow])
+        assert time.monotonic() - start < 5
+        assert fast.done() and not fast.cancelled() and slow.cancelled()
+
+    asyncio.run(run())
+
+def test_deadline_skips_agents_that_would_not_finish():
+    """An agent whose median duration exceeds the time left is skipped and the run is resumable."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = _team(directory, StubAnthropic(latency_seconds=0.0), deadline_seconds=60)
+        team.latency_histogram.record("financial_analyst", 600)
+        result = asyncio.run(team.execute_consulting_engagement(_parameters()))
+        assert result["status"] == "deadline_exceeded" and result["resumable"]
+        assert result["agent_results"]["financial_analyst"] == {"status": "skipped", "reason": "deadline",
+                                                                "estimated_seconds": 600}
+        assert result["agent_results"]["market_researcher"].status == "completed"
+        assert result["cancellation"]["deadline_seconds"] == 60
+        assert team.resumable_run()["run_id"] == result["run_id"]
+
+def test_cancelled_stream_is_checkpointed_and_resumed():
+    """A call cancelled mid-stream leaves a checkpoint; the resumed run reuses finished outputs and continues it."""
+    with tempfile.TemporaryDirectory() as directory:
+        token = CancellationToken()
+        stub = StubAnthropic(latency_seconds=0.0)
+        client = type("Client", (), {})()
+        client.messages = InterruptingMessages(stub, token, cancel_on=4)
+        team = _team(directory, client, cancellation=token)
+        result = asyncio.run(team.execute_consulting_engagement(_parameters()))
+        assert result["status"] == "cancelled" and result["resumable"]
+        cancelled = result["agent_results"]["financial_analyst"]
+        assert cancelled["status"] == "cancelled" and cancelled["reason"] == "cancelled"
+        checkpoint = Path(cancelled["checkpoint"])
+        partial = checkpoint.read_text(encoding='utf-8')
+        assert partial and checkpoint.name.endswith(".md.partial")
+        metadata = json.loads((Path(directory) / "Acme" / "run_metadata.json").read_text())
+        assert metadata["resumable"] and metadata["agent_status"]["financial_analyst"] == "cancelled"
+
+        calls_before = stub.calls
+        resumed_team = _team(directory, stub)
+        run = resumed_team.resumable_run()
+        resumed = asyncio.run(resumed_team.execute_consulting_engagement(run["engagement_parameters"], run["run_id"]))
+        assert resumed["status"] == "completed" and not resumed["resumable"]
+        assert resumed["run_id"] == result["run_id"]
+        assert stub.calls - calls_before == 1  # Only the continuation of the cancelled call
+        output = Path(resumed["agent_results"]["financial_analyst"].file_path).read_text(encoding='utf-8')
+        assert output.startswith(partial.rstrip())
+        assert not checkpoint.exists()
+        assert resumed_team.resumable_run() is None
+
+if __name__ == "__main__":
+    test_token_deadline_and_bound()
+    test_wait_for_cancels_unfinished_tasks()
+    test_deadline_skips_agents_that_would_not_finish()
+    test_cancelled_stream_is_checkpointed_and_resumed()
+    print("🎉 All cancellation tests passed!")
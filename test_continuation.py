@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Test script for continuation of truncated responses
+Verifies truncation detection and the shape of continuation requests
+"""
+
+from types import SimpleNamespace
+
+from continuation import is_truncated, continuation_request
+
+def test_truncation_detected_from_stop_reason():
+    """Only a max_tokens stop counts as truncated."""
+    assert is_truncated(SimpleNamespace(stop_reason="max_tokens"))
+    assert not is_truncated(SimpleNamespace(stop_reason="end_turn"))
+    assert not is_truncated(SimpleNamespace())
+
+def test_continuation_prefills_partial_output():
+    """The partial text becomes an assistant prefill after the cached prompt prefix."""
+    request = {"model": "m", "max_tokens": 4000, "system": "sys",
+               "messages": [{"role": "user", "content": "Analyze the market"}]}
+    continued = continuation_request(request, "## 1. Market Definition\nThe market is \n")
+    assert continued["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert continued["messages"][0]["content"][0]["text"] == "Analyze the market"
+    assert continued["messages"][-1] == {"role": "assistant", "content": "## 1. Market Definition\nThe market is"}
+    assert continued["max_tokens"] == 4000
+    assert request["messages"] == [{"role": "user", "content": "Analyze the market"}]
+
+if __name__ == "__main__":
+    test_truncation_detected_from_stop_reason()
+    test_continuation_prefills_partial_output()
+    print("🎉 All continuation tests passed!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm daemon
+Verifies per-engagement progress routing, the socket protocol and shared team resources
+"""
+
+import io
+import json
+import socket
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from daemon import ConsultingDaemon, DaemonError, ProgressStream, progress_to, request, submit_engagement
+from strategy_consulting_agent import TeamResources
+from stub_backend import StubAnthropic
+
+def test_progress_stream_routes_prints_per_engagement():
+    """Concurrent engagements each receive only their own lines; other prints reach the fallback."""
+    fallback = io.StringIO()
+    stream = ProgressStream(fallback)
+    received = {"a": [], "b": []}
+
+    async def engagement(name: str):
+        with progress_to(lambda event: received[name].append(event["message"])):
+            for step in range(3):
+                print(f"{name} step {step}", file=stream)
+                await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(engagement("a"), engagement("b"))
+
+    asyncio.run(run())
+    print("daemon line", file=stream)
+    assert received["a"] == ["a step 0", "a step 1", "a step 2"]
+    assert received["b"] == ["b step 0", "b step 1", "b step 2"]
+    assert fallback.getvalue() == "daemon line\n"
+
+def test_socket_protocol_status_validation_and_stop():
+    """Status and request validation work over the socket; stop removes it."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "daemon.sock"
+        daemon = ConsultingDaemon("test-key", path, max_concurrent=1)
+        thread = threading.Thread(target=asyncio.run, args=(daemon.serve(),))
+        thread.start()
+        deadline = time.time() + 5
+        while not path.exists() and time.time() < deadline:
+            time.sleep(0.01)
+
+        status = request({"command": "status"}, path)
+        assert status["engagements"]["served"] == 0
+        assert status["warm"]["client"] is False
+        for engagement, error in [({"company": "Acme", "brief": "x", "output_dir": directory,
+                                    "team_options": {"api_key": "other"}}, "Unknown team options: api_key"),
+                                  ({"company": "Acme"}, "Missing fields: brief, output_dir")]:
+            try:
+                submit_engagement(engagement, path=path)
+                assert False, "expected DaemonError"
+            except DaemonError as e:
+                assert str(e) == error
+
+        assert request({"command": "stop"}, path)["stopping"] is True
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert not path.exists()
+        try:
+            request({"command": "status"}, path)
+            assert False, "expected DaemonError"
+        except DaemonError as e:
+            assert "No daemon listening" in str(e)
+
+def test_disconnected_client_cancels_engagement():
+    """A thin client that goes away (Ctrl-C) cancels its engagement instead of leaving it spending."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "daemon.sock"
+        daemon = ConsultingDaemon("test-key", path, max_concurrent=1)
+        stub = StubAnthropic(latency_seconds=0.5, jitter=0.0)
+        daemon.resources = TeamResources("test-key", client=stub)
+        thread = threading.Thread(target=asyncio.run, args=(daemon.serve(),))
+        thread.start()
+        deadline = time.time() + 5
+        while not path.exists() and time.time() < deadline:
+            time.sleep(0.01)
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(path))
+                sock.sendall((json.dumps({"command": "engage", "company": "Acme", "brief": "Test",
+                                          "output_dir": directory, "deliverables": ["financial_analysis"],
+                                          "team_options": {"hedging": False}}) + "\n").encode('utf-8'))
+                with sock.makefile('r', encoding='utf-8') as events:
+                    assert json.loads(events.readline())["event"] == "progress"
+            deadline = time.time() + 10
+            while daemon.engagements["served"] + daemon.engagements["failed"] == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert daemon.engagements["active"] == 0
+            assert stub.calls <= 3  # Phase 1 calls already in flight; nothing after the disconnect
+        finally:
+            request({"command": "stop"}, path)
+            thread.join(timeout=10)
+
+def test_team_resources_stay_warm():
+    """Histories and breakers are built once; new outputs update the cached output-length index."""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        resources = TeamResources("test-key")
+        histogram = resources.latency_histogram(root / "latency_history.json", 200)
+        assert resources.latency_histogram(root / "." / "latency_history.json", 200) is histogram
+        assert resources.breakers({}) is resources.breakers({"failure_threshold": 1})
+
+        history = asyncio.run(resources.output_history([root], 4))
+        resources.record_output(root / "Acme", "market_researcher", 1200)
+        resources.record_output(Path(directory + "_elsewhere") / "Acme", "market_researcher", 900)
+        assert asyncio.run(resources.output_history([root], 4)) is history
+        assert history.samples == {"market_researcher": [1200]}
+
+if __name__ == "__main__":
+    test_progress_stream_routes_prints_per_engagement()
+    test_socket_protocol_status_validation_and_stop()
+    test_disconnected_client_cancels_engagement()
+    test_team_resources_stay_warm()
+    print("🎉 All daemon tests passed!")
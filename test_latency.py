@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for latency tracking and hedged requests
+Verifies percentiles, persistence, timeouts and the hedging spend cap
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from latency import LatencyHistogram, HedgedCaller, HedgePolicy
+
+def _warm_histogram(path: Path, role: str = "senior_partner", seconds: float = 0.05, count: int = 20) -> LatencyHistogram:
+    """Build a histogram with enough samples for hedging to apply."""
+    histogram = LatencyHistogram(path)
+    for _ in range(count):
+        histogram.record(role, seconds)
+    return histogram
+
+def test_percentiles_and_persistence():
+    """Percentiles use nearest rank and survive a save/load round trip."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "latency_history.json"
+        histogram = LatencyHistogram(path, window=100)
+        for value in range(1, 101):
+            histogram.record("market_researcher", float(value))
+        assert histogram.percentile("market_researcher", 50) == 50.0
+        assert histogram.percentile("market_researcher", 95) == 95.0
+        assert histogram.percentile("market_researcher", 99) == 99.0
+        assert histogram.percentile("unknown_role", 95) is None
+        histogram.save()
+
+        reloaded = LatencyHistogram(path, window=10)
+        assert reloaded.count("market_researcher") == 10
+        assert reloaded.summary()["market_researcher"]["p50"] == 95.0
+
+def test_hedge_wins_over_straggler():
+    """A call stuck past p95 is duplicated and the faster duplicate wins."""
+    with tempfile.TemporaryDirectory() as tmp:
+        histogram = _warm_histogram(Path(tmp) / "latency_history.json")
+        caller = HedgedCaller(histogram, HedgePolicy(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+        attempts = []
+
+        async def make_call():
+            attempts.append(len(attempts))
+            await asyncio.sleep(5 if len(attempts) == 1 else 0.01)
+            return f"attempt-{len(attempts)}"
+
+        result, stats = asyncio.run(caller.call("senior_partner", make_call, timeout=2))
+        assert result == "attempt-2"
+        assert stats["hedged"] and stats["hedge_won"]
+        assert caller.hedges == 1
+        # The straggler is recorded at the time it had run for, not dropped, next to the hedge's own latency
+        straggler, hedge = histogram.samples["senior_partner"][-2:]
+        assert straggler >= 0.05 and hedge < straggler
+
+def test_hedge_budget_caps_extra_spend():
+    """No duplicates are fired once the hedge ratio is used up."""
+    with tempfile.TemporaryDirectory() as tmp:
+        histogram = _warm_histogram(Path(tmp) / "latency_history.json")
+        caller = HedgedCaller(histogram, HedgePolicy(enabled=True, min_samples=20, max_hedge_ratio=0.0))
+
+        async def make_call():
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        result, stats = asyncio.run(caller.call("senior_partner", make_call, timeout=2))
+        assert result == "ok"
+        assert not stats["hedged"]
+        assert caller.hedges == 0
+
+def test_hedge_can_be_declined():
+    """A duplicate the caller cannot afford is not fired."""
+    with tempfile.TemporaryDirectory() as tmp:
+        histogram = _warm_histogram(Path(tmp) / "latency_history.json")
+        caller = HedgedCaller(histogram, HedgePolicy(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+        asked = []
+
+        async def make_call():
+            await asyncio.sleep(0.2)
+            return "ok"
+
+        result, stats = asyncio.run(caller.call("senior_partner", make_call, timeout=2,
+                                                may_hedge=lambda: asked.append(True) or False))
+        assert result == "ok" and asked == [True]
+        assert not stats["hedged"] and caller.hedges == 0
+
+def test_timeout_raises():
+    """Calls that outlive the timeout raise instead of hanging the engagement."""
+    with tempfile.TemporaryDirectory() as tmp:
+        caller = HedgedCaller(LatencyHistogram(Path(tmp) / "latency_history.json"))
+
+        async def make_call():
+            await asyncio.sleep(5)
+
+        try:
+            asyncio.run(caller.call("risk_assessor", make_call, timeout=0.05))
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("Expected the call to time out")
+        assert caller.histogram.samples["risk_assessor"][0] >= 0.05  # Censored at the deadline
+
+if __name__ == "__main__":
+    test_percentiles_and_persistence()
+    test_hedge_wins_over_straggler()
+    test_hedge_budget_caps_extra_spend()
+    test_hedge_can_be_declined()
+    test_timeout_raises()
+    print("🎉 All latency tests passed!")
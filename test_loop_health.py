@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for event-loop health and memory instrumentation
+Verifies stall detection with stack and agent attribution, per-phase memory and the engagement debug report
+"""
+
+import json
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+from loop_health import LoopWatchdog, MemoryProfiler
+from strategy_consulting_agent import ConsultingTeam, AgentRole
+from stub_backend import StubAnthropic
+
+class BlockingAgent:
+    """Stands in for an agent whose method blocks the loop with a sync call."""
+    role = AgentRole.MARKET_RESEARCHER
+    company_name = "Acme"
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        time.sleep(0.3)
+
+def test_stall_is_reported_with_stack_and_agent():
+    """A sync call in an agent blocks the loop: the stall names the agent and the blocking line."""
+    async def run():
+        watchdog = LoopWatchdog.acquire(0.1)
+        assert LoopWatchdog.acquire(0.1) is watchdog  # One watchdog per loop
+        try:
+            await asyncio.sleep(0.1)
+            await BlockingAgent().execute()
+            await asyncio.sleep(0.1)
+        finally:
+            watchdog.release()
+            watchdog.release()
+        return watchdog
+
+    watchdog = asyncio.run(run())
+    assert len(watchdog.stalls) == 1
+    stall = watchdog.stalls[0]
+    assert 0.2 < stall.seconds < 1.0
+    assert stall.agent == "market_researcher" and stall.company == "Acme"
+    assert "time.sleep(0.3)" in stall.stack[-1]
+    assert not LoopWatchdog._by_loop
+
+def test_phase_memory_names_the_allocator():
+    """A phase that builds a large string shows it as the top allocator and in its peak."""
+    profiler = MemoryProfiler(top=5)
+    profiler.start()
+    try:
+        with profiler.phase("concatenation") as measured:
+            report = ""
+            for _ in range(2000):
+                report += "x" * 1000
+        with profiler.phase("idle"):
+            pass
+    finally:
+        profiler.stop()
+    memory = measured["memory"]
+    assert memory.peak_bytes >= 2_000_000 and memory.growth_bytes >= 2_000_000
+    assert "test_loop_health.py" in memory.top_allocators[0]["where"]
+    assert [phase.phase for phase in profiler.phases] == ["concatenation", "idle"]
+    assert len(report) == 2_000_000
+
+def test_engagement_debug_report():
+    """A debug engagement writes its stalls and per-phase memory, and puts memory on the phase spans."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False, debug=True)
+        for agent in team.agents.values():
+            agent.client = StubAnthropic(latency_seconds=0.0)
+        asyncio.run(team.execute_consulting_engagement(
+            {"analysis_brief": "Test", "deliverables": ["financial_analysis"]}))
+        report = json.loads((Path(directory) / "Acme" / "debug_report.json").read_text())
+        assert report["run_id"] == team.run_id and report["slow_callback_ms"] == 100
+        assert [phase["phase"] for phase in report["phases"]] == ["phase 1", "phase 2", "report"]
+        assert all(phase["peak_bytes"] > 0 for phase in report["phases"])
+        assert isinstance(report["loop_stalls"], list)
+        phase_span = next(span for span in team.tracer.spans if span.name == "phase 1")
+        assert phase_span.attributes["memory.peak_bytes"] == report["phases"][0]["peak_bytes"]
+
+if __name__ == "__main__":
+    test_stall_is_reported_with_stack_and_agent()
+    test_phase_memory_names_the_allocator()
+    test_engagement_debug_report()
+    print("🎉 All loop health tests passed!")
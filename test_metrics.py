@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for live metrics
+Verifies the exposition format, per-thread counting, label checks and scraping /metrics during a stub-backed run
+"""
+
+import json
+import threading
+import tempfile
+import urllib.request
+from pathlib import Path
+
+import metrics
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, serve_metrics
+from service import ConsultingService, serve_in_thread
+from strategy_consulting_agent import TeamResources
+from stub_backend import StubAnthropic
+
+def _samples(text: str) -> dict:
+    """Sample lines of a scrape as {name{labels}: value}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def _total(samples: dict, prefix: str) -> float:
+    return sum(value for name, value in samples.items() if name == prefix or name.startswith(prefix + "{"))
+
+def test_exposition_format():
+    """Counters, gauges (with callbacks) and cumulative histogram buckets render in the text format."""
+    registry = MetricsRegistry()
+    calls = Counter("calls_total", "Calls", ("role",), registry=registry)
+    depth = Gauge("depth", "Queue depth", ("queue",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency", ("role",), buckets=(1.0, 5.0), registry=registry)
+    calls.inc(role="analyst")
+    calls.inc(2, role="analyst")
+    depth.track(lambda: 7, queue="jobs")
+    for seconds in (0.5, 3.0, 9.0):
+        latency.observe(seconds, role="analyst")
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text and "# TYPE latency_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['calls_total{role="analyst"}'] == 3 and samples['depth{queue="jobs"}'] == 7
+    assert samples['latency_seconds_bucket{role="analyst",le="1"}'] == 1
+    assert samples['latency_seconds_bucket{role="analyst",le="5"}'] == 2
+    assert samples['latency_seconds_bucket{role="analyst",le="+Inf"}'] == 3
+    assert samples['latency_seconds_count{role="analyst"}'] == 3 and samples['latency_seconds_sum{role="analyst"}'] == 12.5
+    try:
+        calls.inc(role="analyst", model="x")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "takes labels" in str(e)
+
+def test_concurrent_updates_are_not_lost():
+    """Threads update their own cells without a lock; the scrape sums every thread's counts."""
+    registry = MetricsRegistry()
+    calls = Counter("calls_total", "Calls", registry=registry)
+    in_flight = Gauge("in_flight", "In flight", registry=registry)
+
+    def work():
+        for _ in range(20000):
+            calls.inc()
+            in_flight.inc()
+            in_flight.dec()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls.value() == 80000 and in_flight.value() == 0
+
+    server = serve_metrics("127.0.0.1", 0, registry)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=10) as response:
+            assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+            assert _samples(response.read().decode('utf-8'))["calls_total"] == 80000
+    finally:
+        server.shutdown()
+
+def test_service_metrics_during_a_run():
+    """Scraping the service while a stub-backed job runs shows its calls, tokens, latency and bytes."""
+    with tempfile.TemporaryDirectory() as directory:
+        resources = TeamResources("stub", client=StubAnthropic(latency_seconds=0.05))
+        service = ConsultingService(resources, Path(directory), Path(directory) / "jobs.sqlite3", workers=1)
+        serve_in_thread(service)
+        url = f"http://127.0.0.1:{service.port}"
+
+        def scrape() -> dict:
+            with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+                assert response.status == 200 and response.headers["Content-Type"].startswith("text/plain")
+                return _samples(response.read().decode('utf-8'))
+
+        try:
+            before = scrape()
+            request = urllib.request.Request(f"{url}/engagements", method="POST", data=json.dumps(
+                {"company": "Acme", "brief": "Test", "deliverables": ["financial_analysis"]}).encode('utf-8'))
+            with urllib.request.urlopen(request, timeout=10) as response:
+                job_id = json.load(response)["job_id"]
+            scrapes = 0
+            while True:
+                during = scrape()
+                scrapes += 1
+                with urllib.request.urlopen(f"{url}/engagements/{job_id}", timeout=10) as response:
+                    if json.load(response)["status"] not in ("queued", "running"):
+                        break
+            after = scrape()
+        finally:
+            service.stop()
+
+        assert scrapes >= 1 and 'consulting_queue_depth{queue="service_jobs"}' in during
+        delta = lambda prefix: _total(after, prefix) - _total(before, prefix)
+        assert delta('consulting_llm_requests_total') == 4  # Three core analysts and the financial analyst
+        assert after['consulting_llm_requests_total{role="financial_analyst",model="claude-sonnet-4-20250514",outcome="ok"}'] >= 1
+        assert delta('consulting_llm_tokens_total') > 0
+        assert delta('consulting_llm_call_duration_seconds_count') == 4
+        assert delta('consulting_bytes_written_total') > 0
+        assert delta('consulting_engagements_total') == 1
+        assert after["consulting_llm_in_flight"] == 0 and after['consulting_queue_depth{queue="service_jobs"}'] == 0
+        assert 'consulting_scheduler_queued_calls{priority_class="bulk"}' in after
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_concurrent_updates_are_not_lost()
+    test_service_metrics_during_a_run()
+    print("🎉 All metrics tests passed!")
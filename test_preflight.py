@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for pre-flight validation and dry-run estimates
+Verifies template placeholder checks and the estimate arithmetic
+"""
+
+from prompt_manager import PromptManager
+from preflight import (template_placeholders, check_templates, estimate_call, EngagementEstimate,
+                       format_estimate)
+
+SUPPLIED = {"company_name", "analysis_parameters", "dependency_outputs_section", "agent_list"}
+REVIEW_SUPPLIED = {
+    "review": {"company_name", "deliverable", "deliverable_content"},
+    "synthesis": {"company_name", "analysis_parameters", "agent_list", "deliverable_reviews"}
+}
+
+def test_configured_templates_compile():
+    """Every shipped template only uses placeholders the engine supplies."""
+    errors, warnings = check_templates(PromptManager(), SUPPLIED, REVIEW_SUPPLIED)
+    assert errors == [], errors
+    assert warnings == [], warnings
+
+def test_missing_placeholder_is_reported_before_any_call():
+    """A placeholder the engine does not supply is an error for every template that uses it."""
+    errors, _ = check_templates(PromptManager(), SUPPLIED - {"agent_list"}, REVIEW_SUPPLIED)
+    failing = sorted(error.split()[0] for error in errors)
+    assert failing == ["agents.senior_partner.user_prompt_template", "agents.strategy_storyteller.user_prompt_template"]
+    assert template_placeholders("Company: {company_name} {{literal}}") == {"company_name"}
+    try:
+        template_placeholders("Company: {company_name")
+        assert False, "malformed template accepted"
+    except ValueError:
+        pass
+
+def test_estimate_totals():
+    """Cost uses the model pricing; wall time is the sum of each phase's slowest agent."""
+    estimate = EngagementEstimate("model", {"input_per_mtok": 3.0, "output_per_mtok": 15.0})
+    estimate.phases = [["market_researcher", "competitive_analyst"], ["strategy_storyteller"]]
+    estimate.add("market_researcher", estimate_call("market_researcher", "x" * 4000, 0, 2000, 4000, 40.0, 60))
+    estimate.add("competitive_analyst", estimate_call("competitive_analyst", "x" * 4000, 0, None, 4000, None, 100))
+    estimate.add("strategy_storyteller", estimate_call("strategy_storyteller", "x" * 4000, 1000, 3000, 5000, 50.0, 60))
+    assert estimate.calls["competitive_analyst"][0].output_tokens == 4000
+    assert estimate.calls["competitive_analyst"][0].output_source == "max_tokens"
+    assert estimate.input_tokens == 4000
+    assert estimate.output_tokens == 9000
+    assert abs(estimate.cost - (4000 * 3.0 + 9000 * 15.0) / 1_000_000) < 1e-9
+    assert estimate.wall_seconds == 90.0
+    assert "Estimated wall time: 1.5 min" in format_estimate(estimate)
+
+if __name__ == "__main__":
+    test_configured_templates_compile()
+    test_missing_placeholder_is_reported_before_any_call()
+    test_estimate_totals()
+    print("🎉 All pre-flight tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the live progress dashboard
+Verifies per-call tokens, rates and spend, the plain fallback renderer, background log appends and an engagement's rows
+"""
+
+import io
+import os
+import time
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from artifact_io import BackgroundAppender
+from latency import HedgedCaller, HedgePolicy, LatencyHistogram
+from progress_dashboard import ProgressDashboard
+from single_flight import SingleFlight
+from spend import PriceTable
+from strategy_consulting_agent import ConsultingTeam, AgentRole
+from stub_backend import StubAnthropic
+
+def test_calls_totals_and_plain_summaries():
+    """Streamed text counts as tokens until the billed usage replaces it; old finished rows are trimmed."""
+    stream = io.StringIO()
+    dashboard = ProgressDashboard(plain_interval=0.05, chars_per_token=4, keep_finished=2, stream=stream)
+    with dashboard:
+        calls = [dashboard.start("Acme", f"agent_{index}", "claude-sonnet-4-5-20250929", 1000, input_tokens=100)
+                 for index in range(4)]
+        calls[0].add_text("x" * 400)
+        time.sleep(0.2)
+        running = dashboard.snapshot()
+        assert running["running"] == 4 and running["engagements"] == 1
+        assert running["rows"][0]["tokens"] == 100 and running["rows"][0]["eta_seconds"] > 0
+        assert running["spend_usd"] > 0
+        for call in calls[:3]:
+            dashboard.finish(call, {"input_tokens": 100, "output_tokens": 250})
+        dashboard.finish(calls[3], failed=True)
+    snapshot = dashboard.snapshot()
+    assert snapshot["running"] == 0 and snapshot["done"] == 3 and snapshot["failed"] == 1
+    assert snapshot["tokens"] == 750
+    assert len(snapshot["rows"]) == 2 and snapshot["rows"][-1]["status"] == "failed"
+    expected = 3 * PriceTable().cost("claude-sonnet-4-5-20250929", input_tokens=100, output_tokens=250)
+    assert abs(snapshot["spend_usd"] - expected - dashboard.spend(calls[3])) < 1e-9
+    lines = stream.getvalue().splitlines()
+    assert 2 <= len(lines) <= 10, lines  # Fixed rate, plus the final summary
+    assert lines[-1].startswith("⏱️  0 calls running in 0 engagements, 3 done, 1 failed | 750 tokens")
+
+def test_background_appender_keeps_order():
+    """Chunks reach the file in order whether or not they filled a batch."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "log.md"
+        path.write_text("# Header\n", encoding='utf-8')
+        log = BackgroundAppender(path, batch_chars=100)
+        chunks = [f"chunk {index}; " for index in range(500)]
+        for chunk in chunks:
+            log.write(chunk)
+        log.close()
+        assert path.read_text(encoding='utf-8') == "# Header\n" + "".join(chunks)
+
+def test_engagement_and_orchestrator_report_to_dashboard():
+    """Every agent call of an engagement, and the orchestrator's streamed call, gets a finished row."""
+    with tempfile.TemporaryDirectory() as directory:
+        dashboard = ProgressDashboard(plain_interval=60, keep_finished=100, stream=io.StringIO())
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False, dashboard=dashboard)
+        for agent in team.agents.values():
+            agent.client = StubAnthropic(latency_seconds=0.0)
+        with dashboard:
+            asyncio.run(team.execute_consulting_engagement(
+                {"analysis_brief": "Test", "deliverables": ["financial_analysis"]}))
+        snapshot = dashboard.snapshot()
+        assert snapshot["running"] == 0 and snapshot["failed"] == 0 and snapshot["done"] >= 2
+        assert all(row["engagement"] == "Acme" and row["tokens"] > 0 for row in snapshot["rows"])
+        assert snapshot["spend_usd"] > 0
+
+        from orchestrator import ConsultingOrchestrator
+        cwd = os.getcwd()
+        shutil.copy("agent_prompts.yaml", directory)  # The orchestrator runs from the repository root
+        os.chdir(directory)
+        try:
+            orchestrator = ConsultingOrchestrator("test-key", "Acme", "Test brief",
+                                                  client=StubAnthropic(latency_seconds=0.0))
+            result = orchestrator.run_analysis()
+        finally:
+            os.chdir(cwd)
+        assert result["status"] == "completed"
+        log = (Path(directory) / result["project_dir"] / "orchestrator_execution_log.md").read_text(encoding='utf-8')
+        assert "**Started:**" in log and log.rstrip().endswith(orchestrator.metadata["end_time"])
+        assert orchestrator.metadata["output_tokens"] > 0
+
+def test_hedges_and_coalesced_calls_are_counted_once():
+    """A hedge gets its own row and only the winner's usage counts; coalesced followers add no row."""
+    with tempfile.TemporaryDirectory() as directory:
+        dashboard = ProgressDashboard(keep_finished=100, stream=io.StringIO())
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=True, dashboard=dashboard)
+        agent = team.agents[AgentRole.MARKET_RESEARCHER]
+        agent.client = StubAnthropic(latency_seconds=0.2, jitter=0.0)
+        agent.stream_validators = []
+        histogram = LatencyHistogram(Path(directory) / "latency_history.json")
+        for _ in range(20):
+            histogram.record("market_researcher", 0.01)
+        agent.caller = HedgedCaller(histogram, HedgePolicy(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+        request = {"model": "claude-sonnet-4-5-20250929", "max_tokens": 1000, "system": "sys",
+                   "messages": [{"role": "user", "content": "Analyze Acme"}]}
+
+        stats = {}
+        response = asyncio.run(agent._create_message(stats=stats, **request))
+        snapshot = dashboard.snapshot()
+        assert stats["hedged"] and len(snapshot["rows"]) == 2
+        assert snapshot["done"] == 1 and snapshot["failed"] == 1
+        winner = snapshot["rows"][1 if stats["hedge_won"] else 0]
+        assert winner["status"] == "done" and winner["tokens"] == response.usage.output_tokens
+
+        agent.caller = None
+        agent.single_flight = SingleFlight()
+        dashboard.done = dashboard.failed = dashboard.done_tokens = 0
+
+        async def concurrent():
+            return await asyncio.gather(*(agent._create_message(stats={}, **request) for _ in range(3)))
+
+        asyncio.run(concurrent())
+        assert agent.single_flight.coalesced == 2
+        assert dashboard.done == 1 and dashboard.done_tokens == response.usage.output_tokens
+
+if __name__ == "__main__":
+    test_calls_totals_and_plain_summaries()
+    test_background_appender_keeps_order()
+    test_engagement_and_orchestrator_report_to_dashboard()
+    test_hedges_and_coalesced_calls_are_counted_once()
+    print("🎉 All progress dashboard tests passed!")
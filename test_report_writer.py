@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming report writer
+Verifies report contents per format, that peak memory does not grow with report size and that
+an engagement does not keep saved outputs in memory
+"""
+
+import asyncio
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from report_writer import ReportWriter, ReportSection
+from strategy_consulting_agent import ConsultingTeam
+from stub_backend import StubAnthropic
+
+def _write_sections(directory: Path, count: int, size: int) -> list:
+    """Create `count` agent output files of roughly `size` characters each."""
+    sections = []
+    for i in range(count):
+        source = directory / f"agent_{i}.md"
+        source.write_text(f"# Agent {i}\n\n" + ("- insight line\n" * (size // 15)), encoding='utf-8')
+        sections.append(ReportSection(f"Agent {i}", source_file=source))
+    return sections
+
+def _peak_while_writing(directory: Path, sections: list, report_format: str) -> int:
+    writer = ReportWriter("Test Company", {"analysis_brief": "test"}, sections, generated="today")
+    tracemalloc.start()
+    writer.write(directory / f"report_{report_format}_{len(sections)}", report_format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def test_markdown_report_streams_sections():
+    """Every section's file content ends up in the report with its heading."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sections = _write_sections(tmp, 2, 200)
+        sections.append(ReportSection("Risk Assessor", text="Buffered text", digest="### Digest\n"))
+        path = ReportWriter("Test Company", {"analysis_brief": "test"}, sections, generated="today").write(tmp / "report.md")
+        report = path.read_text(encoding='utf-8')
+        assert report.startswith("# Strategic Analysis Report: Test Company")
+        assert "## Agent 0\n\n# Agent 0" in report
+        assert "### Digest" in report and "Buffered text" not in report
+        assert "Table of Contents" not in report
+
+def test_bundle_and_html_formats():
+    """The bundle has a table of contents and full prose; HTML converts markdown blocks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sections = [ReportSection("Market Researcher", text="## TAM\n\n- **Large** market\n", digest="### Digest\n")]
+        writer = ReportWriter("Test Company", {}, sections, generated="today")
+        bundle = writer.write(tmp / "report_bundle.md", "bundle").read_text(encoding='utf-8')
+        assert "- [Market Researcher](#market-researcher)" in bundle
+        assert "### Digest" in bundle and "- **Large** market" in bundle
+
+        sections[0].digest = None
+        page = writer.write(tmp / "report.html", "html").read_text(encoding='utf-8')
+        assert '<section id="market-researcher">' in page
+        assert "<li><strong>Large</strong> market</li>" in page
+
+def test_peak_memory_stays_flat():
+    """Writing 40 large sections needs no more memory than writing 4."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        small = _peak_while_writing(tmp, _write_sections(tmp, 4, 200_000), "markdown")
+        large = _peak_while_writing(tmp, _write_sections(tmp, 40, 200_000), "markdown")
+        assert large < 1_000_000
+        assert large < small * 2 + 100_000
+
+def test_engagement_releases_saved_outputs():
+    """Saved outputs are dropped from the results; the report still has their full text."""
+    with tempfile.TemporaryDirectory() as tmp:
+        team = ConsultingTeam("test-key", "Acme", Path(tmp) / "Acme", hedging=False)
+        for agent in team.agents.values():
+            agent.client = StubAnthropic(latency_seconds=0.0)
+        result = asyncio.run(team.execute_consulting_engagement(
+            {"analysis_brief": "Test", "deliverables": ["financial_analysis"]}))
+        outputs = list(result["agent_results"].values())
+        assert len(outputs) == 4 and all(output.output_content == "" for output in outputs)
+        report = Path(result["final_report"]).read_text(encoding='utf-8')
+        for output in outputs:
+            saved = Path(output.file_path).read_text(encoding='utf-8')
+            assert saved and saved.strip()[:200] in report
+
+if __name__ == "__main__":
+    test_markdown_report_streams_sections()
+    test_bundle_and_html_formats()
+    test_peak_memory_stays_flat()
+    test_engagement_releases_saved_outputs()
+    print("🎉 All report writer tests passed!")
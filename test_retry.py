@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for retry and circuit breaking
+Verifies error classification, backoff limits and breaker state transitions
+"""
+
+import asyncio
+
+from retry import RetryPolicy, CircuitBreaker, CircuitOpenError, call_with_retry, classify_error
+
+class FakeAPIError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status code."""
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def test_classify_error():
+    """Transient failures map to retryable classes; everything else is not retried."""
+    assert classify_error(FakeAPIError(529)) == 'overloaded'
+    assert classify_error(FakeAPIError(429)) == 'rate_limit'
+    assert classify_error(FakeAPIError(502)) == 'server_error'
+    assert classify_error(asyncio.TimeoutError()) == 'timeout'
+    assert classify_error(ConnectionResetError()) == 'connection'
+    assert classify_error(FakeAPIError(400)) is None
+    assert classify_error(KeyError('agent_list')) is None
+
+def test_retry_recovers_from_transient_errors():
+    """Retries stop at the first success and are counted in the stats."""
+    policy = RetryPolicy(base_delay=0.001, max_delay=0.001)
+    failures = [FakeAPIError(529), FakeAPIError(503)]
+    stats = {}
+
+    async def attempt():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert asyncio.run(call_with_retry(attempt, policy, stats=stats)) == "ok"
+    assert stats['retries'] == 2
+    assert stats['errors'] == {'overloaded': 1, 'server_error': 1}
+
+def test_retry_gives_up_at_class_limit():
+    """An error class is raised once its attempt limit is used up."""
+    policy = RetryPolicy(retry_on={'timeout': 2}, base_delay=0.001, max_delay=0.001)
+    stats = {}
+
+    async def attempt():
+        raise asyncio.TimeoutError()
+
+    try:
+        asyncio.run(call_with_retry(attempt, policy, stats=stats))
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("Expected the timeout to be raised")
+    assert stats['retries'] == 1
+    assert stats['errors'] == {'timeout': 2}
+
+def test_circuit_breaker_opens_and_half_opens():
+    """The breaker trips at the threshold and lets a probe through after the reset timeout."""
+    breaker = CircuitBreaker("claude-sonnet", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("Expected the open breaker to short-circuit")
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.state == 'half_open'
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.trips == 1
+
+if __name__ == "__main__":
+    test_classify_error()
+    test_retry_recovers_from_transient_errors()
+    test_retry_gives_up_at_class_limit()
+    test_circuit_breaker_opens_and_half_opens()
+    print("🎉 All retry tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for LLM call scheduling
+Verifies class priority, weighted fair queuing between tenants, class caps, cancellation and team wiring
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from scheduler import CallScheduler
+from strategy_consulting_agent import ConsultingTeam, TeamResources
+
+CLASSES = {"interactive": {"priority": 0}, "bulk": {"priority": 1}}
+
+async def _admission_order(scheduler: CallScheduler, calls, hold: str = "bulk"):
+    """Hold the only slot, queue `calls` as (name, class, tenant), release, and return the order they ran in."""
+    order = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot(hold, "holder"):
+            await release.wait()
+
+    async def call(name: str, priority_class: str, tenant: str):
+        async with scheduler.slot(priority_class, tenant):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    holding = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    tasks = []
+    for spec in calls:
+        tasks.append(asyncio.create_task(call(*spec)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holding, *tasks)
+    return order
+
+def test_interactive_overtakes_queued_bulk_calls():
+    """A newly queued interactive call runs before bulk calls that were queued earlier."""
+    scheduler = CallScheduler(max_in_flight=1, classes=CLASSES)
+    order = asyncio.run(_admission_order(scheduler, [("bulk-1", "bulk", "nightly"), ("bulk-2", "bulk", "nightly"),
+                                                     ("analyst", "interactive", "jane")]))
+    assert order == ["analyst", "bulk-1", "bulk-2"]
+    assert scheduler.preemptions == 2
+    summary = scheduler.summary()["classes"]
+    assert summary["interactive"]["calls"] == 1 and summary["bulk"]["calls"] == 3
+    assert summary["bulk"]["wait_max"] >= summary["interactive"]["wait_p95"] >= 0
+
+def test_tenants_share_a_class_fairly_by_weight():
+    """A backlogged tenant does not starve one that queued later; weights set the ratio."""
+    scheduler = CallScheduler(max_in_flight=1, classes=CLASSES)
+    calls = [(f"a{i}", "bulk", "a") for i in range(4)] + [(f"b{i}", "bulk", "b") for i in range(2)]
+    assert asyncio.run(_admission_order(scheduler, calls)) == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+    weighted = CallScheduler(max_in_flight=1, classes=CLASSES, tenant_weights={"b": 2.0})
+    calls = [(f"a{i}", "bulk", "a") for i in range(3)] + [(f"b{i}", "bulk", "b") for i in range(4)]
+    assert asyncio.run(_admission_order(weighted, calls)) == ["b0", "a0", "b1", "b2", "a1", "b3", "a2"]
+
+def test_class_cap_keeps_slots_for_interactive_calls():
+    """Bulk calls stop at their class cap; interactive calls use the remaining slot at once."""
+    scheduler = CallScheduler(max_in_flight=2, classes={"interactive": {"priority": 0},
+                                                        "bulk": {"priority": 1, "max_in_flight": 1}})
+
+    async def run():
+        release = asyncio.Event()
+
+        async def bulk():
+            async with scheduler.slot("bulk", "nightly"):
+                await release.wait()
+
+        bulk_calls = [asyncio.create_task(bulk()) for _ in range(2)]
+        await asyncio.sleep(0)
+        async with scheduler.slot("interactive", "jane") as wait:
+            assert wait < 0.1
+            bulk = scheduler.summary()["classes"]["bulk"]
+            assert (bulk["in_flight"], bulk["queued"]) == (1, 1)
+        release.set()
+        await asyncio.gather(*bulk_calls)
+
+    asyncio.run(run())
+
+def test_cancelled_waiter_leaves_the_queue():
+    """Cancelling a queued call frees its place; the slot count stays consistent."""
+    scheduler = CallScheduler(max_in_flight=1, classes=CLASSES)
+
+    async def run():
+        async with scheduler.slot("bulk", "a"):
+            waiter = asyncio.create_task(scheduler.slot("bulk", "b").__aenter__())
+            await asyncio.sleep(0)
+            assert scheduler.summary()["classes"]["bulk"]["queued"] == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert scheduler.summary()["classes"]["bulk"]["queued"] == 0
+            assert ("bulk", "b") not in scheduler._last_finish
+        assert scheduler.in_flight == 0
+        async with scheduler.slot("interactive", "c"):
+            assert scheduler.in_flight == 1
+
+    asyncio.run(run())
+
+def test_idle_tenants_are_forgotten():
+    """One-off tenants, such as per-run ids, leave no fair-queuing state behind once their calls are admitted."""
+    scheduler = CallScheduler(max_in_flight=2, classes=CLASSES)
+
+    async def call(tenant: str):
+        async with scheduler.slot("bulk", tenant):
+            await asyncio.sleep(0.001)
+
+    async def run():
+        await asyncio.gather(*(call(f"run-{index}") for index in range(50)))
+
+    asyncio.run(run())
+    assert scheduler._last_finish == {}
+    assert scheduler.summary()["classes"]["bulk"]["calls"] == 50
+
+def test_team_wiring():
+    """Teams on shared resources share one scheduler and reject unknown priority classes."""
+    with tempfile.TemporaryDirectory() as directory:
+        resources = TeamResources("test-key")
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", priority="bulk", resources=resources)
+        other = ConsultingTeam("test-key", "Other", Path(directory) / "Other", resources=resources)
+        assert team.scheduler is other.scheduler is not None
+        assert (team.priority, other.priority) == ("bulk", "interactive")
+        assert all(agent.priority_class == "bulk" for agent in team.agents.values())
+        assert ConsultingTeam("test-key", "Solo", Path(directory) / "Solo").scheduler is None
+        try:
+            ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", priority="urgent")
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert str(e) == "Unknown priority class: urgent"
+
+if __name__ == "__main__":
+    test_interactive_overtakes_queued_bulk_calls()
+    test_tenants_share_a_class_fairly_by_weight()
+    test_class_cap_keeps_slots_for_interactive_calls()
+    test_cancelled_waiter_leaves_the_queue()
+    test_idle_tenants_are_forgotten()
+    test_team_wiring()
+    print("🎉 All scheduler tests passed!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel section-wise generation
+Verifies section discovery in the agent prompts, cached request shape and stitching
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from prompt_manager import PromptManager
+from strategy_consulting_agent import ConsultingTeam, AgentRole
+from stub_backend import StubAnthropic
+from sectioned_generation import (split_prompt_sections, section_instruction, cached_request,
+                                  stitch_sections, StitchedResponse)
+
+def test_agent_prompts_split_into_sections():
+    """Every configured agent prompt exposes its numbered sections in order."""
+    prompt_manager = PromptManager()
+    for agent_name in prompt_manager.list_available_agents():
+        template = prompt_manager.get_agent_prompt(agent_name).user_prompt_template
+        sections = split_prompt_sections(template)
+        assert len(sections) >= 5, agent_name
+    sections = split_prompt_sections(prompt_manager.get_agent_prompt("market_researcher").user_prompt_template)
+    assert sections[1].title == "Total Addressable Market (TAM) Analysis"
+    assert split_prompt_sections("1. **Overview:**\n3. **Gap:**\n") == []
+
+def test_cached_request_shares_prefix():
+    """Section requests differ only in the trailing instruction block."""
+    request = {"model": "m", "max_tokens": 4000, "system": "sys", "messages": [{"role": "user", "content": "prompt"}]}
+    sections = split_prompt_sections("1. **Overview:**\n2. **Risks:**\n")
+    first, second = (cached_request(request, section_instruction(s, sections)) for s in sections)
+    assert first["system"] == second["system"]
+    assert first["messages"][0]["content"][0] == second["messages"][0]["content"][0]
+    assert first["messages"][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "Write ONLY section 2: **Risks**" in second["messages"][0]["content"][1]["text"]
+    assert request["messages"][0]["content"] == "prompt"
+
+def test_stitched_response_combines_usage():
+    """Stitched text keeps section order; a max_tokens stop in any part is reported."""
+    responses = [
+        SimpleNamespace(stop_reason="end_turn", usage=SimpleNamespace(input_tokens=100, output_tokens=10)),
+        SimpleNamespace(stop_reason="max_tokens", usage=SimpleNamespace(input_tokens=100, output_tokens=20))
+    ]
+    text = stitch_sections(["## 1. Overview\nA\n", "", "## 2. Risks\nB"])
+    combined = StitchedResponse.combine(text, responses)
+    assert combined.content[0].text == "## 1. Overview\nA\n\n## 2. Risks\nB\n"
+    assert combined.stop_reason == "max_tokens"
+    assert combined.usage.output_tokens == 30
+    assert combined.calls == 2
+
+def test_dependency_lists_do_not_break_sections():
+    """Numbered lists in upstream outputs do not hide the agent's own sections."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False, parallel_sections=True)
+        agent = team.agents[AgentRole.FINANCIAL_ANALYST]
+        agent.client = StubAnthropic(latency_seconds=0.0)
+        upstream = "## Market Research\n1. **Pricing power:** strong\n2. **Churn:** low\n"
+        prompt = PromptManager().format_user_prompt("financial_analyst", **agent.prompt_variables(
+            {"analysis_brief": "Test"}, ["market_research"], [upstream]))
+        stats = {}
+        asyncio.run(agent._create_message(stats=stats, model="claude-sonnet-4-5-20250929", max_tokens=4000,
+                                          system="sys", messages=[{"role": "user", "content": prompt}]))
+        assert stats["sections"] == len(agent.prompt_sections) == 5
+
+if __name__ == "__main__":
+    test_agent_prompts_split_into_sections()
+    test_cached_request_shares_prefix()
+    test_stitched_response_combines_usage()
+    test_dependency_lists_do_not_break_sections()
+    print("🎉 All section-wise generation tests passed!")
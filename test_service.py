@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP service
+Verifies submission, status, server-sent events, artifacts, backpressure, cancellation and queue recovery
+"""
+
+import json
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from service import ConsultingService, Job, JobStore, serve_in_thread
+from strategy_consulting_agent import TeamResources
+from stub_backend import StubAnthropic
+from load_generator import wait_for_completion
+
+def _service(directory: str, workers: int = 1, max_queue_depth: int = 5) -> ConsultingService:
+    resources = TeamResources("stub", client=StubAnthropic(latency_seconds=0.0))
+    return ConsultingService(resources, Path(directory), Path(directory) / "jobs.sqlite3",
+                             workers=workers, max_queue_depth=max_queue_depth)
+
+def _post(url: str, payload: object):
+    request = urllib.request.Request(f"{url}/engagements", data=json.dumps(payload).encode('utf-8'), method="POST")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.load(response)
+
+def _delete(url: str, job_id: str):
+    request = urllib.request.Request(f"{url}/engagements/{job_id}", method="DELETE")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.load(response)
+
+def _error(call) -> urllib.error.HTTPError:
+    try:
+        call()
+    except urllib.error.HTTPError as e:
+        return e
+    raise AssertionError("expected an HTTP error")
+
+def test_engagement_lifecycle_over_http():
+    """A submitted job streams progress, completes, and exposes only its own artifacts."""
+    with tempfile.TemporaryDirectory() as directory:
+        service = _service(directory)
+        thread = serve_in_thread(service)
+        url = f"http://127.0.0.1:{service.port}"
+        try:
+            status, job = _post(url, {"company": "Acme", "brief": "Test", "deliverables": ["market_research"]})
+            assert status == 202 and job["status"] == "queued"
+            final = wait_for_completion(url, job["job_id"], timeout=60)
+            assert final["status"] == "completed", final
+            assert final["progress_lines"] > 0
+
+            with urllib.request.urlopen(f"{url}/engagements/{job['job_id']}/artifacts", timeout=10) as response:
+                artifacts = json.load(response)["artifacts"]
+            assert any(name.startswith("agent_outputs/market_researcher/") for name in artifacts)
+            with urllib.request.urlopen(f"{url}/engagements/{job['job_id']}/artifacts/{artifacts[0]}",
+                                        timeout=10) as response:
+                assert response.read()
+
+            assert _error(lambda: urllib.request.urlopen(f"{url}/engagements/{job['job_id']}/artifacts/../../jobs.sqlite3",
+                                                         timeout=10)).code == 404
+            assert _error(lambda: urllib.request.urlopen(f"{url}/engagements/unknown", timeout=10)).code == 404
+            assert _error(lambda: _post(url, {"company": "Acme"})).code == 400
+        finally:
+            service.stop()
+            thread.join(timeout=10)
+
+def test_full_queue_returns_429():
+    """Submissions beyond max_queue_depth waiting jobs are refused with Retry-After."""
+    with tempfile.TemporaryDirectory() as directory:
+        service = _service(directory, workers=0, max_queue_depth=1)
+        thread = serve_in_thread(service)
+        url = f"http://127.0.0.1:{service.port}"
+        try:
+            assert _post(url, {"company": "Acme", "brief": "Test"})[0] == 202
+            error = _error(lambda: _post(url, {"company": "Acme", "brief": "Test"}))
+            assert error.code == 429
+            assert error.headers["Retry-After"] == "10"
+        finally:
+            service.stop()
+            thread.join(timeout=10)
+
+def test_delete_cancels_queued_job():
+    """DELETE cancels a job that has not started; a finished job cannot be cancelled again."""
+    with tempfile.TemporaryDirectory() as directory:
+        service = _service(directory, workers=0)
+        thread = serve_in_thread(service)
+        url = f"http://127.0.0.1:{service.port}"
+        try:
+            job_id = _post(url, {"company": "Acme", "brief": "Test"})[1]["job_id"]
+            status, job = _delete(url, job_id)
+            assert status == 200 and job["status"] == "cancelled" and job["finished_at"]
+            assert service.queue_depth == 0
+            assert _error(lambda: _delete(url, job_id)).code == 409
+            assert _error(lambda: _delete(url, "unknown")).code == 404
+        finally:
+            service.stop()
+            thread.join(timeout=10)
+
+def test_store_requeues_interrupted_jobs():
+    """Jobs left running by a stopped process are queued again, oldest first."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(Path(directory) / "jobs.sqlite3")
+        first, second = Job("a", {"company": "A"}, submitted_at=1.0), Job("b", {"company": "B"}, submitted_at=2.0)
+        store.add(first)
+        store.add(second)
+        second.status = "running"
+        store.update(second)
+        store.add_event("b", 1, "🚀 Starting")
+        assert store.recover() == ["a", "b"]
+        reloaded = store.load("b")
+        assert reloaded.status == "queued" and reloaded.events == ["🚀 Starting"]
+
+if __name__ == "__main__":
+    test_engagement_lifecycle_over_http()
+    test_full_queue_returns_429()
+    test_delete_cancels_queued_job()
+    test_store_requeues_interrupted_jobs()
+    print("🎉 All service tests passed!")
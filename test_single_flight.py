@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+Verifies shared calls, error propagation, cancellation and request keys
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from single_flight import SingleFlight, request_key
+from strategy_consulting_agent import ConsultingTeam
+from stub_backend import StubAnthropic
+
+REQUEST = {"model": "claude", "max_tokens": 4000, "system": "sys",
+           "messages": [{"role": "user", "content": "Analyze Acme"}]}
+
+def test_concurrent_identical_calls_share_one_call():
+    """Concurrent callers with one key get the same result from a single call."""
+    single_flight = SingleFlight()
+    calls = []
+
+    async def make_call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def run():
+        key = request_key(REQUEST)
+        results = await asyncio.gather(*[single_flight.do(key, make_call) for _ in range(3)])
+        later = await single_flight.do(key, make_call)
+        return results, later
+
+    results, later = asyncio.run(run())
+    assert results[0] is results[1] is results[2]
+    assert later is not results[0]
+    assert len(calls) == 2
+    assert single_flight.summary() == {"calls": 2, "coalesced": 2}
+
+def test_errors_reach_every_caller():
+    """A failed call raises its error to all coalesced callers."""
+    single_flight = SingleFlight()
+
+    async def make_call():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("reset")
+
+    async def run():
+        return await asyncio.gather(*[single_flight.do("k", make_call) for _ in range(2)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    """The shared call keeps running for the remaining callers when one is cancelled."""
+    single_flight = SingleFlight()
+
+    async def make_call():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(single_flight.do("k", make_call))
+        second = asyncio.ensure_future(single_flight.do("k", make_call))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+def test_request_key_ignores_transport_settings():
+    """Timeouts do not change the key; prompts and sampling parameters do."""
+    assert request_key(REQUEST) == request_key(dict(REQUEST, timeout=300))
+    assert request_key(REQUEST) != request_key(dict(REQUEST, max_tokens=2000))
+    assert request_key(REQUEST, scope="run-a") != request_key(REQUEST, scope="run-b")
+
+def test_engagements_do_not_share_calls():
+    """Identical requests of two engagements run separately, each under its own budget."""
+    with tempfile.TemporaryDirectory() as directory:
+        single_flight = SingleFlight()
+        teams = []
+        for name, budget_usd in (("a", 0.0005), ("b", None)):
+            team = ConsultingTeam("test-key", "Acme", Path(directory) / name / "Acme", hedging=False, budget_usd=budget_usd)
+            for agent in team.agents.values():
+                agent.client = StubAnthropic(latency_seconds=0.05)
+                agent.single_flight = single_flight
+            teams.append(team)
+        parameters = {"analysis_brief": "Test", "deliverables": ["financial_analysis"]}
+
+        async def run():
+            return await asyncio.gather(*(team.execute_consulting_engagement(dict(parameters)) for team in teams))
+
+        limited, unlimited = asyncio.run(run())
+        assert limited["agent_results"]["market_researcher"]["reason"] == "budget"
+        assert unlimited["agent_results"]["financial_analyst"].status == "completed"
+        assert unlimited["spend"]["spent_usd"] > 0
+        assert single_flight.coalesced == 0
+
+if __name__ == "__main__":
+    test_concurrent_identical_calls_share_one_call()
+    test_errors_reach_every_caller()
+    test_cancelled_caller_does_not_cancel_shared_call()
+    test_request_key_ignores_transport_settings()
+    test_engagements_do_not_share_calls()
+    print("🎉 All single-flight tests passed!")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for spend budgets
+Verifies call pricing, reservations, the degrade ladder, refused calls and team spend reports
+"""
+
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from daemon import progress_to
+from latency import HedgedCaller, HedgePolicy, LatencyHistogram
+from spend import BudgetExceeded, DegradePolicy, PriceTable, SpendLedger
+from strategy_consulting_agent import ConsultingTeam, AgentRole
+from stub_backend import StubAnthropic
+
+SONNET, HAIKU = "claude-sonnet-4-20250514", "claude-3-5-haiku-20241022"
+PRICES = PriceTable({SONNET: {"input_per_mtok": 3.0, "output_per_mtok": 15.0},
+                     HAIKU: {"input_per_mtok": 0.8, "output_per_mtok": 4.0}})
+
+def _request(max_tokens: int = 1000, model: str = SONNET):
+    return {"model": model, "max_tokens": max_tokens, "system": "s" * 400,
+            "messages": [{"role": "user", "content": "u" * 3600}]}
+
+def test_price_table_costs():
+    """Costs use the model's rates, cache rates derived from the input price, and defaults for unknown models."""
+    assert abs(PRICES.cost(SONNET, input_tokens=1_000_000, output_tokens=100_000) - 4.5) < 1e-9
+    assert abs(PRICES.cost(SONNET, cache_creation_input_tokens=1_000_000, cache_read_input_tokens=1_000_000)
+               - (3.75 + 0.3)) < 1e-9
+    assert PRICES.rates("unknown-model")["output_per_mtok"] == 15.0
+    # 1000 prompt tokens (4000 chars) plus the full max_tokens
+    assert abs(PRICES.projected_cost(SONNET, _request(1000)) - (1000 * 3.0 + 1000 * 15.0) / 1_000_000) < 1e-9
+
+def test_reservations_are_replaced_by_actual_cost():
+    """Admitted calls hold their worst case until settled with their usage; spend is broken down by role."""
+    ledger = SpendLedger(1.0, PRICES)
+
+    async def run():
+        reserved = await ledger.admit("market_researcher", _request())
+        assert ledger.reserved == reserved and ledger.remaining() == 1.0 - reserved
+        ledger.settle(reserved, "market_researcher.section", SONNET,
+                      SimpleNamespace(input_tokens=1000, output_tokens=200))
+
+    asyncio.run(run())
+    summary = ledger.summary()
+    assert ledger.reserved == 0 and summary["calls"] == 1
+    assert summary["by_role"] == {"market_researcher": 0.006} and summary["by_model"] == {SONNET: 0.006}
+    assert summary["remaining_usd"] == 0.994
+
+def test_admission_switches_model_then_refuses():
+    """A call that does not fit moves to the cheaper model if that fits; otherwise it is refused."""
+    policy = DegradePolicy(cheaper_model=HAIKU)
+    ledger = SpendLedger(0.01, PRICES, policy)
+    request = _request()
+    asyncio.run(ledger.admit("financial_analyst", request))
+    assert request["model"] == HAIKU
+    assert ledger.degradations[0]["step"] == "cheaper_model"
+
+    ledger = SpendLedger(0.001, PRICES, policy)
+    try:
+        asyncio.run(ledger.admit("financial_analyst", _request()))
+        assert False, "expected BudgetExceeded"
+    except BudgetExceeded as e:
+        assert e.label == "financial_analyst" and e.remaining_usd == 0.001
+    assert ledger.refused == 1 and ledger.reserved == 0
+
+def test_call_waits_for_calls_in_flight():
+    """A call that fits only once the calls in flight settle waits for them instead of being refused."""
+    ledger = SpendLedger(0.03, PRICES)
+    order = []
+
+    async def call(name: str):
+        reserved = await ledger.admit(name, _request())
+        order.append(name)
+        await asyncio.sleep(0.01)
+        ledger.settle(reserved, name, SONNET, SimpleNamespace(input_tokens=1000, output_tokens=100))
+
+    async def run():
+        await asyncio.gather(call("first"), call("second"))
+
+    asyncio.run(run())
+    assert order == ["first", "second"] and ledger.refused == 0 and len(ledger.entries) == 2
+
+def test_degrade_ladder_thresholds():
+    """Cheaper model, summarized context and optional-agent skips start at their budget fractions."""
+    policy = DegradePolicy(cheaper_model=HAIKU, cheaper_model_below=0.5, summarize_context_below=0.35,
+                           skip_optional_below=0.2, optional_agents=["strategy_storyteller"])
+    ledger = SpendLedger(1.0, PRICES, policy)
+    events = []
+    with progress_to(events.append):  # As inside a daemon or service engagement
+        ledger.record("business_model_analyst", SONNET, {"output_tokens": 40_000})  # $0.60
+        assert ledger.model_for("market_researcher", SONNET) == HAIKU
+        assert not ledger.summarize_context("market_researcher")
+        ledger.record("market_researcher", SONNET, {"output_tokens": 20_000})  # $0.30
+        assert ledger.summarize_context("financial_analyst")
+        assert ledger.skip_optional("strategy_storyteller") and not ledger.skip_optional("risk_assessor")
+    assert len(events) == 3 and all(event["message"].startswith("💸 Budget") for event in events)
+    assert [entry["step"] for entry in ledger.degradations] == ["cheaper_model", "summarized_context", "skipped_agent"]
+    assert SpendLedger(None, PRICES, policy).model_for("market_researcher", SONNET) == SONNET
+
+def test_team_spend_report_and_budget():
+    """An engagement records its spend in run metadata; a tight budget degrades it and refuses what cannot fit."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False, budget_usd=0.02)
+        for agent in team.agents.values():
+            agent.client = StubAnthropic(latency_seconds=0.0)
+        result = asyncio.run(team.execute_consulting_engagement(
+            {"analysis_brief": "Test", "deliverables": ["financial_analysis", "strategy_narrative"]}))
+        spend = result["spend"]
+        assert spend["budget_usd"] == 0.02 and 0 < spend["spent_usd"] <= 0.02
+        assert set(spend["by_model"]) == {HAIKU}
+        assert result["agent_results"]["financial_analyst"].status == "completed"
+        assert result["agent_results"]["strategy_storyteller"]["reason"] == "budget"
+        assert result["status"] == "partial" and spend["refused_calls"] == 1
+        metadata = json.loads((Path(directory) / "Acme" / "run_metadata.json").read_text())
+        assert metadata["spend"]["spent_usd"] == spend["spent_usd"]
+
+def test_hedged_duplicate_is_reserved_and_charged():
+    """A hedge needs budget for its whole max_tokens and is charged for it, as the loser runs to the end."""
+    with tempfile.TemporaryDirectory() as directory:
+        def hedged_agent(budget_usd):
+            team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=True, budget_usd=budget_usd)
+            agent = team.agents[AgentRole.MARKET_RESEARCHER]
+            agent.client = StubAnthropic(latency_seconds=0.2, jitter=0.0)
+            agent.stream_validators = []  # The synthetic prompt names no company
+            histogram = LatencyHistogram(Path(directory) / "latency_history.json")
+            for _ in range(20):
+                histogram.record("market_researcher", 0.01)
+            agent.caller = HedgedCaller(histogram, HedgePolicy(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+            return agent
+
+        projected = PriceTable().projected_cost(SONNET, _request())
+        for budget_usd, hedged in ((None, True), (projected * 1.5, False)):
+            agent = hedged_agent(budget_usd)
+            stats = {}
+            asyncio.run(agent._create_message(stats=stats, **_request()))
+            labels = [entry["label"] for entry in agent.spend.entries]
+            assert bool(stats.get("hedged")) == hedged and agent.spend.reserved == 0
+            if hedged:
+                assert labels == ["market_researcher", "market_researcher.hedge"]
+                assert agent.spend.entries[1]["output_tokens"] == 1000
+            else:
+                assert labels == ["market_researcher"]
+
+if __name__ == "__main__":
+    test_price_table_costs()
+    test_reservations_are_replaced_by_actual_cost()
+    test_admission_switches_model_then_refuses()
+    test_call_waits_for_calls_in_flight()
+    test_degrade_ladder_thresholds()
+    test_team_spend_report_and_budget()
+    test_hedged_duplicate_is_reserved_and_charged()
+    print("🎉 All spend tests passed!")
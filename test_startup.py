@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for fast CLI startup
+Verifies deferred SDK/YAML imports and the hash-keyed precompiled prompt config
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+
+import prompt_manager
+from prompt_manager import PromptManager, compiled_config_path
+
+CONFIG = Path(__file__).resolve().parent / "agent_prompts.yaml"
+
+def _config_copy(directory: str) -> Path:
+    config_file = Path(directory) / "agent_prompts.yaml"
+    shutil.copy(CONFIG, config_file)
+    return config_file
+
+def test_import_defers_sdk_and_yaml():
+    """Importing the engine and loading a compiled config imports neither anthropic nor yaml, nor the
+    debug-mode and dashboard modules."""
+    PromptManager(str(CONFIG))
+    deferred = {'anthropic', 'yaml', 'loop_health', 'tracemalloc', 'progress_dashboard'}
+    code = ("import sys, strategy_consulting_agent; from prompt_manager import PromptManager; "
+            f"PromptManager({str(CONFIG)!r}); print(sorted({deferred!r} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=Path(__file__).resolve().parent)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+def test_compiled_config_round_trips():
+    """The first load compiles the YAML; later loads read the same config from the compiled copy."""
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = _config_copy(directory)
+        parsed = PromptManager(str(config_file)).config
+        compiled = json.loads(compiled_config_path(config_file).read_text(encoding='utf-8'))
+        assert compiled['config'] == parsed
+
+        prompt_manager._compiled_configs.clear()
+        compiled['config']['global']['model'] = "from-compiled-copy"
+        compiled_config_path(config_file).write_text(json.dumps(compiled), encoding='utf-8')
+        assert PromptManager(str(config_file)).get_model_name() == "from-compiled-copy"
+
+def test_yaml_edit_invalidates_compiled_config():
+    """Changing the YAML changes its hash, so the stale compiled copy is ignored and rebuilt."""
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = _config_copy(directory)
+        PromptManager(str(config_file))
+        config_file.write_text(config_file.read_text(encoding='utf-8').replace(
+            '\nglobal:\n', '\nglobal:\n  benchmark_marker: true\n', 1), encoding='utf-8')
+        assert PromptManager(str(config_file)).get_global_config()['benchmark_marker'] is True
+        compiled = json.loads(compiled_config_path(config_file).read_text(encoding='utf-8'))
+        assert compiled['config']['global']['benchmark_marker'] is True
+
+def test_invalid_config_is_not_compiled():
+    """Validation errors surface on load and nothing is cached for the broken YAML."""
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = Path(directory) / "agent_prompts.yaml"
+        config_file.write_text("global: {}\nagents: {}\n", encoding='utf-8')
+        try:
+            PromptManager(str(config_file))
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert "Missing required section" in str(e)
+        assert not compiled_config_path(config_file).exists()
+
+def test_missing_config_reports_error():
+    """A run without its prompt config prints the usual error message, not a traceback."""
+    with tempfile.TemporaryDirectory() as directory:
+        script = Path(__file__).resolve().parent / "strategy_consulting_agent.py"
+        result = subprocess.run([sys.executable, str(script), "--company", "Acme", "--brief", "x", "--dry-run",
+                                 "--output-dir", directory], capture_output=True, text=True, cwd=directory)
+    assert result.returncode == 1
+    assert "❌ Error: Configuration file not found" in result.stdout and "Traceback" not in result.stderr
+
+if __name__ == "__main__":
+    test_import_defers_sdk_and_yaml()
+    test_compiled_config_round_trips()
+    test_yaml_edit_invalidates_compiled_config()
+    test_invalid_config_is_not_compiled()
+    test_missing_config_reports_error()
+    print("🎉 All startup tests passed!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for early-abort stream validators
+Verifies each built-in rule, the monitor's early abort and retry classification
+"""
+
+from stream_validation import (StreamMonitor, StreamValidationError, StreamRule, build_rules,
+                               register_stream_rule)
+from retry import classify_error
+
+CONTEXT = {"company_name": "Tesla Inc", "role": "market_researcher"}
+
+def _stream(rules, text, chunk_size=8, max_tokens=4000):
+    """Feed text in chunks; return the error and how much text had been fed when it was raised."""
+    monitor = StreamMonitor(build_rules(rules), CONTEXT, max_tokens)
+    for i in range(0, len(text), chunk_size):
+        try:
+            monitor.feed(text[i:i + chunk_size])
+        except StreamValidationError as e:
+            return e, monitor.chars
+    try:
+        monitor.finish()
+    except StreamValidationError as e:
+        return e, monitor.chars
+    return None, monitor.chars
+
+def test_good_opening_passes():
+    """A headed analysis of the right company passes every default rule."""
+    text = "# Tesla Market Research\n\n## 1. Market Definition\nTesla competes in..." + " analysis" * 500
+    rules = [{"type": "refusal"}, {"type": "mentions_company"}, {"type": "first_heading", "pattern": "market"}]
+    error, _ = _stream(rules, text)
+    assert error is None
+
+def test_refusal_aborts_early():
+    """A refusal aborts within the first chunks and records the tokens saved."""
+    error, fed = _stream([{"type": "refusal"}], "I'm sorry, but I can't help with that. " * 200)
+    assert error is not None and error.rule == "refusal"
+    assert fed < 40
+    assert error.saved_tokens > 3900
+    assert classify_error(error) == "validation"
+
+def test_wrong_company_and_format_fail_at_window():
+    """Missing company names and headings fail once their window has streamed."""
+    text = "Ford Motor Company is a leading automaker. " * 100
+    error, fed = _stream([{"type": "mentions_company", "window_tokens": 50}], text)
+    assert error.rule == "mentions_company" and 200 <= fed < 220
+    error, _ = _stream([{"type": "first_heading", "window_tokens": 50}], text)
+    assert error.rule == "first_heading"
+    error, _ = _stream([{"type": "first_heading", "pattern": "risk"}], "# Tesla Market Research\nBody\n")
+    assert "does not match" in error.reason
+
+def test_company_names_match_whole_names_only():
+    """Articles and legal suffixes are optional; a stray word of the name does not count as a mention."""
+    context = {"company_name": "The Home Depot, Inc."}
+    for text, passes in [("# The Home Depot Strategy\n", True), ("# Home Depot at a glance\n", True),
+                         ("# The retail market\nThe home improvement segment grows.\n", False),
+                         ("# Depots and logistics\n", False)]:
+        monitor = StreamMonitor(build_rules([{"type": "mentions_company", "window_tokens": 50}]), context)
+        monitor.feed(text)
+        try:
+            monitor.finish()
+            assert passes, text
+        except StreamValidationError:
+            assert not passes, text
+
+def test_monitor_keeps_only_the_window():
+    """Text past the largest window, or after every rule is decided, is counted but not kept."""
+    monitor = StreamMonitor(build_rules([{"type": "refusal", "window_tokens": 10},
+                                         {"type": "first_heading", "window_tokens": 25}]), CONTEXT, 4000)
+    for _ in range(1000):
+        monitor.feed("# Tesla\nanalysis ")
+    monitor.finish()
+    assert not monitor.pending and len(monitor.text) <= 100 and monitor.chars == 17000
+
+def test_custom_rules_and_unknown_types():
+    """Custom rules can be registered; unknown types are rejected."""
+    class NoTablesRule(StreamRule):
+        name = "no_tables"
+
+        def check(self, text, context, final):
+            return ("|---" in text, "table in opening") if "|---" in text else (self.window_reached(text, final), None)
+
+    register_stream_rule(NoTablesRule)
+    error, _ = _stream([{"type": "no_tables"}], "# Tesla\n| a | b |\n|---|---|\n")
+    assert error.rule == "no_tables"
+    try:
+        build_rules([{"type": "sentiment"}])
+        assert False, "unknown rule type accepted"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_good_opening_passes()
+    test_refusal_aborts_early()
+    test_wrong_company_and_format_fail_at_window()
+    test_company_names_match_whole_names_only()
+    test_monitor_keeps_only_the_window()
+    test_custom_rules_and_unknown_types()
+    print("🎉 All stream validation tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for structured logging
+Verifies correlation fields across tasks, the JSON Lines sink, progress routing and the bounded queue
+"""
+
+import io
+import json
+import time
+import queue
+import asyncio
+import logging
+import tempfile
+import contextlib
+from pathlib import Path
+
+import metrics
+from daemon import progress_to
+from structured_logging import (log_event, console, log_context, bind_log_context, configure_logging,
+                                shutdown_logging, BoundedQueueHandler)
+
+def test_records_carry_correlation_fields():
+    """Tasks inherit run id, company and role; console-only lines stay out of the JSON file."""
+    async def agent(role: str):
+        with log_context(role=role):
+            await asyncio.sleep(0)
+            log_event("agent.completed", f"✅ {role} completed", duration_seconds=0.5)
+
+    async def engagement():
+        with log_context(company="Acme"):
+            log_event("engagement.started", "🚀 Starting")
+            bind_log_context(run_id="run-1")
+            console("=" * 10)
+            await asyncio.gather(agent("market_researcher"), agent("risk_assessor"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            path = configure_logging({"file": "log.jsonl", "console": True}, Path(directory))
+            try:
+                asyncio.run(engagement())
+            finally:
+                shutdown_logging()
+        records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [record["event"] for record in records] == ["engagement.started", "agent.completed", "agent.completed"]
+    assert "run_id" not in records[0] and records[0]["company"] == "Acme"
+    assert {record["role"] for record in records[1:]} == {"market_researcher", "risk_assessor"}
+    assert all(record["run_id"] == "run-1" and record["duration_seconds"] == 0.5 for record in records[1:])
+    assert stdout.getvalue().splitlines()[:2] == ["🚀 Starting", "=" * 10]
+
+def test_progress_sinks_and_unconfigured_output():
+    """An engagement's client receives its lines; without configure_logging messages are printed."""
+    events = []
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        with progress_to(events.append):
+            log_event("agent.completed", "✅ done")
+        log_event("engagement.started", "🚀 Starting")
+    assert [event["message"] for event in events] == ["✅ done"]
+    assert stdout.getvalue() == "🚀 Starting\n"
+
+def test_full_queue_drops_instead_of_blocking():
+    """Records beyond the queue's bound are dropped and counted; logging stays cheap for the caller."""
+    logger = logging.getLogger("consulting.test_bounded")
+    logger.propagate = False
+    logger.handlers = [BoundedQueueHandler(queue.Queue(2))]
+    dropped = metrics.LOG_DROPPED.value()
+    for index in range(5):
+        logger.info("record %d", index, extra={"event": "test", "fields": {}, "context": {}, "to_console": False})
+    assert metrics.LOG_DROPPED.value() - dropped == 3
+    logger.handlers = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_logging({"file": "log.jsonl", "console": False, "queue_size": 100000}, Path(directory))
+        try:
+            count = 20000
+            start = time.perf_counter()
+            with log_context(company="Acme", run_id="run-1"):
+                for index in range(count):
+                    log_event("agent.completed", "✅ done", role="market_researcher", index=index)
+            per_record = (time.perf_counter() - start) / count
+        finally:
+            shutdown_logging()
+        assert len((Path(directory) / "log.jsonl").read_text(encoding='utf-8').splitlines()) == count
+    assert per_record < 100e-6, f"log_event took {per_record * 1e6:.1f}µs per record"
+
+if __name__ == "__main__":
+    test_records_carry_correlation_fields()
+    test_progress_sinks_and_unconfigured_output()
+    test_full_queue_drops_instead_of_blocking()
+    print("🎉 All structured logging tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for structured agent outputs
+Verifies extraction, schema validation and the compact downstream rendering
+"""
+
+import json
+
+from structured_output import extract_structured_output, validate_payload, render_compact
+
+PAYLOAD = {
+    "key_findings": ["Services margin offsets hardware cyclicality"],
+    "metrics": [{"name": "Services revenue", "value": 85, "unit": "USD bn"}],
+    "risks": [
+        {"risk": "Regulatory pressure on app store fees", "likelihood": 4, "impact": 4},
+        {"risk": "Supply chain concentration", "likelihood": 2, "impact": 5}
+    ],
+    "recommendations": [{"recommendation": "Expand services bundles", "priority": "high"}],
+    "ratings": {}
+}
+
+def test_extract_splits_markdown_and_payload():
+    """The trailing JSON block is removed from the markdown and returned as a payload."""
+    text = "# Analysis\n\n```json\n{\"example\": true}\n```\n\nProse.\n\n```json\n" + json.dumps(PAYLOAD) + "\n```\n"
+    body, payload, errors = extract_structured_output(text)
+    assert errors == []
+    assert body.endswith("Prose.\n")
+    assert '{"example": true}' in body
+    assert payload["key_findings"] == PAYLOAD["key_findings"]
+    assert payload["schema_version"] == 1
+
+def test_invalid_payload_is_rejected():
+    """Out-of-range scores and unknown priorities fail validation."""
+    bad = dict(PAYLOAD, risks=[{"risk": "x", "likelihood": 9, "impact": 1}],
+               recommendations=[{"recommendation": "y", "priority": "urgent"}])
+    errors = validate_payload(bad)
+    assert len(errors) == 2
+    body, payload, errors = extract_structured_output("# Analysis\n```json\n" + json.dumps(bad) + "\n```")
+    assert payload is None and errors
+    assert body == "# Analysis\n"
+
+def test_null_and_wrong_type_fields():
+    """Null lists count as empty; other non-list values are validation errors, not exceptions."""
+    nulls = dict(PAYLOAD, metrics=None, risks=None, recommendations=None, ratings=None)
+    assert validate_payload(nulls) == []
+    body, payload, errors = extract_structured_output("# Analysis\n```json\n" + json.dumps(nulls) + "\n```")
+    assert errors == [] and payload["metrics"] == [] and payload["ratings"] == {}
+
+    wrong = dict(PAYLOAD, metrics="85 USD bn", risks={"risk": "x"}, recommendations=3)
+    assert validate_payload(wrong) == ["metrics must be a list", "risks must be a list", "recommendations must be a list"]
+    body, payload, errors = extract_structured_output("# Analysis\n```json\n" + json.dumps(wrong) + "\n```")
+    assert payload is None and len(errors) == 3 and body == "# Analysis\n"
+
+def test_missing_block_keeps_prose():
+    """Responses without a JSON block are kept whole and reported."""
+    body, payload, errors = extract_structured_output("# Analysis only\n")
+    assert body == "# Analysis only\n"
+    assert payload is None
+    assert errors == ["no structured JSON block found"]
+
+def test_render_compact_orders_risks_by_score():
+    """The compact digest is short and lists the highest scoring risk first."""
+    digest = render_compact("risk_assessor", PAYLOAD)
+    assert digest.startswith("### Risk Assessor (structured findings)")
+    assert digest.index("Regulatory pressure") < digest.index("Supply chain")
+    assert "- [high] Expand services bundles" in digest
+
+if __name__ == "__main__":
+    test_extract_splits_markdown_and_payload()
+    test_invalid_payload_is_rejected()
+    test_null_and_wrong_type_fields()
+    test_missing_block_keeps_prose()
+    test_render_compact_orders_risks_by_score()
+    print("🎉 All structured output tests passed!")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive output token limits
+Verifies history collection from saved outputs, prediction bounds and the report
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from token_budget import (TokenBudgetPolicy, OutputLengthHistory, AdaptiveTokenLimits, format_report,
+                          estimate_tokens)
+
+def _write_output(project: Path, role: str, stem: str, text: str, output_tokens=None):
+    output_dir = project / "agent_outputs" / role
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / f"{stem}.md").write_text(text, encoding='utf-8')
+    metadata = {"agent_role": role, "call_metadata": {"output_tokens": output_tokens} if output_tokens else {}}
+    (output_dir / f"{stem}_metadata.json").write_text(json.dumps(metadata), encoding='utf-8')
+
+def test_history_uses_usage_then_estimates():
+    """Recorded output tokens win; legacy outputs are estimated and empty ones skipped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "Acme"
+        _write_output(project, "risk_assessor", "risk_assessor_1", "x" * 400, output_tokens=2500)
+        _write_output(project, "risk_assessor", "risk_assessor_2", "x" * 400)
+        _write_output(project, "risk_assessor", "risk_assessor_3", "")
+        history = OutputLengthHistory.from_artifacts([Path(tmp), Path(tmp), Path(tmp) / "missing"])
+        assert sorted(history.samples["risk_assessor"]) == [estimate_tokens("x" * 400), 2500]
+
+def test_prediction_bounds():
+    """Percentile plus headroom, clamped; too little history keeps the configured limit."""
+    history = OutputLengthHistory({"market_researcher": [2000] * 9 + [3000], "senior_partner": [100, 200]})
+    policy = TokenBudgetPolicy(enabled=True, percentile=90, headroom=0.1, min_samples=5, min_tokens=1000, max_tokens=8000)
+    limits = AdaptiveTokenLimits(history, policy)
+    assert limits.predict("market_researcher", 4000) == 2200
+    assert limits.predict("senior_partner", 5000) == 5000
+    history.samples["senior_partner"] = [100] * 10
+    assert limits.predict("senior_partner", 5000) == 1000
+    policy.enabled = False
+    assert limits.predict("market_researcher", 4000) == 4000
+
+def test_report_counts_reclaimed_tokens():
+    """The report compares predicted with actual lengths and sums the reclaimed reservation."""
+    history = OutputLengthHistory({"market_researcher": [2000] * 10})
+    limits = AdaptiveTokenLimits(history, TokenBudgetPolicy(enabled=True, headroom=0.0, min_tokens=0))
+    report = limits.report({"market_researcher": 4000, "risk_assessor": 4000}, {"market_researcher": 2100})
+    assert report["agents"]["market_researcher"]["predicted"] == 2000
+    assert report["agents"]["market_researcher"]["actual"] == 2100
+    assert report["reclaimed_tokens"] == 2000
+    assert "| market_researcher | 4000 | 2000 | 2100 | 10 | 0% | 2000 |" in format_report(report)
+
+if __name__ == "__main__":
+    test_history_uses_usage_then_estimates()
+    test_prediction_bounds()
+    test_report_counts_reclaimed_tokens()
+    print("🎉 All token budget tests passed!")
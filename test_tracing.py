@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for engagement tracing
+Verifies span nesting across tasks, OTLP encoding, the exported engagement trace and the waterfall viewer
+"""
+
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+
+from daemon import progress_to
+from tracing import Tracer, maybe_span, load_spans, otlp_value
+from trace_viewer import render_waterfall, render_totals
+from strategy_consulting_agent import ConsultingTeam
+from stub_backend import StubAnthropic
+
+def test_spans_nest_across_tasks():
+    """Tasks inherit the span they were created under; an exception marks its span as an error."""
+    tracer = Tracer("test")
+
+    async def child(name: str):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    async def run():
+        with tracer.span("root") as root:
+            await asyncio.gather(child("a"), child("b"))
+            try:
+                with tracer.span("failing"):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+        return root
+
+    root = asyncio.run(run())
+    spans = {span.name: span for span in tracer.spans}
+    assert root.parent_id is None
+    assert spans["a"].parent_id == spans["b"].parent_id == spans["failing"].parent_id == root.span_id
+    assert spans["failing"].status == 2 and spans["failing"].attributes["exception.type"] == "ValueError"
+    assert {span.trace_id for span in tracer.spans} == {tracer.trace_id}
+
+    with maybe_span(None, "untraced") as span:
+        span.set("bytes", 1)
+    assert len(tracer.spans) == 4
+
+def test_otlp_encoding():
+    """Attributes use OTLP/JSON value types and spans carry 32/16-hex-digit ids."""
+    assert otlp_value(True) == {"boolValue": True} and otlp_value(3) == {"intValue": "3"}
+    assert otlp_value(0.5) == {"doubleValue": 0.5}
+    assert otlp_value(["a"]) == {"arrayValue": {"values": [{"stringValue": "a"}]}}
+    tracer = Tracer("svc", {"consulting.company": "Acme"})
+    with tracer.span("root", {"bytes": 12}):
+        pass
+    payload = tracer.to_otlp()["resourceSpans"][0]
+    assert {"key": "service.name", "value": {"stringValue": "svc"}} in payload["resource"]["attributes"]
+    span = payload["scopeSpans"][0]["spans"][0]
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16 and "parentSpanId" not in span
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+def test_engagement_trace_is_exported():
+    """An engagement writes its span tree: engagement, phases, agents, calls with tokens, saves with bytes."""
+    with tempfile.TemporaryDirectory() as directory:
+        team = ConsultingTeam("test-key", "Acme", Path(directory) / "Acme", hedging=False)
+        for agent in team.agents.values():
+            agent.client = StubAnthropic(latency_seconds=0.0)
+        result = asyncio.run(team.execute_consulting_engagement(
+            {"analysis_brief": "Test", "deliverables": ["financial_analysis"]}))
+        trace_file = Path(result["trace"]["file"])
+        spans = load_spans(trace_file)
+        by_id = {span["span_id"]: span for span in spans}
+        parent = lambda span: by_id[span["parent_id"]]["name"]
+
+        root = next(span for span in spans if span["name"] == "engagement")
+        assert root["parent_id"] is None and root["attributes"]["consulting.status"] == "completed"
+        assert [parent(span) for span in spans if span["name"].startswith("phase ")] == ["engagement"] * 2
+        call = next(span for span in spans if span["name"] == "llm.call financial_analyst")
+        assert parent(call) == "agent financial_analyst" and parent(by_id[call["parent_id"]]) == "phase 2"
+        assert call["attributes"]["gen_ai.usage.output_tokens"] > 0 and call["attributes"]["llm.attempts"] == 1
+        save = next(span for span in spans if span["name"] == "output.save" and parent(span) == "agent financial_analyst")
+        assert save["attributes"]["bytes"] > 0
+        # Per agent: its span, dependency load, call and save; plus the engagement, two phases and the report
+        assert len(by_id) == len(spans) == len([s for s in spans if s["name"].startswith("agent ")]) * 4 + 4
+        metadata = json.loads((Path(directory) / "Acme" / "run_metadata.json").read_text())
+        assert metadata["trace"]["trace_id"] == json.loads(trace_file.read_text())[
+            "resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
+
+        waterfall = render_waterfall(spans, width=20)
+        assert waterfall.splitlines()[1].startswith("engagement") and "    llm.call financial_analyst" in waterfall
+        assert render_totals(spans).splitlines()[1].split()[0] in ("agent", "llm.call", "engagement", "phase")
+        assert render_waterfall(spans, min_ms=1e9).endswith("none above 1e+09ms")
+
+def test_unreachable_collector_only_warns():
+    """The trace file is written and a collector that refuses the post is logged as a warning."""
+    tracer = Tracer("test")
+    with tracer.span("root"):
+        pass
+    events = []
+    with tempfile.TemporaryDirectory() as directory, progress_to(events.append):
+        path = Path(directory) / "trace.json"
+        asyncio.run(tracer.export_async(path, "http://127.0.0.1:9/v1/traces", timeout=1.0))
+        assert len(load_spans(path)) == 1
+    assert any("Could not send trace" in event["message"] for event in events)
+
+if __name__ == "__main__":
+    test_spans_nest_across_tasks()
+    test_otlp_encoding()
+    test_engagement_trace_is_exported()
+    test_unreachable_collector_only_warns()
+    print("🎉 All tracing tests passed!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Adaptive Output Token Limits for Consulting Agents
+Learns per-role output-length distributions from saved agent outputs and sets
+max_tokens to a percentile plus headroom, with a predicted-vs-actual report
+"""
+
+import json
+import math
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable
+from dataclasses import dataclass
+
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text_or_chars: Any, chars_per_token: float = CHARS_PER_TOKEN) -> int:
+    """Rough token count for text (or a character count) when no API usage was recorded."""
+    chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+    return int(math.ceil(chars / chars_per_token))
+
+def nearest_rank(samples: List[int], pct: float) -> Optional[int]:
+    """Nearest-rank percentile of a list of samples, or None without samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+@dataclass
+class TokenBudgetPolicy:
+    """Configuration for adaptive output token limits."""
+    enabled: bool = False
+    percentile: float = 95.0
+    headroom: float = 0.15
+    min_samples: int = 5
+    min_tokens: int = 1000
+    max_tokens: int = 8000
+    chars_per_token: float = CHARS_PER_TOKEN
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TokenBudgetPolicy":
+        """Build a policy from the `adaptive_token_limits` section of the prompt config."""
+        return cls(
+            enabled=bool(config.get('enabled', False)),
+            percentile=float(config.get('percentile', 95)),
+            headroom=float(config.get('headroom', 0.15)),
+            min_samples=int(config.get('min_samples', 5)),
+            min_tokens=int(config.get('min_tokens', 1000)),
+            max_tokens=int(config.get('max_tokens', 8000)),
+            chars_per_token=float(config.get('chars_per_token', CHARS_PER_TOKEN))
+        )
+
+class OutputLengthHistory:
+    """Output lengths in tokens per agent role, collected from saved agent outputs."""
+
+    def __init__(self, samples: Optional[Dict[str, List[int]]] = None):
+        self.samples: Dict[str, List[int]] = samples or {}
+
+    @classmethod
+    def from_artifacts(cls, roots: Iterable[Path], chars_per_token: float = CHARS_PER_TOKEN) -> "OutputLengthHistory":
+        """Scan `<project>/agent_outputs/<role>/*_metadata.json` under each root.
+
+        Uses the recorded `output_tokens` where the API usage was saved, else estimates from the
+        markdown output. Empty outputs (failed runs) are skipped.
+        """
+        history = cls()
+        seen = set()
+        for root in roots:
+            root = Path(root)
+            if not root.exists():
+                continue
+            for metadata_file in root.glob("*/agent_outputs/*/*_metadata.json"):
+                if metadata_file.resolve() in seen:
+                    continue
+                seen.add(metadata_file.resolve())
+                tokens = cls._output_tokens(metadata_file, chars_per_token)
+                if tokens:
+                    history.add(metadata_file.parent.name, tokens)
+        return history
+
+    @staticmethod
+    def _output_tokens(metadata_file: Path, chars_per_token: float) -> Optional[int]:
+        """Output tokens recorded in a metadata file, or estimated from its markdown file."""
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (IOError, ValueError):
+            return None
+        tokens = (metadata.get('call_metadata') or {}).get('output_tokens')
+        if tokens:
+            return int(tokens)
+        markdown_file = metadata_file.with_name(metadata_file.name[:-len("_metadata.json")] + ".md")
+        if not markdown_file.exists():
+            return None
+        return estimate_tokens(markdown_file.stat().st_size, chars_per_token)
+
+    def add(self, role: str, tokens: int):
+        """Record one observed output length for a role."""
+        self.samples.setdefault(role, []).append(int(tokens))
+
+    def count(self, role: str) -> int:
+        """Number of samples held for a role."""
+        return len(self.samples.get(role, []))
+
+    def percentile(self, role: str, pct: float) -> Optional[int]:
+        """Nearest-rank percentile of a role's output lengths."""
+        return nearest_rank(self.samples.get(role, []), pct)
+
+class AdaptiveTokenLimits:
+    """Predicts each role's max_tokens from its output-length history."""
+
+    def __init__(self, history: OutputLengthHistory, policy: TokenBudgetPolicy):
+        self.history = history
+        self.policy = policy
+
+    def predict(self, role: str, configured: int) -> int:
+        """Percentile plus headroom, clamped to the policy bounds; the configured limit without enough history."""
+        if not self.policy.enabled or self.history.count(role) < self.policy.min_samples:
+            return configured
+        predicted = int(math.ceil(self.history.percentile(role, self.policy.percentile) * (1 + self.policy.headroom)))
+        return min(max(predicted, self.policy.min_tokens), self.policy.max_tokens)
+
+    def report(self, configured: Dict[str, int], actual: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Predicted-vs-actual output lengths and the max_tokens reservation reclaimed per call.
+
+        Args:
+            configured: Static token limit per role
+            actual: Output tokens per role from a run; without it the history's p50 is shown
+
+        Returns:
+            Dictionary with per-role rows and the total tokens reclaimed
+        """
+        rows = {}
+        for role, limit in configured.items():
+            predicted = self.predict(role, limit)
+            samples = self.history.samples.get(role, [])
+            observed = actual.get(role) if actual is not None else self.history.percentile(role, 50)
+            rows[role] = {
+                'configured': limit,
+                'predicted': predicted,
+                'actual': observed,
+                'samples': len(samples),
+                'over_prediction': sum(1 for s in samples if s > predicted) / len(samples) if samples else None,
+                'reclaimed': limit - predicted
+            }
+        return {
+            'percentile': self.policy.percentile,
+            'headroom': self.policy.headroom,
+            'actual_label': "Actual" if actual is not None else "Observed p50",
+            'agents': rows,
+            'reclaimed_tokens': sum(row['reclaimed'] for row in rows.values())
+        }
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a token budget report as a markdown table."""
+    lines = [
+        f"## Output Token Budget (p{report['percentile']:g} + {report['headroom']:.0%} headroom)",
+        "",
+        f"| Agent | Configured | Predicted | {report['actual_label']} | Samples | Samples above prediction | Reclaimed |",
+        "|---|---:|---:|---:|---:|---:|---:|"
+    ]
+    for role, row in report['agents'].items():
+        over = f"{row['over_prediction']:.0%}" if row['over_prediction'] is not None else "-"
+        actual = row['actual'] if row['actual'] is not None else "-"
+        lines.append(f"| {role} | {row['configured']} | {row['predicted']} | {actual} | {row['samples']} | "
+                     f"{over} | {row['reclaimed']} |")
+    lines.append("")
+    lines.append(f"Rate-limit reservation reclaimed per engagement: {report['reclaimed_tokens']} output tokens")
+    return "\n".join(lines) + "\n"
+
+def main():
+    """Print the token budget report for the saved outputs under the given directories."""
+    from prompt_manager import PromptManager
+    parser = argparse.ArgumentParser(description="Predicted vs. actual agent output lengths")
+    parser.add_argument("dirs", nargs="*", default=["example_projects", "consulting_projects"],
+                        help="Directories of consulting projects to learn from")
+    args = parser.parse_args()
+
+    prompt_manager = PromptManager()
+    policy = TokenBudgetPolicy.from_config(prompt_manager.get_adaptive_token_config())
+    policy.enabled = True
+    history = OutputLengthHistory.from_artifacts([Path(d) for d in args.dirs], policy.chars_per_token)
+    limits = AdaptiveTokenLimits(history, policy)
+    configured = {agent: prompt_manager.get_agent_token_limit(agent) for agent in prompt_manager.list_available_agents()}
+    print(format_report(limits.report(configured)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Trace Waterfall Viewer
+Renders an engagement trace (trace.json in the project directory, OTLP/JSON) as a waterfall
+of nested spans, followed by the wall time, tokens and bytes of each kind of span
+
+Usage:
+    python trace_viewer.py consulting_projects/Tesla/trace.json
+    python trace_viewer.py consulting_projects/Tesla/trace.json --width 60 --min-ms 5
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any
+
+from tracing import load_spans
+
+# Attributes summed per kind of span in the totals table
+TOTALS = (("gen_ai.usage.input_tokens", "in tok"), ("gen_ai.usage.output_tokens", "out tok"), ("bytes", "bytes"))
+
+def span_kind(name: str) -> str:
+    """Kind of a span: its name up to the first space ("llm.call market_researcher" -> "llm.call")."""
+    return name.split(" ", 1)[0]
+
+def _ordered(spans: List[Dict[str, Any]]) -> List[tuple]:
+    """Spans depth-first in start order, as (depth, span); spans whose parent is missing are roots."""
+    ids = {span["span_id"] for span in spans}
+    children: Dict[Any, List[Dict[str, Any]]] = {}
+    for span in spans:
+        children.setdefault(span["parent_id"] if span["parent_id"] in ids else None, []).append(span)
+    ordered = []
+
+    def visit(parent_id, depth):
+        for span in sorted(children.get(parent_id, []), key=lambda s: s["start"]):
+            ordered.append((depth, span))
+            visit(span["span_id"], depth + 1)
+
+    visit(None, 0)
+    return ordered
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 50, min_ms: float = 0.0) -> str:
+    """One line per span: indented name, duration and a bar placed on the trace's timeline."""
+    if not spans:
+        return "(empty trace)"
+    start = min(span["start"] for span in spans)
+    total = max(max(span["end"] for span in spans) - start, 1e-9)
+    rows = [(depth, span) for depth, span in _ordered(spans) if (span["end"] - span["start"]) * 1000 >= min_ms]
+    if not rows:
+        return f"🧵 {len(spans)} spans over {total:.2f}s, none above {min_ms:g}ms"
+    label_width = min(max(len(span["name"]) + 2 * depth for depth, span in rows), 60)
+    lines = [f"🧵 {len(spans)} spans over {total:.2f}s"]
+    for depth, span in rows:
+        offset = int((span["start"] - start) / total * width)
+        length = max(int(round((span["end"] - span["start"]) / total * width)), 1)
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = ("  " * depth + span["name"])[:label_width]
+        marker = " ❌" if span["error"] else ""
+        lines.append(f"{label:<{label_width}} {span['end'] - span['start']:>8.3f}s |{bar:<{width}}|{marker}")
+    return "\n".join(lines)
+
+def render_totals(spans: List[Dict[str, Any]]) -> str:
+    """Count, summed wall time, tokens and bytes per kind of span, longest first.
+
+    Spans of one kind overlap when they run concurrently, so their summed time can exceed the trace's.
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    for span in spans:
+        row = totals.setdefault(span_kind(span["name"]), {"count": 0, "seconds": 0.0})
+        row["count"] += 1
+        row["seconds"] += span["end"] - span["start"]
+        for key, _ in TOTALS:
+            if isinstance(span["attributes"].get(key), (int, float)):
+                row[key] = row.get(key, 0) + span["attributes"][key]
+    lines = [f"{'span':<20} {'count':>6} {'seconds':>10}" + "".join(f" {title:>10}" for _, title in TOTALS)]
+    for kind, row in sorted(totals.items(), key=lambda item: -item[1]["seconds"]):
+        lines.append(f"{kind:<20} {row['count']:>6} {row['seconds']:>10.3f}"
+                     + "".join(f" {int(row[key]) if key in row else '':>10}" for key, _ in TOTALS))
+    return "\n".join(lines)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render an engagement trace as a waterfall")
+    parser.add_argument("trace", type=Path, help="Trace file (OTLP/JSON), e.g. <project dir>/trace.json")
+    parser.add_argument("--width", type=int, default=50, help="Width of the timeline in characters")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="Hide spans shorter than this")
+    args = parser.parse_args()
+    try:
+        spans = load_spans(args.trace)
+    except (IOError, ValueError, KeyError) as e:
+        print(f"❌ Could not read trace {args.trace}: {e}")
+        return 1
+    print(render_waterfall(spans, args.width, args.min_ms))
+    print()
+    print(render_totals(spans))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
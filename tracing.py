@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Structured Tracing for Consulting Engagements
+Hierarchical spans (engagement -> phase -> agent -> LLM call / dependency load / output save)
+with timing, token and byte counts, exported as OpenTelemetry (OTLP/JSON) traces to a local
+file and, optionally, to a local collector. Render a trace with trace_viewer.py
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Iterator
+
+from artifact_io import atomic_write_json, run_in_io_thread
+from structured_logging import log_event
+
+SCOPE_NAME = "strategy_consulting_agent"
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL = 1
+
+# Span of the running task; asyncio tasks inherit it, so spans opened in a task nest under its creator's
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+_export_executor: Optional[ThreadPoolExecutor] = None
+
+def export_executor() -> ThreadPoolExecutor:
+    """Thread for posting traces to a collector, so a slow collector never holds up artifact writes."""
+    global _export_executor
+    if _export_executor is None:
+        _export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+    return _export_executor
+
+class Span:
+    """One timed operation of a trace, with attributes set while it runs."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set(self, key: str, value: Any):
+        """Set an attribute; None values are dropped."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def add(self, key: str, value: float):
+        """Add to a numeric attribute (e.g. queue wait over several attempts)."""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def fail(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = str(error) or type(error).__name__
+        self.set("exception.type", type(error).__name__)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (to now while the span is open)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status, **({"message": self.status_message} if self.status_message else {})}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    """An attribute value in OTLP/JSON encoding (64-bit integers are strings)."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+class Tracer:
+    """Collects the spans of one engagement's trace (event loop thread only)."""
+
+    def __init__(self, service_name: str = "strategy-consulting-team", resource: Optional[Dict[str, Any]] = None):
+        self.service_name = service_name
+        self.resource = dict(resource or {})
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **resource) -> Optional["Tracer"]:
+        """A tracer per the `tracing` section of the prompt config, or None when tracing is off."""
+        if not config.get('enabled', True):
+            return None
+        return cls(config.get('service_name', 'strategy-consulting-team'), resource)
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        """Open a span under the current one for the duration of the block.
+
+        An exception leaving the block (cancellation included) marks the span as an error.
+        """
+        parent = _current_span.get()
+        span = Span(name, self.trace_id, parent.span_id if parent is not None and parent.trace_id == self.trace_id
+                    else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self.spans.append(span)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+        resource = dict(self.resource, **{"service.name": self.service_name})
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": key, "value": otlp_value(value)}
+                                        for key, value in resource.items() if value is not None]},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME},
+                            "spans": [span.to_otlp() for span in sorted(self.spans, key=lambda s: s.start_ns)]}]
+        }]}
+
+    def export(self, path: Path, collector_endpoint: Optional[str] = None, timeout: float = 5.0):
+        """Write the trace to `path` and, if given, post it to an OTLP/HTTP collector.
+
+        A collector that is down or rejects the trace only costs a warning; the file is always written.
+        """
+        payload = self.to_otlp()
+        atomic_write_json(path, payload)
+        if collector_endpoint:
+            self._post(payload, collector_endpoint, timeout)
+
+    async def export_async(self, path: Path, collector_endpoint: Optional[str] = None, timeout: float = 5.0):
+        """`export` from the event loop: the file on the artifact I/O thread, the post on the export thread."""
+        payload = self.to_otlp()
+        await run_in_io_thread(atomic_write_json, path, payload)
+        if collector_endpoint:
+            # In the engagement's context, so a failed post is logged with its run id and progress sink
+            await asyncio.get_running_loop().run_in_executor(export_executor(), contextvars.copy_context().run,
+                                                             self._post, payload, collector_endpoint, timeout)
+
+    def _post(self, payload: Dict[str, Any], collector_endpoint: str, timeout: float):
+        import urllib.request  # Only needed with a collector; keeps the CLI's import time down
+        request = urllib.request.Request(collector_endpoint, data=json.dumps(payload).encode('utf-8'),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout):
+                pass
+        except (OSError, ValueError) as e:
+            log_event("trace.export_failed", f"⚠️  Could not send trace to {collector_endpoint}: {e}",
+                      logging.WARNING, endpoint=collector_endpoint, error=str(e))
+
+@contextmanager
+def maybe_span(tracer: Optional[Tracer], name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+    """A span of `tracer`, or one that is never recorded when tracing is off."""
+    if tracer is None:
+        yield Span(name, "", attributes=attributes)
+        return
+    with tracer.span(name, attributes) as span:
+        yield span
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    """Spans of an OTLP/JSON trace file as flat dicts (name, ids, start/end seconds, attributes, status)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    spans = []
+    for resource_spans in data.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                spans.append({
+                    "name": span["name"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId") or None,
+                    "start": int(span["startTimeUnixNano"]) / 1e9,
+                    "end": int(span["endTimeUnixNano"]) / 1e9,
+                    "attributes": {attribute["key"]: _plain_value(attribute["value"])
+                                   for attribute in span.get("attributes", [])},
+                    "error": span.get("status", {}).get("code") == STATUS_ERROR
+                })
+    return spans
+
+def _plain_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "arrayValue" in value:
+        return [_plain_value(item) for item in value["arrayValue"].get("values", [])]
+    return next(iter(value.values()), None)